@@ -0,0 +1,216 @@
+"""
+Abbrechbare Berechnungsaufträge mit Fortschrittsanzeige
+
+Der Rechner (und parameter_sweep) rufen an festen Stellen eine
+Fortschrittsfunktion fortschritt(phase, schritt, gesamt) auf. Ein Auftrag
+stellt diese Funktion bereit: Er prüft bei jedem Aufruf, ob der Auftrag
+abgebrochen wurde, und meldet den Gesamtfortschritt über alle Phasen samt
+geschätzter Restzeit an einen Rückruf, z.B. die Fortschrittsanzeige der
+Oberfläche. Das Modul benötigt nur die Standardbibliothek.
+"""
+import threading
+import time
+from foerdermittel_ereignisse import (PHASE_FIXIERUNG, PHASE_RUNDUNG, PHASE_VALIDIERUNG,
+                                      PHASE_EXPORT, PHASE_SWEEP, PHASE_IMPORT)
+
+# Geschätzter Anteil der Phasen an der Gesamtlaufzeit
+PHASEN_GEWICHTE = {
+    PHASE_FIXIERUNG: 6,
+    PHASE_RUNDUNG: 1,
+    PHASE_VALIDIERUNG: 1,
+    PHASE_EXPORT: 4,
+    PHASE_SWEEP: 1,
+    PHASE_IMPORT: 1,
+}
+
+# Phasen einer Berechnung ohne bzw. mit anschließendem Excel-Export
+BERECHNUNGSPHASEN = (PHASE_FIXIERUNG, PHASE_RUNDUNG, PHASE_VALIDIERUNG)
+BERECHNUNGSPHASEN_MIT_EXPORT = BERECHNUNGSPHASEN + (PHASE_EXPORT,)
+
+
+class AuftragAbgebrochen(Exception):
+    """Wird ausgelöst, wenn ein Auftrag abgebrochen wurde"""
+    pass
+
+
+class Auftrag:
+    def __init__(self, phasen=BERECHNUNGSPHASEN, fortschritt=None, intervall=0.1):
+        """
+        Abbrechbarer Auftrag mit Fortschritt und geschätzter Restzeit
+
+        Die Methode melde() wird als Fortschrittsfunktion an den Rechner
+        übergeben. Sie löst AuftragAbgebrochen aus, sobald abbrechen()
+        aufgerufen wurde (auch aus einem anderen Thread), und ruft höchstens
+        alle `intervall` Sekunden sowie bei jedem Phasenwechsel den Rückruf
+        `fortschritt` mit einem Dictionary auf:
+
+            phase     Aktuelle Phase
+            schritt   Schritt innerhalb der Phase
+            gesamt    Schritte der Phase (None, wenn unbekannt)
+            anteil    Gesamtfortschritt von 0 bis 1
+            vergangen Laufzeit in Sekunden
+            restzeit  Geschätzte Restzeit in Sekunden (None, wenn unbekannt)
+
+        Args:
+            phasen: Phasen des Auftrags in ihrer Reihenfolge
+            fortschritt: Rückruf für den Fortschritt (läuft im Thread des Auftrags)
+            intervall: Mindestabstand zweier Fortschrittsmeldungen in Sekunden
+        """
+        self.phasen = tuple(phasen)
+        self.fortschritt = fortschritt
+        self.intervall = intervall
+        self._abbruch = threading.Event()
+        self._start = None
+        self._letzte_meldung = 0.0
+        self._phase = None
+
+        # Anteil der Phasen vor jeder Phase und Anteil jeder Phase
+        gewichte = [PHASEN_GEWICHTE.get(phase, 1) for phase in self.phasen]
+        summe = sum(gewichte)
+        self._beginn = {}
+        self._gewicht = {}
+        bisher = 0
+        for phase, gewicht in zip(self.phasen, gewichte):
+            self._beginn[phase] = bisher / summe
+            self._gewicht[phase] = gewicht / summe
+            bisher += gewicht
+
+    def abbrechen(self):
+        """Bricht den Auftrag bei der nächsten Fortschrittsmeldung ab"""
+        self._abbruch.set()
+
+    @property
+    def abgebrochen(self):
+        """True, wenn abbrechen() aufgerufen wurde"""
+        return self._abbruch.is_set()
+
+    def starten(self):
+        """Setzt den Beginn der Laufzeitmessung"""
+        self._start = time.perf_counter()
+        self._letzte_meldung = 0.0
+        self._phase = None
+
+    def melde(self, phase, schritt, gesamt):
+        """
+        Fortschrittsfunktion für Rechner und Sweep
+
+        Args:
+            phase: Phase (siehe PHASE_* in foerdermittel_ereignisse)
+            schritt: Erledigte Schritte der Phase
+            gesamt: Schritte der Phase (None, wenn unbekannt)
+
+        Raises:
+            AuftragAbgebrochen: wenn der Auftrag abgebrochen wurde
+        """
+        if self._abbruch.is_set():
+            raise AuftragAbgebrochen("Auftrag wurde abgebrochen")
+        if self.fortschritt is None:
+            return
+        if self._start is None:
+            self.starten()
+
+        jetzt = time.perf_counter()
+        fertig = gesamt is not None and schritt >= gesamt
+        if phase == self._phase and not fertig and jetzt - self._letzte_meldung < self.intervall:
+            return
+        self._phase = phase
+        self._letzte_meldung = jetzt
+
+        anteil = self._beginn.get(phase, 0.0)
+        if gesamt:
+            anteil += self._gewicht.get(phase, 0.0) * min(schritt / gesamt, 1.0)
+        vergangen = jetzt - self._start
+        restzeit = vergangen * (1 - anteil) / anteil if anteil > 0 else None
+
+        self.fortschritt({'phase': phase, 'schritt': schritt, 'gesamt': gesamt,
+                          'anteil': anteil, 'vergangen': vergangen, 'restzeit': restzeit})
+
+
+class Berechnungsauftrag(Auftrag):
+    def __init__(self, fortschritt=None, exportdatei=None, intervall=0.1):
+        """
+        Abbrechbarer Auftrag für berechne_verteilung() und optional den Excel-Export
+
+        Args:
+            fortschritt: Rückruf für den Fortschritt (siehe Auftrag)
+            exportdatei: Excel-Datei, in die das Ergebnis exportiert wird (optional)
+            intervall: Mindestabstand zweier Fortschrittsmeldungen in Sekunden
+        """
+        super().__init__(BERECHNUNGSPHASEN_MIT_EXPORT if exportdatei else BERECHNUNGSPHASEN,
+                         fortschritt, intervall)
+        self.exportdatei = exportdatei
+
+    def ausfuehren(self, rechner):
+        """
+        Führt die Berechnung mit dem übergebenen Rechner durch
+
+        Args:
+            rechner: FoerdermittelRechner mit Parametern und Kommunen
+
+        Returns:
+            Ergebnis-DataFrame von berechne_verteilung()
+
+        Raises:
+            AuftragAbgebrochen: wenn der Auftrag abgebrochen wurde
+        """
+        self.starten()
+        rechner.fortschritt = self.melde
+        try:
+            ergebnis = rechner.berechne_verteilung()
+            if self.exportdatei:
+                rechner.exportiere_excel(self.exportdatei)
+        finally:
+            rechner.fortschritt = None
+        return ergebnis
+
+
+class Exportauftrag(Auftrag):
+    def __init__(self, dateiname, fortschritt=None, intervall=0.1):
+        """
+        Abbrechbarer Auftrag für den Export eines berechneten Ergebnisses
+
+        Args:
+            dateiname: Ziel-Datei des Exports (das Format ergibt sich aus der
+                       Endung, siehe FoerdermittelRechner.exportiere)
+            fortschritt: Rückruf für den Fortschritt (siehe Auftrag)
+            intervall: Mindestabstand zweier Fortschrittsmeldungen in Sekunden
+        """
+        super().__init__((PHASE_EXPORT,), fortschritt, intervall)
+        self.dateiname = dateiname
+
+    def ausfuehren(self, rechner):
+        """
+        Exportiert das Ergebnis des Rechners; bei Abbruch wird keine Datei geschrieben
+
+        Alle Formate werden über eine temporäre Datei geschrieben, die erst
+        nach der letzten Abbruchprüfung umbenannt wird (siehe
+        foerdermittel_export.schreibe_ergebnis). Davon ausgenommen ist der
+        Excel-Export mit streaming=False, den dieser Auftrag nicht verwendet.
+
+        Raises:
+            AuftragAbgebrochen: wenn der Auftrag abgebrochen wurde
+        """
+        self.starten()
+        rechner.fortschritt = self.melde
+        try:
+            rechner.exportiere(self.dateiname)
+        finally:
+            rechner.fortschritt = None
+
+
+def formatiere_restzeit(sekunden):
+    """
+    Formatiert eine Restzeit für die Anzeige (z.B. "1:05 min")
+
+    Args:
+        sekunden: Restzeit in Sekunden oder None
+
+    Returns:
+        Text der Restzeit
+    """
+    if sekunden is None:
+        return "unbekannt"
+    sekunden = int(round(sekunden))
+    if sekunden < 60:
+        return f"{sekunden} s"
+    return f"{sekunden // 60}:{sekunden % 60:02d} min"
@@ -0,0 +1,331 @@
+"""
+Stapelverarbeitung ohne Benutzereingaben
+
+Berechnet die Verteilung für beliebig viele Eingabedateien (Excel oder CSV)
+mit denselben Parametern und schreibt je Datei ein Ergebnis im gewünschten
+Format. Die Dateien werden auf einen Pool von Worker-Prozessen verteilt.
+
+Für jede Datei wird eine JSON-Zeile mit Status und Laufzeiten (Import,
+Berechnung, Export) auf die Standardausgabe geschrieben, am Ende eine Zeile
+mit der Zusammenfassung; Meldungen für Menschen gehen auf die
+Fehlerausgabe. Der Exit-Code gibt das Gesamtergebnis an (siehe EXIT_*).
+
+Aufruf:
+    python foerdermittel_batch.py kommunen1.xlsx kommunen2.csv --gesamtsumme 500000
+        [--mindestbetrag 12500] [--sockelbetrag 0.5] [--format csv]
+        [--ausgabe ergebnisse/] [--prozesse 4] [--ohne-cache]
+
+Ohne --ausgabe wird das Ergebnis neben die Eingabedatei geschrieben
+(<name>_ergebnis.<format>). Bei genau einer Eingabedatei kann --ausgabe
+auch der Name der Ergebnisdatei sein.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Ergebnis-Caches je Cache-Verzeichnis, einmal je Worker-Prozess angelegt
+_ergebnis_caches = {}
+
+# Exit-Codes
+EXIT_OK = 0          # Alle Dateien erfolgreich berechnet und validiert
+EXIT_TEILWEISE = 1   # Mindestens eine Datei fehlgeschlagen oder nicht validiert
+EXIT_ARGUMENTE = 2   # Ungültige Argumente
+EXIT_FEHLER = 3      # Keine Datei erfolgreich verarbeitet
+
+# Status einer Datei
+STATUS_OK = 'ok'
+STATUS_WARNUNG = 'warnung'  # Berechnet, aber Validierung fehlgeschlagen
+STATUS_FEHLER = 'fehler'
+
+
+def ausgabedatei(eingabe, ausgabe, format, einzeln):
+    """
+    Bestimmt die Ergebnisdatei zu einer Eingabedatei
+
+    Args:
+        eingabe: Pfad der Eingabedatei
+        ausgabe: Verzeichnis oder (bei einer Eingabe) Dateiname; None: Verzeichnis der Eingabe
+        format: Exportformat (Schlüssel von EXPORTFORMATE)
+        einzeln: True, wenn nur eine Eingabedatei verarbeitet wird
+
+    Returns:
+        Pfad der Ergebnisdatei
+    """
+    from foerdermittel_export import EXPORTFORMATE
+
+    endung = EXPORTFORMATE[format][1][0]
+    if _ist_ergebnisdatei(ausgabe, einzeln):
+        if os.path.splitext(ausgabe)[1].lower() not in EXPORTFORMATE[format][1]:
+            raise ValueError(f"Die Endung von {ausgabe} passt nicht zum Format {format} "
+                             f"({', '.join(EXPORTFORMATE[format][1])})")
+        return ausgabe
+    name = os.path.splitext(os.path.basename(eingabe))[0] + '_ergebnis' + endung
+    return os.path.join(ausgabe or os.path.dirname(os.path.abspath(eingabe)), name)
+
+
+def _ist_ergebnisdatei(ausgabe, einzeln):
+    """True, wenn ausgabe der Name der Ergebnisdatei und kein Verzeichnis ist"""
+    return bool(einzeln and ausgabe and os.path.splitext(ausgabe)[1]
+                and not os.path.isdir(ausgabe))
+
+
+def ausgabedateien(eingaben, ausgabe, format):
+    """
+    Bestimmt die Ergebnisdateien aller Eingabedateien
+
+    Args:
+        eingaben: Liste der Eingabedateien
+        ausgabe: Ausgabeverzeichnis oder (bei einer Eingabe) Ergebnisdatei
+        format: Exportformat (Schlüssel von EXPORTFORMATE)
+
+    Returns:
+        Liste der Ergebnisdateien in der Reihenfolge der Eingaben
+
+    Raises:
+        ValueError: Endung der Ergebnisdatei passt nicht zum Format oder
+                    mehrere Eingaben ergäben dieselbe Ergebnisdatei
+    """
+    einzeln = len(eingaben) == 1
+    dateien = [ausgabedatei(eingabe, ausgabe, format, einzeln) for eingabe in eingaben]
+    eingaben_je_datei = {}
+    for eingabe, datei in zip(eingaben, dateien):
+        eingaben_je_datei.setdefault(os.path.normcase(os.path.abspath(datei)), []).append(eingabe)
+    doppelt = [eingaben for eingaben in eingaben_je_datei.values() if len(eingaben) > 1]
+    if doppelt:
+        raise ValueError("Mehrere Eingabedateien ergäben dieselbe Ergebnisdatei: "
+                         + "; ".join(", ".join(eingaben) for eingaben in doppelt))
+    return dateien
+
+
+def verarbeite_datei(eingabe, ausgabe, parameter, format, cache_verzeichnis=None):
+    """
+    Importiert, berechnet und exportiert eine Datei (läuft im Worker-Prozess)
+
+    Args:
+        eingabe: Pfad der Eingabedatei (.xlsx, .xls oder .csv)
+        ausgabe: Pfad der Ergebnisdatei
+        parameter: Dictionary mit gesamtsumme, mindestbetrag, sockelbetrag_prozent,
+                   verfahren und rundungsverfahren
+        format: Exportformat (Schlüssel von EXPORTFORMATE)
+        cache_verzeichnis: Verzeichnis des Import-Caches (Ergebnisse im
+                           Unterverzeichnis 'ergebnisse'), '' für die
+                           Standardverzeichnisse, None ohne Caches
+
+    Returns:
+        Dictionary mit Datei, Ergebnisdatei, Status, Anzahl der Kommunen,
+        Herkunft der Daten und des Ergebnisses, Laufzeiten in Sekunden und
+        ggf. Fehlermeldung
+    """
+    from foerdermittel_berechnung import berechne, Parameter
+    from foerdermittel_ergebniscache import ErgebnisCache, ErgebnisDateicache
+    from foerdermittel_export import schreibe_ergebnis
+    from foerdermittel_import import lies_kommunen
+    from foerdermittel_importcache import ImportCache
+
+    zusammenfassung = {'datei': eingabe, 'ausgabe': ausgabe, 'status': STATUS_FEHLER,
+                       'kommunen': 0, 'aus_cache': False, 'ergebnis_aus_cache': None,
+                       'zeiten': {}}
+    zeiten = zusammenfassung['zeiten']
+    start = time.perf_counter()
+    try:
+        cache = ImportCache(cache_verzeichnis or None) if cache_verzeichnis is not None else None
+        daten = lies_kommunen(eingabe, cache=cache)
+        zeiten['import'] = time.perf_counter() - start
+        zusammenfassung['aus_cache'] = daten['aus_cache']
+        zusammenfassung['verworfen'] = daten['verworfen']
+        zusammenfassung['ungueltige_zeilen'] = daten['ungueltige_zeilen']
+        if len(daten['namen']) == 0:
+            raise ValueError("Keine gültigen Kommunendaten gefunden")
+
+        schritt = time.perf_counter()
+        parameter = Parameter(**parameter)
+        kommunen = {'Name': daten['namen'], 'Wert_2019': daten['wert_2019'],
+                    'Kinder_U3': daten['kinder_u3']}
+        if cache_verzeichnis is None:
+            ergebnis = berechne(kommunen, parameter)
+        else:
+            if cache_verzeichnis not in _ergebnis_caches:
+                verzeichnis = os.path.join(cache_verzeichnis, 'ergebnisse') if cache_verzeichnis else None
+                _ergebnis_caches[cache_verzeichnis] = ErgebnisCache(
+                    dateicache=ErgebnisDateicache(verzeichnis))
+            ergebnis, herkunft = _ergebnis_caches[cache_verzeichnis].berechne_mit_herkunft(
+                kommunen, parameter)
+            zusammenfassung['ergebnis_aus_cache'] = herkunft
+        zusammenfassung['kommunen'] = len(ergebnis)
+        zeiten['berechnung'] = time.perf_counter() - schritt
+
+        schritt = time.perf_counter()
+        schreibe_ergebnis(ausgabe, ergebnis.als_dataframe(), parameter.gesamtsumme,
+                          parameter.mindestbetrag, parameter.sockelbetrag_prozent, format=format)
+        zeiten['export'] = time.perf_counter() - schritt
+
+        zusammenfassung['status'] = STATUS_OK if ergebnis.validiert else STATUS_WARNUNG
+    except Exception as e:
+        zusammenfassung['fehler'] = f"{type(e).__name__}: {e}"
+
+    zeiten['gesamt'] = time.perf_counter() - start
+    for name in zeiten:
+        zeiten[name] = round(zeiten[name], 4)
+    return zusammenfassung
+
+
+def verarbeite_dateien(eingaben, parameter, format='xlsx', ausgabe=None, prozesse=None,
+                       cache_verzeichnis='', rueckruf=None):
+    """
+    Verarbeitet mehrere Dateien auf einem Pool von Worker-Prozessen
+
+    Unter Windows muss der Aufruf innerhalb von ``if __name__ == "__main__":``
+    erfolgen.
+
+    Args:
+        eingaben: Liste der Eingabedateien
+        parameter: Parameter der Berechnung (siehe verarbeite_datei)
+        format: Exportformat (Schlüssel von EXPORTFORMATE)
+        ausgabe: Ausgabeverzeichnis oder (bei einer Eingabe) Ergebnisdatei
+        prozesse: Anzahl der Worker-Prozesse (Standard: alle CPU-Kerne, 1 = seriell)
+        cache_verzeichnis: Verzeichnis der Caches ('' = Standard, None = ohne Caches)
+        rueckruf: Optionale Funktion, die mit jeder fertigen Zusammenfassung
+                  aufgerufen wird (in der Reihenfolge der Fertigstellung)
+
+    Returns:
+        Liste der Zusammenfassungen in der Reihenfolge der Eingaben
+
+    Raises:
+        ValueError: Ergebnisdateien ungültig oder nicht eindeutig (siehe ausgabedateien)
+    """
+    dateien = ausgabedateien(eingaben, ausgabe, format)
+    if ausgabe and not _ist_ergebnisdatei(ausgabe, len(eingaben) == 1):
+        os.makedirs(ausgabe, exist_ok=True)
+    auftraege = [(eingabe, datei, parameter, format, cache_verzeichnis)
+                 for eingabe, datei in zip(eingaben, dateien)]
+
+    prozesse = min(prozesse or os.cpu_count() or 1, len(auftraege)) or 1
+    ergebnisse = [None] * len(auftraege)
+    if prozesse == 1:
+        for nummer, auftrag in enumerate(auftraege):
+            ergebnisse[nummer] = verarbeite_datei(*auftrag)
+            if rueckruf is not None:
+                rueckruf(ergebnisse[nummer])
+    else:
+        with ProcessPoolExecutor(max_workers=prozesse) as executor:
+            futures = {executor.submit(verarbeite_datei, *auftrag): nummer
+                       for nummer, auftrag in enumerate(auftraege)}
+            for future in as_completed(futures):
+                ergebnisse[futures[future]] = future.result()
+                if rueckruf is not None:
+                    rueckruf(ergebnisse[futures[future]])
+    return ergebnisse
+
+
+def exit_code(ergebnisse):
+    """Liefert den Exit-Code zu den Zusammenfassungen (siehe EXIT_*)"""
+    erfolgreich = sum(1 for ergebnis in ergebnisse if ergebnis['status'] == STATUS_OK)
+    if erfolgreich == len(ergebnisse):
+        return EXIT_OK
+    if any(ergebnis['status'] != STATUS_FEHLER for ergebnis in ergebnisse):
+        return EXIT_TEILWEISE
+    return EXIT_FEHLER
+
+
+def argument_parser():
+    """Liefert den Parser für die Kommandozeilenargumente"""
+    from foerdermittel_rechner import VERFAHREN, RUNDUNGSVERFAHREN
+    from foerdermittel_export import EXPORTFORMATE
+
+    parser = argparse.ArgumentParser(
+        prog='foerdermittel_batch',
+        description="Berechnet die Fördermittelverteilung für mehrere Eingabedateien ohne Rückfragen.",
+        epilog="Exit-Codes: 0 alle Dateien erfolgreich, 1 mindestens eine Datei fehlgeschlagen "
+               "oder nicht validiert, 2 ungültige Argumente, 3 keine Datei erfolgreich.")
+    parser.add_argument('eingaben', nargs='+', metavar='DATEI',
+                        help="Eingabedateien (.xlsx, .xls oder .csv)")
+    parser.add_argument('--gesamtsumme', type=float, required=True,
+                        help="Zu verteilende Gesamtsumme in Euro")
+    parser.add_argument('--mindestbetrag', type=float, default=12500,
+                        help="Mindestbetrag je Kommune in Euro (Standard: 12500)")
+    parser.add_argument('--sockelbetrag', type=float, default=0.5,
+                        help="Anteil des Sockelbetrags, 0 bis 1 (Standard: 0.5)")
+    parser.add_argument('--verfahren', choices=VERFAHREN, default='numpy',
+                        help="Berechnungsverfahren (Standard: numpy)")
+    parser.add_argument('--rundungsverfahren', choices=RUNDUNGSVERFAHREN, default='maximum',
+                        help="Ausgleich der Rundungsdifferenz (Standard: maximum)")
+    parser.add_argument('--format', choices=list(EXPORTFORMATE), default='xlsx',
+                        help="Ausgabeformat (Standard: xlsx)")
+    parser.add_argument('--ausgabe', metavar='PFAD',
+                        help="Ausgabeverzeichnis oder, bei einer Eingabedatei, die Ergebnisdatei")
+    parser.add_argument('--prozesse', type=int, default=None,
+                        help="Anzahl der Worker-Prozesse (Standard: alle CPU-Kerne)")
+    parser.add_argument('--ohne-cache', action='store_true',
+                        help="Import- und Ergebnis-Cache nicht verwenden")
+    return parser
+
+
+def main(argumente=None):
+    """
+    Führt die Stapelverarbeitung aus
+
+    Args:
+        argumente: Liste der Argumente (Standard: sys.argv[1:])
+
+    Returns:
+        Exit-Code (siehe EXIT_*)
+    """
+    parser = argument_parser()
+    args = parser.parse_args(argumente)
+
+    if args.gesamtsumme <= 0:
+        parser.error("--gesamtsumme muss positiv sein")
+    if args.mindestbetrag < 0:
+        parser.error("--mindestbetrag darf nicht negativ sein")
+    if not 0 <= args.sockelbetrag <= 1:
+        parser.error("--sockelbetrag muss zwischen 0 und 1 liegen")
+    if args.prozesse is not None and args.prozesse < 1:
+        parser.error("--prozesse muss mindestens 1 sein")
+    if args.format in ('parquet', 'arrow') and importlib.util.find_spec('pyarrow') is None:
+        parser.error(f"Für das Format {args.format} wird pyarrow benötigt (pip install pyarrow)")
+    fehlend = [eingabe for eingabe in args.eingaben if not os.path.isfile(eingabe)]
+    if fehlend:
+        parser.error(f"Datei nicht gefunden: {', '.join(fehlend)}")
+    try:
+        ausgabedateien(args.eingaben, args.ausgabe, args.format)
+    except ValueError as e:
+        parser.error(str(e))
+
+    parameter = {
+        'gesamtsumme': args.gesamtsumme,
+        'mindestbetrag': args.mindestbetrag,
+        'sockelbetrag_prozent': args.sockelbetrag,
+        'verfahren': args.verfahren,
+        'rundungsverfahren': args.rundungsverfahren,
+    }
+
+    def melde(zusammenfassung):
+        print(json.dumps(zusammenfassung, ensure_ascii=False), flush=True)
+        if zusammenfassung['status'] == STATUS_FEHLER:
+            print(f"⚠️ {zusammenfassung['datei']}: {zusammenfassung['fehler']}", file=sys.stderr)
+        elif zusammenfassung['status'] == STATUS_WARNUNG:
+            print(f"⚠️ {zusammenfassung['datei']}: Validierung fehlgeschlagen", file=sys.stderr)
+        else:
+            print(f"✓ {zusammenfassung['datei']} → {zusammenfassung['ausgabe']}", file=sys.stderr)
+
+    start = time.perf_counter()
+    ergebnisse = verarbeite_dateien(args.eingaben, parameter, format=args.format,
+                                    ausgabe=args.ausgabe, prozesse=args.prozesse,
+                                    cache_verzeichnis=None if args.ohne_cache else '',
+                                    rueckruf=melde)
+    code = exit_code(ergebnisse)
+
+    anzahl = {status: sum(1 for ergebnis in ergebnisse if ergebnis['status'] == status)
+              for status in (STATUS_OK, STATUS_WARNUNG, STATUS_FEHLER)}
+    print(json.dumps({'zusammenfassung': {'dateien': len(ergebnisse), **anzahl,
+                                          'gesamt': round(time.perf_counter() - start, 4),
+                                          'exit_code': code}}), flush=True)
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
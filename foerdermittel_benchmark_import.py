@@ -0,0 +1,87 @@
+"""
+Misst die Importzeit (Kaltstart) der Module des Fördermittelrechners
+
+Jede Messung startet einen neuen Python-Prozess, damit keine bereits
+geladenen Module das Ergebnis verfälschen. Zum Vergleich wird die Zeit für
+den Import von pandas und openpyxl gemessen, die bisher beim Import von
+foerdermittel_rechner immer mitgeladen wurden. Die Kopfzeile am Ende
+vergleicht Import und eine Berechnung ohne DataFrame mit dieser Zeit.
+
+Aufruf:
+    python foerdermittel_benchmark_import.py [Wiederholungen]
+"""
+import os
+import statistics
+import subprocess
+import sys
+
+# Import und Berechnung für eine Kommune mit dem NumPy-Verfahren
+_BERECHNUNG = ('from foerdermittel_rechner import FoerdermittelRechner; '
+               'from foerdermittel_ereignisse import StilleAusgabe; '
+               'r = FoerdermittelRechner(100000, verfahren="numpy", ausgabe=StilleAusgabe()); '
+               'r.kommune_hinzufuegen("A", 50000, 10); ')
+
+# Bezeichnung und Import-Anweisung der Messungen
+MESSUNGEN = [
+    ('Berechnungskern', 'import foerdermittel_kern'),
+    ('Rechner (ohne Berechnung)', 'import foerdermittel_rechner'),
+    ('Rechner + Berechnung', _BERECHNUNG + 'r.berechne_verteilung(als_dataframe=False)'),
+    ('Rechner + Berechnung + DataFrame', _BERECHNUNG + 'r.berechne_verteilung()'),
+    ('NumPy', 'import numpy'),
+    ('pandas + openpyxl (bisher beim Import)', 'import numpy, pandas, openpyxl'),
+]
+
+_MESSPROGRAMM = """
+import sys, time
+sys.path.insert(0, {pfad!r})
+start = time.perf_counter()
+{anweisung}
+print(time.perf_counter() - start)
+"""
+
+
+def miss_import(anweisung, wiederholungen=5):
+    """
+    Führt eine Import-Anweisung in neuen Prozessen aus
+
+    Args:
+        anweisung: Python-Anweisung, deren Laufzeit gemessen wird
+        wiederholungen: Anzahl der Prozessstarts
+
+    Returns:
+        Liste der gemessenen Zeiten in Sekunden
+    """
+    programm = _MESSPROGRAMM.format(pfad=os.path.dirname(os.path.abspath(__file__)),
+                                    anweisung=anweisung)
+    zeiten = []
+    for _ in range(wiederholungen):
+        ausgabe = subprocess.run([sys.executable, '-c', programm], capture_output=True,
+                                 text=True, check=True).stdout
+        zeiten.append(float(ausgabe.strip().splitlines()[-1]))
+    return zeiten
+
+
+def main():
+    wiederholungen = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    print("=" * 60)
+    print("IMPORTZEIT (KALTSTART)")
+    print("=" * 60)
+    print(f"{'Messung':<40} {'Median':>8} {'Minimum':>8}")
+
+    ergebnisse = {}
+    for bezeichnung, anweisung in MESSUNGEN:
+        zeiten = miss_import(anweisung, wiederholungen)
+        ergebnisse[bezeichnung] = statistics.median(zeiten)
+        print(f"{bezeichnung:<40} {statistics.median(zeiten) * 1000:>6.0f} ms "
+              f"{min(zeiten) * 1000:>5.0f} ms")
+
+    berechnung = ergebnisse['Rechner + Berechnung']
+    bisher = ergebnisse['pandas + openpyxl (bisher beim Import)']
+    print("-" * 60)
+    print(f"Kaltstart mit einer Berechnung: {bisher / berechnung:.1f}x schneller als allein "
+          f"der Import von pandas und openpyxl")
+
+
+if __name__ == "__main__":
+    main()
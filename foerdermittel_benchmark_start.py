@@ -0,0 +1,110 @@
+"""
+Misst die Startzeit der grafischen Oberfläche
+
+Jede Messung startet einen neuen Python-Prozess und erfasst
+    - die Zeit bis zum Import von foerdermittel_gui,
+    - die Zeit bis das Hauptfenster gezeichnet ist,
+    - die Zeit bis die Hintergrund-Importe (NumPy, pandas, openpyxl)
+      abgeschlossen sind.
+
+Mit --protokoll werden die Mediane zusammen mit der Programmversion als
+JSON-Zeile an eine Datei angehängt, damit sich die Startzeit über mehrere
+Versionen verfolgen lässt. Benötigt eine grafische Anzeige.
+
+Aufruf:
+    python foerdermittel_benchmark_start.py [Wiederholungen] [--protokoll datei.jsonl]
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+
+_MESSPROGRAMM = """
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {pfad!r})
+import tkinter as tk
+import foerdermittel_gui
+import_zeit = time.perf_counter() - start
+
+root = tk.Tk()
+app = foerdermittel_gui.FoerdermittelGUI(root)
+root.update()
+fenster_zeit = time.perf_counter() - start
+
+while not app.modules_ready.is_set():
+    root.update()
+    time.sleep(0.005)
+bereit_zeit = time.perf_counter() - start
+
+root.destroy()
+print(json.dumps({{'import': import_zeit, 'fenster': fenster_zeit, 'bereit': bereit_zeit,
+                  'version': foerdermittel_gui.VERSION}}))
+"""
+
+# Bezeichnung der Messwerte
+MESSWERTE = [
+    ('import', 'Import foerdermittel_gui'),
+    ('fenster', 'Hauptfenster gezeichnet'),
+    ('bereit', 'Hintergrund-Importe abgeschlossen'),
+]
+
+
+def miss_start(wiederholungen=5):
+    """
+    Startet die Oberfläche mehrfach in neuen Prozessen
+
+    Args:
+        wiederholungen: Anzahl der Prozessstarts
+
+    Returns:
+        Liste der Messungen (Dictionaries mit Zeiten in Sekunden)
+    """
+    programm = _MESSPROGRAMM.format(pfad=os.path.dirname(os.path.abspath(__file__)))
+    messungen = []
+    for _ in range(wiederholungen):
+        ausgabe = subprocess.run([sys.executable, '-c', programm], capture_output=True,
+                                 text=True, check=True).stdout
+        messungen.append(json.loads(ausgabe.strip().splitlines()[-1]))
+    return messungen
+
+
+def main():
+    argumente = sys.argv[1:]
+    protokoll = None
+    if '--protokoll' in argumente:
+        position = argumente.index('--protokoll')
+        protokoll = argumente[position + 1]
+        del argumente[position:position + 2]
+    wiederholungen = int(argumente[0]) if argumente else 5
+
+    try:
+        messungen = miss_start(wiederholungen)
+    except subprocess.CalledProcessError as e:
+        print(f"⚠️ Messung fehlgeschlagen (grafische Anzeige verfügbar?):\n{e.stderr}")
+        sys.exit(1)
+
+    print("=" * 60)
+    print(f"STARTZEIT DER OBERFLÄCHE (Version {messungen[0]['version']})")
+    print("=" * 60)
+    print(f"{'Messung':<40} {'Median':>8} {'Minimum':>8}")
+
+    ergebnis = {'version': messungen[0]['version'],
+                'zeitpunkt': datetime.now().isoformat(timespec='seconds'),
+                'wiederholungen': wiederholungen}
+    for schluessel, bezeichnung in MESSWERTE:
+        zeiten = [messung[schluessel] for messung in messungen]
+        ergebnis[schluessel] = round(statistics.median(zeiten), 4)
+        print(f"{bezeichnung:<40} {statistics.median(zeiten) * 1000:>6.0f} ms "
+              f"{min(zeiten) * 1000:>5.0f} ms")
+
+    if protokoll:
+        with open(protokoll, 'a', encoding='utf-8') as datei:
+            datei.write(json.dumps(ergebnis) + '\n')
+        print(f"\n✓ Ergebnis an '{protokoll}' angehängt")
+
+
+if __name__ == "__main__":
+    main()
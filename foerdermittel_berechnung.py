@@ -0,0 +1,343 @@
+"""
+Zustandslose Berechnung der Fördermittelverteilung
+
+berechne(kommunen, parameter) ist eine reine Funktion: Sie liest nur ihre
+Argumente, verändert nichts und liefert ein unveränderliches Ergebnis.
+Anders als ein FoerdermittelRechner, dessen Kommunen, Parameter und
+ergebnis_df Attribute der Instanz sind, kann sie daher aus beliebig vielen
+Threads gleichzeitig aufgerufen werden, ohne Sperren und ohne Kopien von
+Rechner-Instanzen.
+
+Das Ergebnis hält die Spalten als schreibgeschützte NumPy-Arrays sowie die
+Summen. Der DataFrame im Format von rechner.ergebnis_df wird erst auf
+Anfrage mit als_dataframe() erstellt.
+
+Beispiel:
+    from foerdermittel_berechnung import berechne, Parameter
+
+    ergebnis = berechne(kommunen, Parameter(500000, mindestbetrag=12500))
+    ergebnis.endbetrag.sum(), ergebnis.validiert
+    df = ergebnis.als_dataframe()
+"""
+from collections import namedtuple
+from types import MappingProxyType
+import numpy as np
+from foerdermittel_kern import (STATUS_MINDESTBETRAG, STATUS_WERT_RUNDE_1, berechne_runden_numpy,
+                                berechne_runden_exakt, berechne_runden_cent, in_cent,
+                                runde_cent_auf_euro, runde_groesste_reste, status_texte)
+from foerdermittel_kommunen import kommunen_spalten
+
+# Parameter einer Berechnung (unveränderlich und hashbar)
+Parameter = namedtuple('Parameter', ['gesamtsumme', 'mindestbetrag', 'sockelbetrag_prozent',
+                                     'verfahren', 'rundungsverfahren'],
+                       defaults=(12500, 0.5, 'numpy', 'maximum'))
+
+# Verfügbare Verfahren ('pandas' wird mit dem NumPy-Verfahren berechnet, das
+# dieselben Ergebnisse liefert)
+VERFAHREN = ('pandas', 'numpy', 'exakt', 'cent')
+RUNDUNGSVERFAHREN = ('maximum', 'hamilton')
+
+# Toleranz der Validierung in Euro (wie FoerdermittelRechner.validiere_ergebnis)
+TOLERANZ = 0.01
+
+# Betragsspalten, die beim Cent-Verfahren zusätzlich in ganzen Cent vorliegen
+_CENT_SPALTEN = ('u3_anteil', 'zwischensumme', 'endbetrag', 'erste_berechnung',
+                 'endbetrag_vor_rundung')
+
+
+def _einfrieren(name, wert):
+    """Schützt Arrays und die Cent-Zuordnung eines Ergebnis-Attributs vor Änderungen"""
+    if isinstance(wert, np.ndarray):
+        wert.flags.writeable = False
+    elif name == 'cent':
+        for array in wert.values():
+            array.flags.writeable = False
+        wert = MappingProxyType(dict(wert))
+    return wert
+
+
+class Ergebnis:
+    """
+    Unveränderliches Ergebnis von berechne()
+
+    Alle Arrays sind schreibgeschützt. Attribute:
+        parameter: Parameter der Berechnung
+        namen, wert_2019, kinder_u3: Eingangsdaten
+        sockelbetrag, u3_anteil, zwischensumme, erste_berechnung: Beträge in Euro
+        endbetrag_vor_rundung, endbetrag, rundungsanpassung: Beträge in Euro
+        runde: Runde der Berechnung je Kommune
+        status: Status-Code je Kommune (siehe foerdermittel_kern)
+        ausgleich: Index der Kommune mit Rundungsausgleich oder None
+        cent: Schreibgeschützte Zuordnung der Cent-Arrays (nur beim Verfahren
+              'cent', sonst leer)
+        runden: Anzahl der Runden
+        alle_fixiert: True, wenn alle Kommunen fixiert wurden
+        verteilt: Summe der Endbeträge
+        validiert: True, wenn die Summe der Gesamtsumme entspricht
+    """
+    __slots__ = ('parameter', 'namen', 'wert_2019', 'kinder_u3', 'sockelbetrag', 'u3_anteil',
+                 'zwischensumme', 'erste_berechnung', 'endbetrag_vor_rundung', 'endbetrag',
+                 'rundungsanpassung', 'runde', 'status', 'ausgleich', 'cent', 'runden',
+                 'alle_fixiert', 'verteilt', 'validiert')
+
+    def __init__(self, **werte):
+        for name in self.__slots__:
+            object.__setattr__(self, name, _einfrieren(name, werte.pop(name)))
+        if werte:
+            raise TypeError(f"Unbekannte Attribute: {', '.join(werte)}")
+
+    def __setattr__(self, name, wert):
+        raise AttributeError("Ergebnis ist unveränderlich")
+
+    def __delattr__(self, name):
+        raise AttributeError("Ergebnis ist unveränderlich")
+
+    def __getstate__(self):
+        # MappingProxyType lässt sich nicht pickeln
+        zustand = {name: getattr(self, name) for name in self.__slots__}
+        zustand['cent'] = dict(self.cent)
+        return zustand
+
+    def __setstate__(self, zustand):
+        for name, wert in zustand.items():
+            object.__setattr__(self, name, _einfrieren(name, wert))
+
+    def __len__(self):
+        return len(self.namen)
+
+    def __repr__(self):
+        return (f"Ergebnis({len(self)} Kommunen, verteilt={self.verteilt:,.2f}, "
+                f"runden={self.runden}, validiert={self.validiert})")
+
+    @property
+    def fixiert(self):
+        """Maske der auf den Mindestbetrag bzw. Wert aus Runde 1 fixierten Kommunen"""
+        return (self.status == STATUS_MINDESTBETRAG) | (self.status == STATUS_WERT_RUNDE_1)
+
+    def status_texte(self):
+        """Liefert die Status-Texte wie in rechner.ergebnis_df"""
+        texte = status_texte(self.status, self.runde, self.erste_berechnung)
+        if self.ausgleich is not None and 'Rundungsausgleich' not in texte[self.ausgleich]:
+            texte[self.ausgleich] += ' + Rundungsausgleich'
+        return texte
+
+    def als_dataframe(self):
+        """
+        Erstellt den Ergebnis-DataFrame (Spalten wie rechner.ergebnis_df)
+
+        Jeder Aufruf liefert einen neuen DataFrame, der beliebig verändert
+        werden kann, ohne das Ergebnis zu beeinflussen.
+        """
+        import pandas as pd
+
+        spalten = {
+            'Name': self.namen,
+            'Wert_2019': self.wert_2019,
+            'Kinder_U3': self.kinder_u3,
+            'Status': self.status_texte(),
+            'Sockelbetrag': self.sockelbetrag,
+            'U3_Anteil': self.u3_anteil,
+            'Zwischensumme': self.zwischensumme,
+            'Endbetrag': self.endbetrag,
+            'Runde': self.runde,
+            'Erste_Berechnung': self.erste_berechnung,
+        }
+        if self.cent:
+            for name in ('u3_anteil', 'zwischensumme', 'endbetrag', 'erste_berechnung'):
+                spalten[name.title() + '_Cent'] = self.cent[name]
+            spalten['Endbetrag_vor_Rundung'] = self.endbetrag_vor_rundung
+            if self.parameter.rundungsverfahren == 'hamilton':
+                spalten['Rundungsanpassung'] = self.rundungsanpassung
+                spalten['Endbetrag_vor_Rundung_Cent'] = self.cent['endbetrag_vor_rundung']
+            else:
+                spalten['Endbetrag_vor_Rundung_Cent'] = self.cent['endbetrag_vor_rundung']
+                spalten['Rundungsanpassung'] = self.rundungsanpassung
+        else:
+            spalten['Endbetrag_vor_Rundung'] = self.endbetrag_vor_rundung
+            spalten['Rundungsanpassung'] = self.rundungsanpassung
+
+        return pd.DataFrame({name: np.array(werte) for name, werte in spalten.items()})
+
+
+def parameter_pruefen(parameter):
+    """
+    Prüft die Parameter einer Berechnung
+
+    Args:
+        parameter: Parameter, Dictionary mit denselben Schlüsseln oder
+                   Gesamtsumme (übrige Parameter mit Standardwerten)
+
+    Returns:
+        Parameter
+
+    Raises:
+        ValueError: Bei unbekanntem Verfahren oder ungültigen Beträgen
+    """
+    if isinstance(parameter, dict):
+        parameter = Parameter(**parameter)
+    elif not isinstance(parameter, Parameter):
+        parameter = Parameter(parameter)
+    if parameter.verfahren not in VERFAHREN:
+        raise ValueError(f"Unbekanntes Berechnungsverfahren: {parameter.verfahren}")
+    if parameter.rundungsverfahren not in RUNDUNGSVERFAHREN:
+        raise ValueError(f"Unbekanntes Rundungsverfahren: {parameter.rundungsverfahren}")
+    if not 0 <= parameter.sockelbetrag_prozent <= 1:
+        raise ValueError("Der Sockelbetrag muss zwischen 0 und 1 liegen")
+    return parameter
+
+
+def berechne(kommunen, parameter):
+    """
+    Berechnet die Fördermittelverteilung ohne Zustand (reentrant)
+
+    Liefert dieselben Beträge, Runden und Status wie
+    FoerdermittelRechner.berechne_verteilung() mit denselben Parametern.
+
+    Args:
+        kommunen: Kommunendaten in einer Form, die kommunen_spalten()
+                  versteht (DataFrame, Dictionary von Spalten, Iterierbares
+                  von Dictionaries oder Tupeln)
+        parameter: Parameter, Dictionary oder Gesamtsumme (siehe parameter_pruefen)
+
+    Returns:
+        Unveränderliches Ergebnis
+
+    Raises:
+        ValueError: Bei ungültigen Parametern oder Kommunendaten
+    """
+    return berechne_mit_protokoll(kommunen, parameter_pruefen(parameter))[0]
+
+
+def berechne_mit_protokoll(kommunen, parameter, rueckruf=None):
+    """
+    Wie berechne(), liefert zusätzlich die Angaben für das Berechnungsprotokoll
+
+    Wird von FoerdermittelRechner für die Verfahren 'numpy', 'exakt' und
+    'cent' verwendet. Die Parameter werden nicht geprüft.
+
+    Args:
+        kommunen: Kommunendaten (siehe berechne)
+        parameter: Parameter
+        rueckruf: Optionale Funktion rueckruf(runde, max_runden), die zu
+                  Beginn jeder Runde aufgerufen wird
+
+    Returns:
+        Tuple (ergebnis, protokoll, rundung) mit dem Protokoll der Runden
+        (siehe foerdermittel_kern) und den Angaben zur Rundung wie im
+        Ereignis RUNDUNG_ANGEWENDET
+    """
+    namen, wert_2019, kinder_u3 = kommunen_spalten(kommunen)
+    # Eigene Kopien, damit spätere Änderungen am Aufrufer das Ergebnis nicht verändern
+    namen, wert_2019, kinder_u3 = namen.copy(), wert_2019.copy(), kinder_u3.copy()
+    gesamtsumme = parameter.gesamtsumme
+    mindestbetrag = parameter.mindestbetrag
+
+    cent = {}
+    if parameter.verfahren == 'cent':
+        runden = berechne_runden_cent(in_cent(wert_2019), kinder_u3, in_cent(gesamtsumme),
+                                      in_cent(mindestbetrag), parameter.sockelbetrag_prozent,
+                                      namen=namen, rueckruf=rueckruf)
+        for name in ('u3_anteil', 'zwischensumme', 'endbetrag', 'erste_berechnung'):
+            cent[name] = runden[name]
+        sockelbetrag = runden['sockelbetrag'] / 100
+    else:
+        sockelbetrag = wert_2019 * parameter.sockelbetrag_prozent
+        if parameter.verfahren == 'exakt':
+            runden = berechne_runden_exakt(sockelbetrag, kinder_u3, gesamtsumme, mindestbetrag,
+                                           rueckruf=rueckruf)
+        else:
+            runden = berechne_runden_numpy(sockelbetrag, kinder_u3, gesamtsumme, mindestbetrag,
+                                           namen=namen, rueckruf=rueckruf)
+    status = runden['status']
+    fixiert = (status == STATUS_MINDESTBETRAG) | (status == STATUS_WERT_RUNDE_1)
+
+    # Rundung auf ganze Euro
+    ausgleich = None
+    rundung = {'verfahren': parameter.rundungsverfahren}
+    if cent:
+        vor_rundung_cent = cent['endbetrag']
+        if parameter.rundungsverfahren == 'hamilton':
+            gerundet_cent = runde_groesste_reste(vor_rundung_cent, in_cent(gesamtsumme),
+                                                 fixiert=fixiert,
+                                                 mindestbetrag=in_cent(mindestbetrag), einheit=100)
+            rundung.update(_hamilton_angaben(vor_rundung_cent, gerundet_cent, einheit=100))
+        else:
+            gerundet_cent, ausgleich, differenz_cent = runde_cent_auf_euro(vor_rundung_cent,
+                                                                           in_cent(gesamtsumme))
+            rundung.update(summe_vor_rundung=vor_rundung_cent.sum() / 100,
+                           summe_nach_rundung=(in_cent(gesamtsumme) - differenz_cent) / 100,
+                           rundungs_differenz=differenz_cent / 100,
+                           **_ausgleich_angaben(namen, gerundet_cent, ausgleich, differenz_cent,
+                                                einheit=100))
+        cent['endbetrag_vor_rundung'] = vor_rundung_cent
+        cent['endbetrag'] = gerundet_cent
+        endbetrag_vor_rundung = vor_rundung_cent / 100
+        endbetrag = gerundet_cent / 100
+        rundungsanpassung = (gerundet_cent - vor_rundung_cent) / 100
+        verteilt = int(gerundet_cent.sum()) / 100
+        differenz = abs(int(in_cent(gesamtsumme)) - int(gerundet_cent.sum())) / 100
+    else:
+        endbetrag_vor_rundung = runden['endbetrag']
+        if parameter.rundungsverfahren == 'hamilton':
+            endbetrag = runde_groesste_reste(endbetrag_vor_rundung, gesamtsumme, fixiert=fixiert,
+                                             mindestbetrag=mindestbetrag)
+            rundung.update(_hamilton_angaben(endbetrag_vor_rundung, endbetrag))
+        else:
+            endbetrag = np.round(endbetrag_vor_rundung, 0)
+            summe_nach_rundung = endbetrag.sum()
+            rundungs_differenz = gesamtsumme - summe_nach_rundung
+            if abs(rundungs_differenz) >= 1:
+                ausgleich = int(endbetrag.argmax())
+                endbetrag[ausgleich] += rundungs_differenz
+            rundung.update(summe_vor_rundung=endbetrag_vor_rundung.sum(),
+                           summe_nach_rundung=summe_nach_rundung,
+                           rundungs_differenz=rundungs_differenz,
+                           **_ausgleich_angaben(namen, endbetrag, ausgleich, rundungs_differenz))
+        rundungsanpassung = endbetrag - endbetrag_vor_rundung
+        verteilt = float(endbetrag.sum())
+        differenz = abs(gesamtsumme - verteilt)
+
+    def euro(name):
+        return cent[name] / 100 if cent else runden[name]
+
+    ergebnis = Ergebnis(
+        parameter=parameter,
+        namen=namen,
+        wert_2019=wert_2019,
+        kinder_u3=kinder_u3,
+        sockelbetrag=sockelbetrag,
+        u3_anteil=euro('u3_anteil'),
+        zwischensumme=euro('zwischensumme'),
+        erste_berechnung=euro('erste_berechnung'),
+        endbetrag_vor_rundung=endbetrag_vor_rundung,
+        endbetrag=endbetrag,
+        rundungsanpassung=rundungsanpassung,
+        runde=runden['runde'],
+        status=status,
+        ausgleich=ausgleich,
+        cent=cent,
+        runden=len(runden['protokoll']),
+        alle_fixiert=runden['alle_fixiert'],
+        verteilt=verteilt,
+        validiert=differenz <= TOLERANZ,
+    )
+    return ergebnis, runden['protokoll'], rundung
+
+
+def _ausgleich_angaben(namen, gerundet, ausgleich, differenz, einheit=1):
+    """Angaben zum Rundungsausgleich bei der Kommune mit der größten Fördersumme"""
+    if ausgleich is None:
+        return {'ausgleich_kommune': None, 'alter_betrag': None, 'neuer_betrag': None}
+    return {'ausgleich_kommune': namen[ausgleich],
+            'alter_betrag': (gerundet[ausgleich] - differenz) / einheit,
+            'neuer_betrag': gerundet[ausgleich] / einheit}
+
+
+def _hamilton_angaben(vor_rundung, gerundet, einheit=1):
+    """Angaben zur Rundung nach größten Resten"""
+    anpassung = gerundet - vor_rundung
+    return {'summe_vor_rundung': vor_rundung.sum() / einheit,
+            'summe_nach_rundung': gerundet.sum() / einheit,
+            'rundungs_differenz': (gerundet.sum() - vor_rundung.sum()) / einheit,
+            'aufgerundet': np.count_nonzero(anpassung > 0),
+            'abgerundet': np.count_nonzero(anpassung < 0)}
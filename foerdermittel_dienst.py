@@ -0,0 +1,498 @@
+"""
+Lokaler HTTP-Dienst für die Berechnung der Fördermittelverteilung
+
+Andere Programme können die Verteilung über HTTP berechnen lassen, ohne
+jedes Mal einen Python-Prozess zu starten. Der Dienst nutzt nur die
+Standardbibliothek (http.server) und lauscht standardmäßig nur auf
+127.0.0.1. Die Berechnungen laufen auf einem Pool fester Größe (Prozesse
+oder Threads), dessen Worker Berechnung, pandas und openpyxl beim Start
+einmal importieren. Nimmt der Pool keine weiteren Anfragen an, antwortet
+der Dienst mit 503.
+
+Endpunkte:
+    POST /berechnung  Berechnet die Verteilung, Antwort als JSON oder Excel-Datei
+    GET  /health      Zustand des Dienstes und Auslastung des Pools
+    GET  /zeiten      Laufzeitstatistik (Warten, Berechnung, Export) seit dem Start
+
+Anfrage an /berechnung:
+    {
+        "kommunen": [{"Name": "Stadt A", "Wert_2019": 50000, "Kinder_U3": 120}, ...],
+        "gesamtsumme": 500000,
+        "mindestbetrag": 12500,           (optional)
+        "sockelbetrag_prozent": 0.5,      (optional)
+        "verfahren": "numpy",             (optional)
+        "rundungsverfahren": "maximum",   (optional)
+        "format": "json"                  (optional, "json" oder "xlsx")
+    }
+    "kommunen" kann auch eine Liste von [Name, Wert_2019, Kinder_U3] oder ein
+    Objekt mit den Spalten Name, Wert_2019 und Kinder_U3 sein. Das Format
+    kann alternativ über den Header "Accept" gewählt werden.
+
+Aufruf:
+    python foerdermittel_dienst.py [--port 8080] [--arbeiter 4] [--threads]
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Antwortformate
+FORMAT_JSON = 'json'
+FORMAT_XLSX = 'xlsx'
+INHALTSTYPEN = {
+    FORMAT_JSON: 'application/json; charset=utf-8',
+    FORMAT_XLSX: 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+# Größte angenommene Anfrage in Bytes
+MAX_ANFRAGE = 64 * 1024 * 1024
+
+# Erfasste Laufzeiten je Berechnung
+ZEITEN = ('warten', 'berechnung', 'export', 'gesamt')
+
+# Ergebnis-Cache des Workers (im Thread-Modus gemeinsam, sonst je Prozess)
+_cache = None
+_cache_sperre = threading.Lock()
+
+
+class UngueltigeAnfrage(ValueError):
+    """Die Anfrage enthält ungültige Kommunendaten oder Parameter"""
+
+
+class DienstUeberlastet(RuntimeError):
+    """Alle Plätze des Pools sind belegt"""
+
+
+def _vorwaermen():
+    """Importiert Berechnung, Export, pandas und openpyxl (Initializer der Worker)"""
+    import pandas  # noqa: F401
+    import openpyxl  # noqa: F401
+    import foerdermittel_berechnung  # noqa: F401
+    import foerdermittel_export  # noqa: F401
+
+
+def _bereit():
+    """Leere Aufgabe, damit der Pool seine Worker beim Start anlegt"""
+    return os.getpid()
+
+
+def _ergebnis_cache():
+    """Liefert den Ergebnis-Cache des Workers (nur Arbeitsspeicher)"""
+    global _cache
+    with _cache_sperre:
+        if _cache is None:
+            from foerdermittel_ergebniscache import ErgebnisCache
+            _cache = ErgebnisCache()
+        return _cache
+
+
+def berechne_anfrage(anfrage, cache=True):
+    """
+    Berechnet die Verteilung für eine Anfrage (läuft im Worker)
+
+    Args:
+        anfrage: Dictionary wie im Modul beschrieben
+        cache: True verwendet den Ergebnis-Cache des Workers
+
+    Returns:
+        Dictionary mit 'inhalt' (Bytes der Antwort), 'format', 'aus_cache'
+        und 'zeiten' (Berechnung und Export in Sekunden)
+
+    Raises:
+        UngueltigeAnfrage: Bei fehlenden oder ungültigen Daten bzw. Parametern
+    """
+    import numpy as np
+    from foerdermittel_berechnung import berechne, Parameter, VERFAHREN, RUNDUNGSVERFAHREN
+    from foerdermittel_kommunen import kommunen_spalten
+
+    if not isinstance(anfrage, dict):
+        raise UngueltigeAnfrage("Die Anfrage muss ein JSON-Objekt sein")
+    format = anfrage.get('format', FORMAT_JSON)
+    if format not in INHALTSTYPEN:
+        raise UngueltigeAnfrage(f"Unbekanntes Format: {format}")
+    verfahren = anfrage.get('verfahren', 'numpy')
+    rundungsverfahren = anfrage.get('rundungsverfahren', 'maximum')
+    if verfahren not in VERFAHREN:
+        raise UngueltigeAnfrage(f"Unbekanntes Berechnungsverfahren: {verfahren}")
+    if rundungsverfahren not in RUNDUNGSVERFAHREN:
+        raise UngueltigeAnfrage(f"Unbekanntes Rundungsverfahren: {rundungsverfahren}")
+
+    try:
+        gesamtsumme = float(anfrage['gesamtsumme'])
+        mindestbetrag = float(anfrage.get('mindestbetrag', 12500))
+        sockelbetrag_prozent = float(anfrage.get('sockelbetrag_prozent', 0.5))
+    except KeyError:
+        raise UngueltigeAnfrage("Die Gesamtsumme fehlt")
+    except (TypeError, ValueError):
+        raise UngueltigeAnfrage("Gesamtsumme, Mindestbetrag und Sockelbetrag müssen Zahlen sein")
+    if not all(math.isfinite(wert) for wert in (gesamtsumme, mindestbetrag, sockelbetrag_prozent)):
+        raise UngueltigeAnfrage("Gesamtsumme, Mindestbetrag und Sockelbetrag müssen endlich sein")
+    if gesamtsumme <= 0:
+        raise UngueltigeAnfrage("Die Gesamtsumme muss positiv sein")
+    if mindestbetrag < 0:
+        raise UngueltigeAnfrage("Der Mindestbetrag darf nicht negativ sein")
+    if not 0 <= sockelbetrag_prozent <= 1:
+        raise UngueltigeAnfrage("Der Sockelbetrag muss zwischen 0 und 1 liegen")
+
+    start = time.perf_counter()
+    try:
+        namen, wert_2019, kinder_u3 = kommunen_spalten(anfrage['kommunen'])
+    except KeyError as e:
+        raise UngueltigeAnfrage(f"Fehlende Angabe in den Kommunendaten: {e}")
+    except (TypeError, ValueError) as e:
+        raise UngueltigeAnfrage(f"Ungültige Kommunendaten: {e}")
+    if len(namen) == 0:
+        raise UngueltigeAnfrage("Keine Kommunen angegeben")
+    # Wie beim Import: fehlende, unendliche oder negative Werte sind ungültig
+    for spalte, werte in (('Wert_2019', wert_2019), ('Kinder_U3', kinder_u3)):
+        ungueltig = ~np.isfinite(werte) | (werte < 0)
+        if ungueltig.any():
+            zeilen = ', '.join(str(zeile) for zeile in np.flatnonzero(ungueltig)[:5] + 1)
+            raise UngueltigeAnfrage(f"{spalte} muss eine endliche, nicht negative Zahl sein "
+                                    f"(Kommune Nr. {zeilen})")
+
+    # Zustandslose Berechnung, sicher auch in mehreren Threads gleichzeitig
+    kommunen = {'Name': namen, 'Wert_2019': wert_2019, 'Kinder_U3': kinder_u3}
+    parameter = Parameter(gesamtsumme, mindestbetrag, sockelbetrag_prozent, verfahren,
+                          rundungsverfahren)
+    if cache:
+        berechnet, herkunft = _ergebnis_cache().berechne_mit_herkunft(kommunen, parameter)
+    else:
+        berechnet, herkunft = berechne(kommunen, parameter), None
+    berechnung = time.perf_counter() - start
+
+    start = time.perf_counter()
+    ergebnis = berechnet.als_dataframe()
+    if format == FORMAT_XLSX:
+        import io
+        from foerdermittel_export import schreibe_excel
+
+        puffer = io.BytesIO()
+        schreibe_excel(puffer, ergebnis, gesamtsumme, mindestbetrag, sockelbetrag_prozent)
+        inhalt = puffer.getvalue()
+    else:
+        from foerdermittel_export import export_parameter
+
+        antwort = {
+            'parameter': export_parameter(gesamtsumme, mindestbetrag, sockelbetrag_prozent),
+            'kommunen': len(berechnet),
+            'verteilt': berechnet.verteilt,
+            'validiert': bool(berechnet.validiert),
+            'ergebnis': json.loads(ergebnis.to_json(orient='records', double_precision=15)),
+        }
+        inhalt = json.dumps(antwort, ensure_ascii=False).encode('utf-8')
+    export = time.perf_counter() - start
+
+    return {'inhalt': inhalt, 'format': format, 'aus_cache': herkunft is not None,
+            'zeiten': {'berechnung': berechnung, 'export': export}}
+
+
+class Zeitstatistik:
+    def __init__(self):
+        """
+        Threadsichere Laufzeitstatistik der Berechnungen
+        """
+        self._sperre = threading.Lock()
+        self.anfragen = 0
+        self.fehler = 0
+        self.abgelehnt = 0
+        self.cache_treffer = 0
+        self._summen = dict.fromkeys(ZEITEN, 0.0)
+        self._minimum = dict.fromkeys(ZEITEN, None)
+        self._maximum = dict.fromkeys(ZEITEN, 0.0)
+        self._letzte = {}
+
+    def erfassen(self, zeiten, aus_cache=False):
+        """Erfasst die Laufzeiten (Sekunden je Schlüssel aus ZEITEN) einer Berechnung"""
+        with self._sperre:
+            self.anfragen += 1
+            self.cache_treffer += bool(aus_cache)
+            for name, dauer in zeiten.items():
+                self._summen[name] += dauer
+                if self._minimum[name] is None or dauer < self._minimum[name]:
+                    self._minimum[name] = dauer
+                self._maximum[name] = max(self._maximum[name], dauer)
+            self._letzte = dict(zeiten)
+
+    def fehler_erfassen(self, abgelehnt=False):
+        """Zählt eine fehlgeschlagene oder wegen Überlastung abgelehnte Anfrage"""
+        with self._sperre:
+            if abgelehnt:
+                self.abgelehnt += 1
+            else:
+                self.fehler += 1
+
+    def als_dict(self):
+        """Liefert die Statistik in Millisekunden"""
+        def ms(wert):
+            return None if wert is None else round(wert * 1000, 3)
+
+        with self._sperre:
+            return {
+                'anfragen': self.anfragen,
+                'fehler': self.fehler,
+                'abgelehnt': self.abgelehnt,
+                'cache_treffer': self.cache_treffer,
+                'mittel_ms': {name: ms(self._summen[name] / self.anfragen) if self.anfragen else None
+                              for name in ZEITEN},
+                'minimum_ms': {name: ms(self._minimum[name]) for name in ZEITEN},
+                'maximum_ms': {name: ms(self._maximum[name]) if self.anfragen else None
+                               for name in ZEITEN},
+                'letzte_ms': {name: ms(dauer) for name, dauer in self._letzte.items()},
+            }
+
+
+class Rechendienst:
+    def __init__(self, arbeiter=None, threads=False, warteschlange=None, cache=True):
+        """
+        Pool für Berechnungsanfragen mit begrenzter Anzahl wartender Anfragen
+
+        Args:
+            arbeiter: Anzahl der Worker (Standard: alle CPU-Kerne)
+            threads: True rechnet in Threads statt in Worker-Prozessen
+            warteschlange: Höchstzahl gleichzeitig angenommener Anfragen
+                           (laufend und wartend, Standard: 4 je Worker)
+            cache: True hält die letzten Ergebnisse je Worker im Arbeitsspeicher
+        """
+        self.arbeiter = arbeiter or os.cpu_count() or 1
+        self.threads = threads
+        self.cache = cache
+        self.warteschlange = warteschlange or 4 * self.arbeiter
+        self.statistik = Zeitstatistik()
+        self.start = time.time()
+        self._plaetze = threading.BoundedSemaphore(self.warteschlange)
+        self._sperre = threading.Lock()
+        self._laufend = 0
+
+        _vorwaermen()
+        if threads:
+            self._pool = ThreadPoolExecutor(max_workers=self.arbeiter)
+        else:
+            self._pool = ProcessPoolExecutor(max_workers=self.arbeiter, initializer=_vorwaermen)
+            # Worker sofort anlegen, damit die erste Anfrage nicht auf den Import wartet
+            wait([self._pool.submit(_bereit) for _ in range(self.arbeiter)])
+
+    def berechne(self, anfrage):
+        """
+        Berechnet eine Anfrage auf dem Pool
+
+        Args:
+            anfrage: Dictionary wie im Modul beschrieben
+
+        Returns:
+            Dictionary wie berechne_anfrage(), 'zeiten' zusätzlich mit
+            'warten' und 'gesamt'
+
+        Raises:
+            DienstUeberlastet: Wenn bereits 'warteschlange' Anfragen angenommen sind
+            UngueltigeAnfrage: Bei ungültigen Daten oder Parametern
+        """
+        if not self._plaetze.acquire(blocking=False):
+            self.statistik.fehler_erfassen(abgelehnt=True)
+            raise DienstUeberlastet(f"Alle {self.warteschlange} Plätze sind belegt")
+        start = time.perf_counter()
+        try:
+            with self._sperre:
+                self._laufend += 1
+            try:
+                antwort = self._pool.submit(berechne_anfrage, anfrage, self.cache).result()
+            except Exception:
+                self.statistik.fehler_erfassen()
+                raise
+        finally:
+            with self._sperre:
+                self._laufend -= 1
+            self._plaetze.release()
+
+        gesamt = time.perf_counter() - start
+        zeiten = antwort['zeiten']
+        zeiten = antwort['zeiten'] = {
+            'warten': max(gesamt - zeiten['berechnung'] - zeiten['export'], 0.0),
+            'berechnung': zeiten['berechnung'],
+            'export': zeiten['export'],
+            'gesamt': gesamt,
+        }
+        self.statistik.erfassen(zeiten, antwort['aus_cache'])
+        return antwort
+
+    def zustand(self):
+        """Liefert Zustand und Auslastung des Dienstes"""
+        with self._sperre:
+            laufend = self._laufend
+        return {
+            'status': 'ok',
+            'pid': os.getpid(),
+            'laufzeit_s': round(time.time() - self.start, 1),
+            'arbeiter': self.arbeiter,
+            'art': 'threads' if self.threads else 'prozesse',
+            'angenommen': laufend,
+            'warteschlange': self.warteschlange,
+            'cache': self.cache,
+        }
+
+    def beenden(self):
+        """Beendet den Pool"""
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+
+class _Anfragebearbeitung(BaseHTTPRequestHandler):
+    server_version = 'Foerdermitteldienst/1.0'
+
+    def log_message(self, format, *args):
+        if self.server.protokoll:
+            super().log_message(format, *args)
+
+    def _senden(self, status, inhalt, inhaltstyp=INHALTSTYPEN[FORMAT_JSON], kopfzeilen=()):
+        self.send_response(status)
+        self.send_header('Content-Type', inhaltstyp)
+        self.send_header('Content-Length', str(len(inhalt)))
+        for name, wert in kopfzeilen:
+            self.send_header(name, wert)
+        self.end_headers()
+        self.wfile.write(inhalt)
+
+    def _senden_json(self, status, daten, kopfzeilen=()):
+        self._senden(status, json.dumps(daten, ensure_ascii=False).encode('utf-8'),
+                     kopfzeilen=kopfzeilen)
+
+    def _fehler(self, status, meldung, kopfzeilen=()):
+        self._senden_json(status, {'fehler': meldung}, kopfzeilen)
+
+    def do_GET(self):
+        dienst = self.server.dienst
+        pfad = self.path.split('?', 1)[0].rstrip('/')
+        if pfad == '/health':
+            self._senden_json(200, dienst.zustand())
+        elif pfad == '/zeiten':
+            self._senden_json(200, dienst.statistik.als_dict())
+        else:
+            self._fehler(404, f"Unbekannter Pfad: {pfad}")
+
+    def do_POST(self):
+        pfad = self.path.split('?', 1)[0].rstrip('/')
+        if pfad != '/berechnung':
+            self._fehler(404, f"Unbekannter Pfad: {pfad}")
+            return
+
+        try:
+            laenge = int(self.headers.get('Content-Length', 0))
+        except ValueError:
+            laenge = -1
+        if laenge <= 0:
+            self._fehler(411, "Content-Length fehlt")
+            return
+        if laenge > MAX_ANFRAGE:
+            self.close_connection = True
+            self._fehler(413, f"Anfrage größer als {MAX_ANFRAGE} Bytes")
+            return
+        try:
+            anfrage = json.loads(self.rfile.read(laenge))
+        except (ValueError, UnicodeDecodeError) as e:
+            self._fehler(400, f"Ungültiges JSON: {e}")
+            return
+        if isinstance(anfrage, dict) and 'format' not in anfrage:
+            if INHALTSTYPEN[FORMAT_XLSX] in self.headers.get('Accept', ''):
+                anfrage['format'] = FORMAT_XLSX
+
+        try:
+            antwort = self.server.dienst.berechne(anfrage)
+        except UngueltigeAnfrage as e:
+            self._fehler(400, str(e))
+            return
+        except DienstUeberlastet as e:
+            self._fehler(503, str(e), [('Retry-After', '1')])
+            return
+        except Exception as e:
+            self._fehler(500, f"{type(e).__name__}: {e}")
+            return
+
+        # Laufzeiten für Clients und Entwicklerwerkzeuge
+        server_timing = ', '.join(f"{name};dur={dauer * 1000:.3f}"
+                                  for name, dauer in antwort['zeiten'].items())
+        kopfzeilen = [('Server-Timing', server_timing)]
+        if antwort['format'] == FORMAT_XLSX:
+            kopfzeilen.append(('Content-Disposition',
+                               'attachment; filename="foerdermittel_verteilung.xlsx"'))
+        self._senden(200, antwort['inhalt'], INHALTSTYPEN[antwort['format']], kopfzeilen)
+
+
+def erstelle_server(host='127.0.0.1', port=8080, arbeiter=None, threads=False,
+                    warteschlange=None, cache=True, protokoll=False):
+    """
+    Erstellt den HTTP-Server samt Pool
+
+    Args:
+        host: Adresse, an die der Server gebunden wird (Standard: nur lokal)
+        port: Port (0 wählt einen freien Port, siehe server.server_address)
+        arbeiter: Anzahl der Worker (Standard: alle CPU-Kerne)
+        threads: True rechnet in Threads statt in Worker-Prozessen
+        warteschlange: Höchstzahl gleichzeitig angenommener Anfragen
+        cache: True hält die letzten Ergebnisse je Worker im Arbeitsspeicher
+        protokoll: True schreibt jede Anfrage auf die Fehlerausgabe
+
+    Returns:
+        ThreadingHTTPServer mit dem Rechendienst als Attribut 'dienst';
+        nach server.shutdown() muss server.dienst.beenden() aufgerufen werden
+    """
+    dienst = Rechendienst(arbeiter, threads, warteschlange, cache)
+    try:
+        server = ThreadingHTTPServer((host, port), _Anfragebearbeitung)
+    except OSError:
+        dienst.beenden()
+        raise
+    server.daemon_threads = True
+    server.dienst = dienst
+    server.protokoll = protokoll
+    return server
+
+
+def main(argumente=None):
+    """
+    Startet den Dienst und läuft bis zum Abbruch (Strg+C)
+
+    Args:
+        argumente: Liste der Argumente (Standard: sys.argv[1:])
+    """
+    parser = argparse.ArgumentParser(
+        prog='foerdermittel_dienst',
+        description="Lokaler HTTP-Dienst für die Berechnung der Fördermittelverteilung.")
+    parser.add_argument('--host', default='127.0.0.1',
+                        help="Adresse (Standard: 127.0.0.1, nur lokal erreichbar)")
+    parser.add_argument('--port', type=int, default=8080, help="Port (Standard: 8080)")
+    parser.add_argument('--arbeiter', type=int, default=None,
+                        help="Anzahl der Worker (Standard: alle CPU-Kerne)")
+    parser.add_argument('--threads', action='store_true',
+                        help="In Threads statt in Worker-Prozessen rechnen")
+    parser.add_argument('--warteschlange', type=int, default=None,
+                        help="Höchstzahl gleichzeitig angenommener Anfragen (Standard: 4 je Worker)")
+    parser.add_argument('--ohne-cache', action='store_true',
+                        help="Ergebnisse nicht im Arbeitsspeicher zwischenspeichern")
+    parser.add_argument('--protokoll', action='store_true', help="Jede Anfrage protokollieren")
+    args = parser.parse_args(argumente)
+    if args.arbeiter is not None and args.arbeiter < 1:
+        parser.error("--arbeiter muss mindestens 1 sein")
+    if args.warteschlange is not None and args.warteschlange < 1:
+        parser.error("--warteschlange muss mindestens 1 sein")
+
+    server = erstelle_server(args.host, args.port, args.arbeiter, args.threads,
+                             args.warteschlange, not args.ohne_cache, args.protokoll)
+    host, port = server.server_address[:2]
+    print(f"Fördermittel-Dienst läuft auf http://{host}:{port} "
+          f"({server.dienst.arbeiter} {'Threads' if args.threads else 'Prozesse'})",
+          file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.dienst.beenden()
+
+
+if __name__ == "__main__":
+    main()
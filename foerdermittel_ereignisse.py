@@ -0,0 +1,180 @@
+import logging
+
+# Level der Ereignisse (entsprechen den Level-Nummern des logging-Moduls)
+DEBUG = logging.DEBUG
+INFO = logging.INFO
+WARNUNG = logging.WARNING
+STILL = logging.CRITICAL + 10
+
+# Ereignistypen
+RUNDE_GESTARTET = 'runde_gestartet'
+KOMMUNE_FIXIERT = 'kommune_fixiert'
+RUNDE_BEENDET = 'runde_beendet'
+BERECHNUNG_ABGESCHLOSSEN = 'berechnung_abgeschlossen'
+RUNDUNG_ANGEWENDET = 'rundung_angewendet'
+VALIDIERUNG = 'validierung'
+EXPORT = 'export'
+
+# Phasen für Fortschrittsmeldungen (siehe foerdermittel_auftrag)
+PHASE_FIXIERUNG = 'fixierung'
+PHASE_RUNDUNG = 'rundung'
+PHASE_VALIDIERUNG = 'validierung'
+PHASE_EXPORT = 'export'
+PHASE_SWEEP = 'sweep'
+PHASE_IMPORT = 'import'
+
+
+def formatiere(ereignis):
+    """
+    Erzeugt den bisherigen Konsolentext zu einem Ereignis
+
+    Args:
+        ereignis: Dictionary mit dem Schlüssel 'ereignis' und den Ereignisdaten
+
+    Returns:
+        Liste der Textzeilen (kann leer sein)
+    """
+    typ = ereignis['ereignis']
+
+    if typ == RUNDE_GESTARTET:
+        return [f"\n=== Runde {ereignis['runde']} ===",
+                f"Verfügbares Budget: {ereignis['verfuegbares_budget']:,.2f} €",
+                f"Summe Sockelbeträge: {ereignis['summe_sockel']:,.2f} €",
+                f"Restbudget für U3-Verteilung: {ereignis['restbudget']:,.2f} €",
+                f"U3-Kinder gesamt: {ereignis['summe_u3']}",
+                f"Multiplikator: {ereignis['multiplikator']:,.2f} €/Kind"]
+
+    if typ == KOMMUNE_FIXIERT:
+        if ereignis['wert_aus_runde_1']:
+            return [f"  {ereignis['name']}: Verwendet Wert aus Runde 1"]
+        return [f"  {ereignis['name']}: Auf Mindestbetrag fixiert"]
+
+    if typ == RUNDE_BEENDET:
+        if ereignis['neu_fixiert'] == 0:
+            return []
+        return [f"Neu fixierte Kommunen: {ereignis['neu_fixiert']}"]
+
+    if typ == BERECHNUNG_ABGESCHLOSSEN:
+        if ereignis['alle_fixiert']:
+            return [f"\n=== Runde {ereignis['runden'] + 1} ===",
+                    "Alle Kommunen wurden bearbeitet."]
+        if ereignis['abgeschlossen']:
+            return [f"\nBerechnung abgeschlossen nach {ereignis['runden']} Runden."]
+        return []
+
+    if typ == RUNDUNG_ANGEWENDET:
+        if ereignis['verfahren'] == 'hamilton':
+            return ["\n=== RUNDUNG AUF GANZE EURO (GRÖSSTE RESTE) ===",
+                    f"Summe vor Rundung: {ereignis['summe_vor_rundung']:,.2f} €",
+                    f"Summe nach Rundung: {ereignis['summe_nach_rundung']:,.0f} €",
+                    f"Aufgerundet: {ereignis['aufgerundet']} Kommunen, "
+                    f"abgerundet: {ereignis['abgerundet']} Kommunen"]
+        zeilen = ["\n=== RUNDUNG AUF GANZE EURO ===",
+                  f"Summe vor Rundung: {ereignis['summe_vor_rundung']:,.2f} €",
+                  f"Summe nach Rundung: {ereignis['summe_nach_rundung']:,.0f} €",
+                  f"Rundungsdifferenz: {ereignis['rundungs_differenz']:,.0f} €"]
+        if ereignis['ausgleich_kommune'] is not None:
+            zeilen.append(f"Ausgleich bei {ereignis['ausgleich_kommune']}: "
+                          f"{ereignis['alter_betrag']:,.0f} € → {ereignis['neuer_betrag']:,.0f} € "
+                          f"(Differenz: {ereignis['rundungs_differenz']:+,.0f} €)")
+        return zeilen
+
+    if typ == VALIDIERUNG:
+        zeilen = ["\n=== VALIDIERUNG ===",
+                  f"Gesamtsumme (Soll): {ereignis['soll']:,.2f} €",
+                  f"Gesamtsumme (Ist):  {ereignis['ist']:,.2f} €",
+                  f"Differenz:          {ereignis['differenz']:,.2f} €"]
+        if ereignis['erfolgreich']:
+            zeilen.append("✓ Validierung erfolgreich!")
+        else:
+            zeilen.append("⚠️ WARNUNG: Differenz größer als 1 Cent!")
+        return zeilen
+
+    if typ == EXPORT:
+        format = ereignis.get('format', 'xlsx')
+        if format == 'xlsx':
+            return [f"\n✓ Excel-Datei '{ereignis['dateiname']}' wurde erfolgreich erstellt!"]
+        return [f"\n✓ {format.upper()}-Datei '{ereignis['dateiname']}' wurde erfolgreich erstellt!"]
+
+    return [str(ereignis)]
+
+
+class Ereignisausgabe:
+    def __init__(self, level=INFO):
+        """
+        Empfänger für die Ereignisse einer Berechnung
+
+        Der Rechner legt jedes Ereignis ab dem eingestellten Level als
+        Dictionary in rechner.berechnungs_log ab und übergibt es an
+        verarbeite(). Diese Basisklasse gibt nichts aus und eignet sich, wenn
+        nur das strukturierte Protokoll benötigt wird. Eigene Ausgaben
+        überschreiben verarbeite().
+
+        Args:
+            level: Mindest-Level der Ereignisse (DEBUG enthält zusätzlich
+                   jede einzelne fixierte Kommune)
+        """
+        self.level = level
+
+    def verarbeite(self, ereignis):
+        """Wird für jedes Ereignis ab dem eingestellten Level aufgerufen"""
+        pass
+
+
+class KonsolenAusgabe(Ereignisausgabe):
+    def __init__(self, level=DEBUG):
+        """
+        Gibt die Ereignisse wie bisher als Text auf der Konsole aus
+        """
+        super().__init__(level)
+
+    def verarbeite(self, ereignis):
+        for zeile in formatiere(ereignis):
+            print(zeile)
+
+
+class RueckrufAusgabe(Ereignisausgabe):
+    def __init__(self, rueckruf, level=INFO):
+        """
+        Übergibt die Textzeilen der Ereignisse an eine Funktion
+
+        Die Funktion wird im Thread der Berechnung aufgerufen. Die Oberfläche
+        übergibt z.B. eine Funktion, die jede Zeile in ihre Warteschlange
+        stellt.
+
+        Args:
+            rueckruf: Funktion, die je Textzeile aufgerufen wird
+            level: Mindest-Level der Ereignisse
+        """
+        super().__init__(level)
+        self.rueckruf = rueckruf
+
+    def verarbeite(self, ereignis):
+        for zeile in formatiere(ereignis):
+            self.rueckruf(zeile.lstrip('\n'))
+
+
+class LoggingAusgabe(Ereignisausgabe):
+    def __init__(self, level=INFO, logger=None):
+        """
+        Leitet die Ereignisse an das logging-Modul weiter
+
+        Args:
+            level: Mindest-Level der Ereignisse
+            logger: Logger (Standard: 'foerdermittel')
+        """
+        super().__init__(level)
+        self.logger = logger or logging.getLogger('foerdermittel')
+
+    def verarbeite(self, ereignis):
+        text = '\n'.join(zeile.strip() for zeile in formatiere(ereignis))
+        if text:
+            self.logger.log(ereignis['level'], text, extra={'ereignis': ereignis})
+
+
+class StilleAusgabe(Ereignisausgabe):
+    def __init__(self):
+        """
+        Unterdrückt alle Ereignisse; es werden keine Protokolleinträge erzeugt
+        """
+        super().__init__(STILL)
@@ -0,0 +1,301 @@
+"""
+Zwischenspeicher (Cache) für Berechnungsergebnisse
+
+Derselbe Datensatz wird oft mehrfach mit denselben Parametern berechnet
+(Oberfläche, Stapelverarbeitung, HTTP-Dienst, Berichte). ErgebnisCache steht
+vor berechne() aus foerdermittel_berechnung und liefert bei gleichen Daten
+und Parametern das gespeicherte Ergebnis.
+
+Schlüssel ist ein SHA-256-Hash über den Fingerabdruck der Kommunen-Arrays
+(Namen, Wert_2019, Kinder_U3 samt Datentyp), die Parameter (Gesamtsumme,
+Mindestbetrag, Sockelbetrag, Verfahren, Rundungsverfahren) und
+ERGEBNIS_VERSION. Da Ergebnis unveränderlich ist, kann ein gespeichertes
+Ergebnis ohne Kopie an beliebig viele Aufrufer gegeben werden.
+
+Der Cache hat zwei Ebenen:
+    1. Arbeitsspeicher: die zuletzt verwendeten max_eintraege Ergebnisse (LRU)
+    2. Optional Dateien (ErgebnisDateicache): ein NumPy-Archiv je Ergebnis,
+       größenbegrenzt wie der Import-Cache (foerdermittel_importcache)
+
+Treffer und Fehlschläge je Ebene werden gezählt (statistik).
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import zipfile
+from collections import OrderedDict
+
+import numpy as np
+
+from foerdermittel_berechnung import Ergebnis, Parameter, berechne, parameter_pruefen
+from foerdermittel_importcache import ImportCache, standard_verzeichnis as import_verzeichnis
+from foerdermittel_kommunen import kommunen_spalten
+
+# Bei Änderungen an der Berechnung oder am Ergebnis erhöhen
+ERGEBNIS_VERSION = 1
+
+# Standardgrößen der beiden Ebenen
+MAX_EINTRAEGE = 64
+MAX_DATEICACHE_GROESSE = 500 * 1024 * 1024
+
+# Arrays des Ergebnisses (ohne Namen und Cent-Arrays)
+_ARRAYS = ('wert_2019', 'kinder_u3', 'sockelbetrag', 'u3_anteil', 'zwischensumme',
+           'erste_berechnung', 'endbetrag_vor_rundung', 'endbetrag', 'rundungsanpassung',
+           'runde', 'status')
+_CENT_PRAEFIX = 'cent_'
+
+
+def standard_verzeichnis():
+    """Liefert das Verzeichnis des Ergebnis-Caches (neben dem Import-Cache)"""
+    return os.path.join(os.path.dirname(import_verzeichnis()), 'ergebnisse')
+
+
+def _namen_kodieren(namen):
+    """Liefert die Namen als UTF-8-Bytes und Array der Grenzen"""
+    kodiert = [str(name).encode('utf-8') for name in namen]
+    grenzen = np.zeros(len(kodiert) + 1, dtype=np.int64)
+    np.cumsum([len(name) for name in kodiert], out=grenzen[1:])
+    return b''.join(kodiert), grenzen
+
+
+def fingerabdruck(namen, wert_2019, kinder_u3):
+    """
+    Berechnet einen stabilen Fingerabdruck der Kommunendaten
+
+    Args:
+        namen: Array der Namen
+        wert_2019: Array der Förderwerte 2019
+        kinder_u3: Array der Kinder U3 im SGB-II-Bezug
+
+    Returns:
+        SHA-256-Hash als Hex-Text
+    """
+    pruefsumme = hashlib.sha256()
+    text, grenzen = _namen_kodieren(namen)
+    for teil in (grenzen, np.asarray(wert_2019), np.asarray(kinder_u3)):
+        teil = np.ascontiguousarray(teil)
+        pruefsumme.update(f"{teil.dtype.str}{teil.shape}".encode())
+        pruefsumme.update(teil.tobytes())
+    pruefsumme.update(text)
+    return pruefsumme.hexdigest()
+
+
+def ergebnis_schluessel(spalten_fingerabdruck, parameter):
+    """
+    Berechnet den Schlüssel aus Fingerabdruck und Parametern
+
+    Args:
+        spalten_fingerabdruck: Ergebnis von fingerabdruck()
+        parameter: Geprüfte Parameter (siehe parameter_pruefen)
+
+    Returns:
+        SHA-256-Hash als Hex-Text
+    """
+    beschreibung = json.dumps([ERGEBNIS_VERSION, spalten_fingerabdruck,
+                               float(parameter.gesamtsumme), float(parameter.mindestbetrag),
+                               float(parameter.sockelbetrag_prozent), parameter.verfahren,
+                               parameter.rundungsverfahren])
+    return hashlib.sha256(beschreibung.encode()).hexdigest()
+
+
+class ErgebnisDateicache(ImportCache):
+    def __init__(self, verzeichnis=None, max_groesse=MAX_DATEICACHE_GROESSE):
+        """
+        Größenbegrenzter Datei-Cache für Ergebnisse (ein .npz-Archiv je Ergebnis)
+
+        Verdrängung, Größe und Leeren funktionieren wie beim Import-Cache.
+
+        Args:
+            verzeichnis: Verzeichnis der Cache-Dateien (Standard: standard_verzeichnis())
+            max_groesse: Maximale Gesamtgröße aller Einträge in Bytes
+        """
+        super().__init__(verzeichnis or standard_verzeichnis(), max_groesse)
+
+    def laden(self, schluessel):
+        """
+        Lädt ein Ergebnis
+
+        Args:
+            schluessel: Schlüssel (siehe ergebnis_schluessel)
+
+        Returns:
+            Ergebnis oder None, wenn kein gültiger Eintrag existiert
+        """
+        pfad = self._pfad(schluessel)
+        try:
+            with np.load(pfad, allow_pickle=False) as archiv:
+                info = json.loads(str(archiv['info']))
+                if info.get('version') != ERGEBNIS_VERSION:
+                    return None
+                grenzen = archiv['namen_grenzen']
+                text = archiv['namen_text'].tobytes()
+                namen = np.empty(len(grenzen) - 1, dtype=object)
+                namen[:] = [text[anfang:ende].decode('utf-8')
+                            for anfang, ende in zip(grenzen[:-1], grenzen[1:])]
+                werte = {name: archiv[name] for name in _ARRAYS}
+                cent = {name[len(_CENT_PRAEFIX):]: archiv[name] for name in archiv.files
+                        if name.startswith(_CENT_PRAEFIX)}
+                ergebnis = Ergebnis(parameter=Parameter(*info['parameter']), namen=namen,
+                                    cent=cent, ausgleich=info['ausgleich'],
+                                    runden=info['runden'], alle_fixiert=info['alle_fixiert'],
+                                    verteilt=info['verteilt'], validiert=info['validiert'],
+                                    **werte)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError, EOFError, zipfile.BadZipFile):
+            # Beschädigter Eintrag
+            self._loeschen(pfad)
+            return None
+
+        # Letzte Verwendung für die LRU-Verdrängung vermerken
+        try:
+            os.utime(pfad)
+        except OSError:
+            pass
+        return ergebnis
+
+    def speichern(self, schluessel, ergebnis):
+        """
+        Speichert ein Ergebnis und verdrängt bei Bedarf alte Einträge
+
+        Args:
+            schluessel: Schlüssel (siehe ergebnis_schluessel)
+            ergebnis: Ergebnis von berechne()
+
+        Returns:
+            True, wenn der Eintrag gespeichert wurde
+        """
+        text, grenzen = _namen_kodieren(ergebnis.namen)
+        info = {'version': ERGEBNIS_VERSION, 'parameter': list(ergebnis.parameter),
+                'ausgleich': ergebnis.ausgleich, 'runden': ergebnis.runden,
+                'alle_fixiert': bool(ergebnis.alle_fixiert), 'verteilt': float(ergebnis.verteilt),
+                'validiert': bool(ergebnis.validiert)}
+        arrays = {name: getattr(ergebnis, name) for name in _ARRAYS}
+        arrays.update({_CENT_PRAEFIX + name: werte for name, werte in ergebnis.cent.items()})
+
+        try:
+            os.makedirs(self.verzeichnis, exist_ok=True)
+            # Erst in eine temporäre Datei schreiben, dann umbenennen
+            handle, temp = tempfile.mkstemp(suffix='.tmp', dir=self.verzeichnis)
+            try:
+                with os.fdopen(handle, 'wb') as datei:
+                    np.savez(datei, info=np.array(json.dumps(info, default=float)),
+                             namen_text=np.frombuffer(text, dtype=np.uint8),
+                             namen_grenzen=grenzen, **arrays)
+                os.replace(temp, self._pfad(schluessel))
+            except BaseException:
+                self._loeschen(temp)
+                raise
+        except OSError:
+            return False
+
+        self.verdraengen()
+        return True
+
+
+class ErgebnisCache:
+    def __init__(self, max_eintraege=MAX_EINTRAEGE, dateicache=None):
+        """
+        Threadsicherer Ergebnis-Cache vor berechne()
+
+        Args:
+            max_eintraege: Anzahl der Ergebnisse im Arbeitsspeicher (0 = keine)
+            dateicache: Optionaler ErgebnisDateicache; True verwendet das
+                        Standardverzeichnis, None nur den Arbeitsspeicher
+        """
+        if dateicache is True:
+            dateicache = ErgebnisDateicache()
+        self.max_eintraege = max_eintraege
+        self.dateicache = dateicache
+        self._eintraege = OrderedDict()
+        self._sperre = threading.Lock()
+        self._zaehler = {'treffer_speicher': 0, 'treffer_datei': 0, 'fehlschlaege': 0}
+
+    def __len__(self):
+        return len(self._eintraege)
+
+    @property
+    def statistik(self):
+        """Treffer je Ebene, Fehlschläge und Trefferquote"""
+        with self._sperre:
+            statistik = dict(self._zaehler)
+            statistik['eintraege'] = len(self._eintraege)
+        anfragen = statistik['treffer_speicher'] + statistik['treffer_datei'] + statistik['fehlschlaege']
+        treffer = statistik['treffer_speicher'] + statistik['treffer_datei']
+        statistik['trefferquote'] = treffer / anfragen if anfragen else None
+        return statistik
+
+    def _zaehlen(self, name):
+        with self._sperre:
+            self._zaehler[name] += 1
+
+    def _merken(self, schluessel, ergebnis):
+        """Legt ein Ergebnis im Arbeitsspeicher ab und verdrängt das älteste"""
+        if self.max_eintraege <= 0:
+            return
+        with self._sperre:
+            self._eintraege[schluessel] = ergebnis
+            self._eintraege.move_to_end(schluessel)
+            while len(self._eintraege) > self.max_eintraege:
+                self._eintraege.popitem(last=False)
+
+    def berechne_mit_herkunft(self, kommunen, parameter):
+        """
+        Liefert das Ergebnis aus dem Cache oder berechnet und speichert es
+
+        Args:
+            kommunen: Kommunendaten (siehe berechne)
+            parameter: Parameter, Dictionary oder Gesamtsumme (siehe berechne)
+
+        Returns:
+            Tuple (ergebnis, herkunft) mit herkunft 'speicher', 'datei' oder
+            None für eine neue Berechnung
+        """
+        parameter = parameter_pruefen(parameter)
+        namen, wert_2019, kinder_u3 = kommunen_spalten(kommunen)
+        schluessel = ergebnis_schluessel(fingerabdruck(namen, wert_2019, kinder_u3), parameter)
+
+        with self._sperre:
+            ergebnis = self._eintraege.get(schluessel)
+            if ergebnis is not None:
+                self._eintraege.move_to_end(schluessel)
+                self._zaehler['treffer_speicher'] += 1
+                return ergebnis, 'speicher'
+
+        if self.dateicache is not None:
+            ergebnis = self.dateicache.laden(schluessel)
+            if ergebnis is not None:
+                self._zaehlen('treffer_datei')
+                self._merken(schluessel, ergebnis)
+                return ergebnis, 'datei'
+
+        self._zaehlen('fehlschlaege')
+        ergebnis = berechne({'Name': namen, 'Wert_2019': wert_2019, 'Kinder_U3': kinder_u3},
+                            parameter)
+        self._merken(schluessel, ergebnis)
+        if self.dateicache is not None:
+            self.dateicache.speichern(schluessel, ergebnis)
+        return ergebnis, None
+
+    def berechne(self, kommunen, parameter):
+        """
+        Wie berechne() aus foerdermittel_berechnung, mit Cache
+
+        Returns:
+            Unveränderliches Ergebnis (bei Treffern dasselbe Objekt)
+        """
+        return self.berechne_mit_herkunft(kommunen, parameter)[0]
+
+    def leeren(self, dateien=False):
+        """
+        Entfernt alle Ergebnisse aus dem Arbeitsspeicher
+
+        Args:
+            dateien: True löscht auch die Einträge des Datei-Caches
+        """
+        with self._sperre:
+            self._eintraege.clear()
+        if dateien and self.dateicache is not None:
+            self.dateicache.leeren()
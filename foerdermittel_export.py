@@ -0,0 +1,389 @@
+"""
+Export der Berechnungsergebnisse
+
+Neben Excel stehen maschinenlesbare Formate für nachgelagerte Systeme zur
+Verfügung (siehe EXPORTFORMATE): CSV, JSON Lines, Parquet und Arrow
+(benötigen pyarrow) sowie ein NumPy-Archiv mit einem Array je Spalte. Diese
+Formate werden in einem Durchgang aus den Spalten des Ergebnisses
+geschrieben (pandas bzw. NumPy), ohne Formatierung einzelner Zeilen in
+Python. Die Parameter der Berechnung (Gesamtsumme, Mindestbetrag,
+Sockelbetrag) werden außer bei 'csv' als Metadaten mitgeschrieben:
+
+    csv      RFC 4180 ("," und Dezimalpunkt) ohne Metadaten, damit
+             Standard-CSV-Leser die Datei ohne Optionen lesen
+    csv-de   ";" und Dezimalkomma, erste Zeile "# {...}" mit den Parametern
+             als JSON
+    jsonl    Erste Zeile {"parameter": {...}}, danach ein Objekt je Kommune
+    parquet  Schema-Metadaten 'foerdermittel' (JSON)
+    arrow    Schema-Metadaten 'foerdermittel' (JSON), Arrow-IPC/Feather-Datei
+    npz      Array 'parameter' (JSON-Text)
+
+Der Excel-Export schreibt mit einem write-only-Workbook von openpyxl: Die
+Zeilen werden beim Anhängen direkt in die Datei gestreamt, statt zuerst
+als Zellobjekte im Speicher zu liegen. Formate (Rahmen, Schrift,
+Zahlenformat) werden einmal als benannte Stile im Workbook registriert;
+jede Spalte verwendet eine vorbereitete Zelle mit ihrem Stil, in die nur
+noch der Wert eingesetzt wird. Die Werte werden blockweise aus den Spalten
+des Ergebnisses gelesen. Speicherbedarf und Laufzeit wachsen dadurch
+linear mit der Zeilenzahl, ohne Zellobjekte je Zeile aufzubauen.
+"""
+import json
+import os
+import uuid
+from foerdermittel_ereignisse import PHASE_EXPORT
+
+# Zeilen je Block (Fortschrittsmeldung und Umwandlung der Spalten)
+EXPORT_BLOCKGROESSE = 1000
+
+# Zahlenformate
+FORMAT_EURO = '#,##0.00 €'
+FORMAT_GANZE_EURO = '#,##0 €'  # Ganze Euro ohne Dezimalstellen
+
+# Spalten der Ergebnistabelle: Überschrift, Spalte des Ergebnisses, benannter Stil
+EXPORT_SPALTEN = [
+    ('Kommune', 'Name', 'Tabelle'),
+    ('Wert 2019', 'Wert_2019', 'Betrag'),
+    ('Kinder U3', 'Kinder_U3', 'Tabelle'),
+    ('Sockelbetrag', 'Sockelbetrag', 'Betrag'),
+    ('U3-Anteil', 'U3_Anteil', 'Betrag'),
+    ('Zwischensumme', 'Zwischensumme', 'Betrag'),
+    ('Endbetrag (gerundet)', 'Endbetrag', 'Endbetrag'),
+    ('Endbetrag vor Rundung', 'Endbetrag_vor_Rundung', 'Betrag'),
+    ('Status', 'Status', 'Tabelle'),
+    ('Runde', 'Runde', 'Tabelle'),
+    ('Erste Berechnung', 'Erste_Berechnung', 'Betrag'),
+]
+
+SPALTENBREITEN = [20, 15, 12, 15, 15, 15, 18, 20, 30, 10, 18]
+
+# Zeile der Spaltenüberschriften
+KOPFZEILE = 9
+
+
+def _stile():
+    """Liefert die benannten Stile des Excel-Exports"""
+    from openpyxl.styles import NamedStyle, PatternFill, Font, Alignment, Border, Side
+    from openpyxl.styles.fonts import DEFAULT_FONT
+
+    duenn = Side(style='thin')
+    rahmen = Border(left=duenn, right=duenn, top=duenn, bottom=duenn)
+    summe = PatternFill(start_color="E7E6E6", end_color="E7E6E6", fill_type="solid")
+
+    return [
+        NamedStyle('Titel', font=Font(size=14, bold=True)),
+        NamedStyle('Fett', font=Font(bold=True)),
+        NamedStyle('Parameter', font=DEFAULT_FONT, number_format=FORMAT_EURO),
+        NamedStyle('Kopfzeile', border=rahmen, font=Font(color="FFFFFF", bold=True),
+                   fill=PatternFill(start_color="366092", end_color="366092", fill_type="solid"),
+                   alignment=Alignment(horizontal='center')),
+        NamedStyle('Tabelle', font=DEFAULT_FONT, border=rahmen),
+        NamedStyle('Betrag', font=DEFAULT_FONT, border=rahmen, number_format=FORMAT_EURO),
+        NamedStyle('Endbetrag', border=rahmen, number_format=FORMAT_GANZE_EURO,
+                   font=Font(bold=True)),
+        NamedStyle('Summe', font=Font(bold=True), fill=summe, number_format=FORMAT_GANZE_EURO),
+        NamedStyle('Summe Betrag', font=Font(bold=True), fill=summe, number_format=FORMAT_EURO),
+    ]
+
+
+def schreibe_excel(dateiname, ergebnis, gesamtsumme, mindestbetrag, sockelbetrag_prozent,
+                   fortschritt=None):
+    """
+    Schreibt das Berechnungsergebnis als formatierte Excel-Datei (write-only)
+
+    Args:
+        dateiname: Ziel-Datei
+        ergebnis: Ergebnis-DataFrame von berechne_verteilung()
+        gesamtsumme: Gesamtsumme der Berechnung
+        mindestbetrag: Mindestbetrag der Berechnung
+        sockelbetrag_prozent: Anteil des Sockelbetrags (0.5 = 50 %)
+        fortschritt: Optionale Fortschrittsfunktion fortschritt(phase, schritt, gesamt);
+                     löst sie eine Ausnahme aus, wird keine Datei geschrieben
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.utils import get_column_letter
+
+    def zelle(wert, stil):
+        neue_zelle = WriteOnlyCell(ws, value=wert)
+        neue_zelle.style = stil
+        return neue_zelle
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Fördermittelverteilung")
+    for stil in _stile():
+        wb.add_named_style(stil)
+
+    # Spaltenbreiten und verbundene Zellen vor dem ersten Schreiben festlegen
+    for nummer, breite in enumerate(SPALTENBREITEN, 1):
+        ws.column_dimensions[get_column_letter(nummer)].width = breite
+    ws.merged_cells.add('A1:J1')
+
+    # Titel und Parameter
+    ws.append([zelle("FÖRDERMITTELVERTEILUNG - BERECHNUNGSERGEBNIS", 'Titel')])
+    ws.append([])
+    ws.append([zelle("Parameter:", 'Fett')])
+    ws.append([None, "Gesamtsumme:", zelle(gesamtsumme, 'Parameter')])
+    ws.append([None, "Mindestbetrag:", zelle(mindestbetrag, 'Parameter')])
+    ws.append([None, "Sockelbetrag:", f"{sockelbetrag_prozent*100}%"])
+    for _ in range(KOPFZEILE - 7):
+        ws.append([])
+
+    # Kopfzeile
+    ws.append([zelle(ueberschrift, 'Kopfzeile') for ueberschrift, _, _ in EXPORT_SPALTEN])
+
+    # Daten: je Spalte eine vorbereitete Zelle, in die nur der Wert eingesetzt wird
+    zellen = [zelle(None, stil) for _, _, stil in EXPORT_SPALTEN]
+    spalten = [ergebnis[spalte].to_numpy() for _, spalte, _ in EXPORT_SPALTEN]
+    anzahl_zeilen = len(ergebnis)
+    for anfang in range(0, anzahl_zeilen, EXPORT_BLOCKGROESSE):
+        if fortschritt is not None:
+            fortschritt(PHASE_EXPORT, anfang, anzahl_zeilen + 1)
+        block = [spalte[anfang:anfang + EXPORT_BLOCKGROESSE].tolist() for spalte in spalten]
+        for werte in zip(*block):
+            for neue_zelle, wert in zip(zellen, werte):
+                neue_zelle.value = wert
+            ws.append(zellen)
+
+    # Summenzeile
+    summen = [None] * 8
+    summen[0] = zelle("SUMME", 'Fett')
+    summen[6] = zelle(ergebnis['Endbetrag'].sum().item(), 'Summe')
+    summen[7] = zelle(ergebnis['Endbetrag_vor_Rundung'].sum().item(), 'Summe Betrag')
+    ws.append(summen)
+
+    # Speichern
+    if fortschritt is not None:
+        fortschritt(PHASE_EXPORT, anzahl_zeilen, anzahl_zeilen + 1)
+    wb.save(dateiname)
+    if fortschritt is not None:
+        fortschritt(PHASE_EXPORT, anzahl_zeilen + 1, anzahl_zeilen + 1)
+
+
+def export_parameter(gesamtsumme, mindestbetrag, sockelbetrag_prozent):
+    """Liefert die Parameter der Berechnung als Dictionary (Metadaten der Exporte)"""
+    return {'gesamtsumme': gesamtsumme, 'mindestbetrag': mindestbetrag,
+            'sockelbetrag_prozent': sockelbetrag_prozent}
+
+
+def _parameter_json(gesamtsumme, mindestbetrag, sockelbetrag_prozent):
+    """Parameter als JSON-Text (NumPy-Zahlen werden in float umgewandelt)"""
+    return json.dumps(export_parameter(gesamtsumme, mindestbetrag, sockelbetrag_prozent),
+                      default=float)
+
+
+def schreibe_csv(dateiname, ergebnis, gesamtsumme, mindestbetrag, sockelbetrag_prozent,
+                 fortschritt=None, trennzeichen=',', dezimalzeichen='.', zeilenende='\r\n',
+                 parameterzeile=False):
+    """
+    Schreibt das Berechnungsergebnis als CSV-Datei
+
+    Standardmäßig nach RFC 4180 ("," als Trennzeichen, Dezimalpunkt, CRLF,
+    keine Kommentarzeile), damit die Datei ohne Optionen mit pandas.read_csv,
+    csv.reader, DuckDB oder Arrow gelesen werden kann.
+
+    Args:
+        dateiname: Ziel-Datei
+        ergebnis: Ergebnis-DataFrame von berechne_verteilung()
+        gesamtsumme, mindestbetrag, sockelbetrag_prozent: Parameter der Berechnung
+        fortschritt: Optionale Fortschrittsfunktion fortschritt(phase, schritt, gesamt)
+        trennzeichen: Spaltentrennzeichen
+        dezimalzeichen: Dezimaltrennzeichen
+        zeilenende: Zeilenende
+        parameterzeile: True schreibt die Parameter als JSON hinter "# " in die
+                        erste Zeile (z.B. mit pandas.read_csv(..., comment='#')
+                        überspringen)
+    """
+    if fortschritt is not None:
+        fortschritt(PHASE_EXPORT, 0, 1)
+    with open(dateiname, 'w', encoding='utf-8', newline='') as datei:
+        if parameterzeile:
+            datei.write(f"# {_parameter_json(gesamtsumme, mindestbetrag, sockelbetrag_prozent)}"
+                        f"{zeilenende}")
+        ergebnis.to_csv(datei, sep=trennzeichen, decimal=dezimalzeichen, index=False,
+                        lineterminator=zeilenende)
+    if fortschritt is not None:
+        fortschritt(PHASE_EXPORT, 1, 1)
+
+
+def schreibe_csv_deutsch(dateiname, ergebnis, gesamtsumme, mindestbetrag, sockelbetrag_prozent,
+                         fortschritt=None):
+    """
+    Schreibt das Berechnungsergebnis als CSV-Datei im deutschen Format
+
+    ";" als Trennzeichen, Dezimalkomma und die Parameter als JSON hinter "# "
+    in der ersten Zeile (siehe schreibe_csv). Lesen z.B. mit
+    pandas.read_csv(..., sep=';', decimal=',', comment='#').
+    """
+    schreibe_csv(dateiname, ergebnis, gesamtsumme, mindestbetrag, sockelbetrag_prozent,
+                 fortschritt=fortschritt, trennzeichen=';', dezimalzeichen=',', zeilenende='\n',
+                 parameterzeile=True)
+
+
+def schreibe_jsonl(dateiname, ergebnis, gesamtsumme, mindestbetrag, sockelbetrag_prozent,
+                   fortschritt=None):
+    """
+    Schreibt das Berechnungsergebnis als JSON Lines (ein Objekt je Zeile)
+
+    Die erste Zeile ist {"parameter": {...}}, jede weitere Zeile ein Objekt
+    mit den Spalten einer Kommune (fehlende Werte als null, Gleitkommazahlen
+    mit 15 signifikanten Stellen).
+
+    Args:
+        dateiname: Ziel-Datei
+        ergebnis: Ergebnis-DataFrame von berechne_verteilung()
+        gesamtsumme, mindestbetrag, sockelbetrag_prozent: Parameter der Berechnung
+        fortschritt: Optionale Fortschrittsfunktion fortschritt(phase, schritt, gesamt)
+    """
+    if fortschritt is not None:
+        fortschritt(PHASE_EXPORT, 0, 1)
+    zeilen = ergebnis.to_json(orient='records', lines=True, force_ascii=False, double_precision=15)
+    with open(dateiname, 'w', encoding='utf-8', newline='\n') as datei:
+        datei.write(f'{{"parameter": {_parameter_json(gesamtsumme, mindestbetrag, sockelbetrag_prozent)}}}\n')
+        datei.write(zeilen)
+        if zeilen and not zeilen.endswith('\n'):
+            datei.write('\n')
+    if fortschritt is not None:
+        fortschritt(PHASE_EXPORT, 1, 1)
+
+
+def _arrow_tabelle(ergebnis, gesamtsumme, mindestbetrag, sockelbetrag_prozent):
+    """Ergebnis als pyarrow-Tabelle mit den Parametern in den Schema-Metadaten"""
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ImportError("Für den Export als Parquet oder Arrow wird pyarrow benötigt "
+                          "(pip install pyarrow)") from None
+
+    tabelle = pa.Table.from_pandas(ergebnis, preserve_index=False)
+    metadaten = dict(tabelle.schema.metadata or {})
+    metadaten[b'foerdermittel'] = _parameter_json(gesamtsumme, mindestbetrag,
+                                                  sockelbetrag_prozent).encode('utf-8')
+    return tabelle.replace_schema_metadata(metadaten)
+
+
+def schreibe_parquet(dateiname, ergebnis, gesamtsumme, mindestbetrag, sockelbetrag_prozent,
+                     fortschritt=None):
+    """
+    Schreibt das Berechnungsergebnis als Parquet-Datei (benötigt pyarrow)
+
+    Die Parameter stehen als JSON unter dem Schlüssel 'foerdermittel' in
+    den Schema-Metadaten.
+    """
+    if fortschritt is not None:
+        fortschritt(PHASE_EXPORT, 0, 1)
+    tabelle = _arrow_tabelle(ergebnis, gesamtsumme, mindestbetrag, sockelbetrag_prozent)
+    import pyarrow.parquet as pq
+
+    pq.write_table(tabelle, dateiname)
+    if fortschritt is not None:
+        fortschritt(PHASE_EXPORT, 1, 1)
+
+
+def schreibe_arrow(dateiname, ergebnis, gesamtsumme, mindestbetrag, sockelbetrag_prozent,
+                   fortschritt=None):
+    """
+    Schreibt das Berechnungsergebnis als Arrow-IPC-Datei (Feather, benötigt pyarrow)
+
+    Die Parameter stehen als JSON unter dem Schlüssel 'foerdermittel' in
+    den Schema-Metadaten.
+    """
+    if fortschritt is not None:
+        fortschritt(PHASE_EXPORT, 0, 1)
+    tabelle = _arrow_tabelle(ergebnis, gesamtsumme, mindestbetrag, sockelbetrag_prozent)
+    import pyarrow.feather as feather
+
+    feather.write_feather(tabelle, dateiname)
+    if fortschritt is not None:
+        fortschritt(PHASE_EXPORT, 1, 1)
+
+
+def schreibe_npz(dateiname, ergebnis, gesamtsumme, mindestbetrag, sockelbetrag_prozent,
+                 fortschritt=None):
+    """
+    Schreibt das Berechnungsergebnis als NumPy-Archiv (ein Array je Spalte)
+
+    Textspalten werden als Unicode-Arrays gespeichert, die Datei lässt sich
+    mit numpy.load(dateiname) ohne allow_pickle lesen. Das Array
+    'parameter' enthält die Parameter als JSON-Text.
+    """
+    import numpy as np
+
+    if fortschritt is not None:
+        fortschritt(PHASE_EXPORT, 0, 1)
+    spalten = {}
+    for spalte in ergebnis.columns:
+        werte = ergebnis[spalte].to_numpy()
+        spalten[spalte] = werte.astype(str) if werte.dtype == object else werte
+    spalten['parameter'] = np.array(_parameter_json(gesamtsumme, mindestbetrag, sockelbetrag_prozent))
+    with open(dateiname, 'wb') as datei:
+        np.savez(datei, **spalten)
+    if fortschritt is not None:
+        fortschritt(PHASE_EXPORT, 1, 1)
+
+
+# Exportformate: Name → (Schreibfunktion, Dateiendungen)
+EXPORTFORMATE = {
+    'xlsx': (schreibe_excel, ('.xlsx',)),
+    'csv': (schreibe_csv, ('.csv',)),
+    'csv-de': (schreibe_csv_deutsch, ('.csv',)),
+    'jsonl': (schreibe_jsonl, ('.jsonl', '.ndjson')),
+    'parquet': (schreibe_parquet, ('.parquet',)),
+    'arrow': (schreibe_arrow, ('.arrow', '.feather')),
+    'npz': (schreibe_npz, ('.npz',)),
+}
+
+
+def format_aus_dateiname(dateiname):
+    """
+    Bestimmt das Exportformat aus der Dateiendung
+
+    Raises:
+        ValueError: wenn die Endung keinem Exportformat zugeordnet ist
+    """
+    endung = os.path.splitext(dateiname)[1].lower()
+    for name, (_, endungen) in EXPORTFORMATE.items():
+        if endung in endungen:
+            return name
+    raise ValueError(f"Unbekanntes Exportformat für Datei: {dateiname}")
+
+
+def schreibe_ergebnis(dateiname, ergebnis, gesamtsumme, mindestbetrag, sockelbetrag_prozent,
+                      format=None, fortschritt=None):
+    """
+    Schreibt das Berechnungsergebnis im gewünschten Format
+
+    Die Datei wird zunächst unter einem temporären Namen im Zielverzeichnis
+    geschrieben und erst danach umbenannt. Bricht die Fortschrittsfunktion
+    (z.B. ein abgebrochener Exportauftrag) oder das Schreiben ab, bleibt eine
+    vorhandene Zieldatei unverändert und es entsteht keine neue.
+
+    Args:
+        dateiname: Ziel-Datei
+        ergebnis: Ergebnis-DataFrame von berechne_verteilung()
+        gesamtsumme, mindestbetrag, sockelbetrag_prozent: Parameter der Berechnung
+        format: Schlüssel von EXPORTFORMATE (Standard: aus der Dateiendung)
+        fortschritt: Optionale Fortschrittsfunktion fortschritt(phase, schritt, gesamt)
+
+    Raises:
+        ValueError: bei unbekanntem Format
+    """
+    if format is None:
+        format = format_aus_dateiname(dateiname)
+    if format not in EXPORTFORMATE:
+        raise ValueError(f"Unbekanntes Exportformat: {format}")
+    schreiben, _ = EXPORTFORMATE[format]
+
+    # Erst in eine temporäre Datei im Zielverzeichnis schreiben und sie erst
+    # umbenennen, wenn auch die letzte Fortschrittsmeldung (Abbruch) durch ist
+    basis, endung = os.path.splitext(dateiname)
+    temp = f"{basis}.{uuid.uuid4().hex[:8]}.tmp{endung}"
+    try:
+        schreiben(temp, ergebnis, gesamtsumme, mindestbetrag, sockelbetrag_prozent,
+                  fortschritt=fortschritt)
+        os.replace(temp, dateiname)
+    except BaseException:
+        try:
+            os.remove(temp)
+        except OSError:
+            pass
+        raise
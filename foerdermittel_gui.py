@@ -1,11 +1,313 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-import pandas as pd
-from foerdermittel_rechner import FoerdermittelRechner
 import threading
+import queue
+from array import array
 from datetime import datetime
 import os
 
+VERSION = "0.8"
+
+# Module, die nach dem Öffnen des Fensters im Hintergrund geladen werden
+HINTERGRUND_MODULE = ('numpy', 'foerdermittel_rechner', 'pandas', 'openpyxl')
+
+# Abstand (ms) und Höchstzahl der Nachrichten je Abarbeitung der UI-Warteschlange
+UI_INTERVALL_MS = 50
+UI_STAPELGROESSE = 500
+
+# Zeilen je Block beim Füllen der Kommunen-Tabelle nach einem Import
+IMPORT_STAPELGROESSE = 2000
+
+# Wartezeit (ms) nach der letzten Eingabe, bevor die Live-Berechnung startet
+LIVE_VERZOEGERUNG_MS = 400
+
+# Höchstzahl gespeicherter Änderungen im KommunenModell (danach Neuaufbau)
+MAX_AENDERUNGEN = 10000
+
+# Anzeigetexte der Phasen einer Berechnung (siehe foerdermittel_auftrag)
+PHASEN_TEXTE = {
+    'fixierung': "Runden/Fixierung",
+    'rundung': "Rundung",
+    'validierung': "Validierung",
+    'export': "Export",
+    'sweep': "Parameter-Sweep",
+    'import': "Import",
+}
+
+# Zeilenhöhe der Tabellen in Pixeln (für die virtuelle Ergebnistabelle)
+ZEILENHOEHE = 22
+
+# Spalten der Ergebnistabelle und Formatierung ihrer Werte
+ERGEBNIS_SPALTEN = ('Name', 'Wert_2019', 'Kinder_U3', 'Sockelbetrag',
+                    'U3_Anteil', 'Zwischensumme', 'Endbetrag', 'Status')
+ERGEBNIS_FORMATE = (str, '{:,.0f}'.format, '{:.6f}'.format, '{:,.0f}'.format,
+                    '{:,.0f}'.format, '{:,.0f}'.format, '{:,.0f}'.format, str)
+
+
+def format_anzahl(wert):
+    """Formatiert eine Anzahl ohne überflüssige Nachkommastellen"""
+    text = f"{wert:,.6f}".rstrip('0').rstrip('.')
+    return text if text != '-0' else '0'
+
+
+def format_zeilen(zeilen, maximal=10):
+    """Formatiert Zeilennummern für Meldungen (z.B. "12, 15, 20, ...")"""
+    text = ", ".join(str(zeile) for zeile in zeilen[:maximal])
+    return text + ", ..." if len(zeilen) > maximal else text
+
+
+class KommunenModell:
+    def __init__(self):
+        """
+        Datenmodell der Kommunen-Tabelle
+        
+        Namen, Förderwerte 2019 und Kinder U3 werden als Liste bzw. numerische
+        Arrays (array('d')) gehalten, dazu ein Dictionary Name → Position und
+        laufende Summen. Die Tabelle der Oberfläche ist nur eine Ansicht
+        dieses Modells; Duplikatprüfung und Summen benötigen daher kein
+        Durchlaufen und Parsen der Tabellenzeilen.
+        
+        Jede Änderung erhöht `version` und wird in `aenderungen` festgehalten,
+        damit die Live-Berechnung nur die Änderungen nachführen muss.
+        """
+        self.version = 0
+        self.aenderungen = []
+        self.journal_beginn = 0
+        self.namen = []
+        self.wert_2019 = array('d')
+        self.kinder_u3 = array('d')
+        self.index = {}
+        self.summe_wert_2019 = 0.0
+        self.summe_kinder_u3 = 0.0
+        
+    def __len__(self):
+        return len(self.namen)
+        
+    def __contains__(self, name):
+        return name in self.index
+        
+    def werte(self, name):
+        """Liefert Wert 2019 und Kinder U3 einer Kommune"""
+        pos = self.index[name]
+        return self.wert_2019[pos], self.kinder_u3[pos]
+        
+    def hinzufuegen(self, name, wert_2019, kinder_u3):
+        """Fügt eine Kommune hinzu (Name muss eindeutig sein)"""
+        if name in self.index:
+            raise ValueError(f"Kommune '{name}' existiert bereits")
+        self.index[name] = len(self.namen)
+        self.namen.append(name)
+        self.wert_2019.append(wert_2019)
+        self.kinder_u3.append(kinder_u3)
+        self.summe_wert_2019 += wert_2019
+        self.summe_kinder_u3 += kinder_u3
+        self._protokollieren(('hinzufuegen', name, wert_2019, kinder_u3))
+        
+    def entfernen(self, namen):
+        """Entfernt die angegebenen Kommunen mit einem Durchlauf"""
+        namen = tuple(namen)
+        entfernt = {self.index[name] for name in namen}
+        behalten = [pos for pos in range(len(self.namen)) if pos not in entfernt]
+        
+        self.namen = [self.namen[pos] for pos in behalten]
+        self.wert_2019 = array('d', (self.wert_2019[pos] for pos in behalten))
+        self.kinder_u3 = array('d', (self.kinder_u3[pos] for pos in behalten))
+        self.index = {name: pos for pos, name in enumerate(self.namen)}
+        
+        if self.namen:
+            self.summe_wert_2019 = sum(self.wert_2019)
+            self.summe_kinder_u3 = sum(self.kinder_u3)
+        else:
+            self.summe_wert_2019 = 0.0
+            self.summe_kinder_u3 = 0.0
+        self._protokollieren(('entfernen', namen))
+            
+    def leeren(self):
+        """Entfernt alle Kommunen"""
+        version = self.version + 1
+        self.__init__()
+        self.version = self.journal_beginn = version
+        
+    def _protokollieren(self, aenderung):
+        """Hält eine Änderung fest und erhöht die Version"""
+        self.aenderungen.append(aenderung)
+        self.version += 1
+        if len(self.aenderungen) > MAX_AENDERUNGEN:
+            self.aenderungen = []
+            self.journal_beginn = self.version
+            
+    def aenderungen_seit(self, version):
+        """
+        Liefert die Änderungen seit einem Versionsstand
+        
+        Returns:
+            Liste der Änderungen ('hinzufuegen', name, wert_2019, kinder_u3)
+            bzw. ('entfernen', namen) oder None, wenn sie nicht mehr vorliegen
+            (z.B. nach leeren())
+        """
+        if version < self.journal_beginn:
+            return None
+        return self.aenderungen[version - self.journal_beginn:]
+        
+    def kopie(self):
+        """Liefert eine Momentaufnahme (Namen, Wert 2019, Kinder U3) für die Berechnung"""
+        return list(self.namen), array('d', self.wert_2019), array('d', self.kinder_u3)
+
+
+class VirtuelleTabelle:
+    def __init__(self, tree, scrollbar, formate, zeilenhoehe=ZEILENHOEHE):
+        """
+        Virtuelle Ansicht einer großen Tabelle in einem Treeview
+        
+        Das Treeview enthält nur so viele Zeilen, wie in den sichtbaren
+        Bereich passen. Beim Scrollen und Sortieren werden diese Zeilen mit
+        den Werten der sichtbaren Datensätze überschrieben. Die Daten liegen
+        spaltenweise vor; eine Zeile wird erst bei ihrer ersten Anzeige
+        formatiert und danach zwischengespeichert. Sortiert wird über eine
+        Liste der Zeilenindizes, die Daten selbst bleiben unverändert.
+        
+        Args:
+            tree: ttk.Treeview mit show='headings'
+            scrollbar: Vertikale ttk.Scrollbar, die von der Tabelle gesteuert wird
+            formate: Formatierungsfunktion je Spalte
+            zeilenhoehe: Zeilenhöhe des Treeviews in Pixeln
+        """
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.formate = formate
+        self.zeilenhoehe = zeilenhoehe
+        
+        self.spalten = []
+        self.reihenfolge = []
+        self.formatiert = {}
+        self.erste = 0
+        self.sichtbar = 1
+        self.sortierung = None
+        self.ueberschriften = {spalte: tree.heading(spalte, 'text') for spalte in tree['columns']}
+        
+        for nummer, spalte in enumerate(tree['columns']):
+            tree.heading(spalte, command=lambda nummer=nummer: self.sortieren(nummer))
+            
+        scrollbar.configure(command=self.scrollen)
+        tree.configure(yscrollcommand='')
+        tree.bind('<Configure>', self._groesse_geaendert)
+        tree.bind('<MouseWheel>', self._mausrad)
+        tree.bind('<Button-4>', lambda e: self._verschieben(-3))
+        tree.bind('<Button-5>', lambda e: self._verschieben(3))
+        tree.bind('<Up>', lambda e: self._verschieben(-1))
+        tree.bind('<Down>', lambda e: self._verschieben(1))
+        tree.bind('<Prior>', lambda e: self._verschieben(-self.sichtbar))
+        tree.bind('<Next>', lambda e: self._verschieben(self.sichtbar))
+        tree.bind('<Home>', lambda e: self._verschieben(-len(self.reihenfolge)))
+        tree.bind('<End>', lambda e: self._verschieben(len(self.reihenfolge)))
+        
+    def __len__(self):
+        return len(self.reihenfolge)
+        
+    def setze_daten(self, spalten):
+        """
+        Übernimmt neue Daten; Sortierung und Scrollposition bleiben erhalten
+        
+        Args:
+            spalten: Liste der Spalten (je eine Liste der Rohwerte)
+        """
+        self.spalten = spalten
+        self.formatiert = {}
+        self.reihenfolge = list(range(len(spalten[0]) if spalten else 0))
+        if self.sortierung is not None:
+            self._sortierung_anwenden()
+        self._anzeigen()
+        
+    def leeren(self):
+        """Entfernt alle Daten"""
+        self.setze_daten([])
+        
+    def sortieren(self, nummer):
+        """Sortiert nach einer Spalte; erneutes Klicken kehrt die Reihenfolge um"""
+        absteigend = self.sortierung == (nummer, False)
+        self.sortierung = (nummer, absteigend)
+        
+        for spalte, text in self.ueberschriften.items():
+            self.tree.heading(spalte, text=text)
+        spalte = self.tree['columns'][nummer]
+        self.tree.heading(spalte, text=f"{self.ueberschriften[spalte]} {'▼' if absteigend else '▲'}")
+        
+        self._sortierung_anwenden()
+        self.erste = 0
+        self._anzeigen()
+        
+    def _sortierung_anwenden(self):
+        """Sortiert die Zeilenindizes nach der gewählten Spalte"""
+        nummer, absteigend = self.sortierung
+        if self.spalten:
+            self.reihenfolge.sort(key=self.spalten[nummer].__getitem__, reverse=absteigend)
+            
+    def scrollen(self, aktion, wert, einheit=None):
+        """Verarbeitet die Befehle der Scrollbar (moveto/scroll)"""
+        if aktion == 'moveto':
+            self.erste = int(float(wert) * len(self.reihenfolge))
+        elif einheit == 'pages':
+            self.erste += int(wert) * self.sichtbar
+        else:
+            self.erste += int(wert)
+        self._anzeigen()
+        
+    def _verschieben(self, zeilen):
+        """Verschiebt den sichtbaren Bereich um eine Anzahl Zeilen"""
+        self.erste += zeilen
+        self._anzeigen()
+        return 'break'
+        
+    def _mausrad(self, event):
+        """Scrollt mit dem Mausrad (Windows und macOS)"""
+        schritte = -int(event.delta / 120) or (-1 if event.delta > 0 else 1)
+        return self._verschieben(3 * schritte)
+        
+    def _groesse_geaendert(self, event):
+        """Passt die Anzahl der sichtbaren Zeilen an die Fensterhöhe an"""
+        kopfzeile = self.zeilenhoehe
+        zeilen = self.tree.get_children()
+        if zeilen:
+            bbox = self.tree.bbox(zeilen[0])
+            if bbox:
+                kopfzeile = bbox[1]
+        sichtbar = max(1, (event.height - kopfzeile) // self.zeilenhoehe)
+        if sichtbar != self.sichtbar:
+            self.sichtbar = sichtbar
+            self._anzeigen()
+            
+    def _zeile(self, index):
+        """Liefert die formatierten Werte einer Zeile"""
+        werte = self.formatiert.get(index)
+        if werte is None:
+            werte = tuple(formatieren(spalte[index])
+                          for formatieren, spalte in zip(self.formate, self.spalten))
+            self.formatiert[index] = werte
+        return werte
+        
+    def _anzeigen(self):
+        """Schreibt die sichtbaren Datensätze in die vorhandenen Treeview-Zeilen"""
+        anzahl = len(self.reihenfolge)
+        self.erste = max(0, min(self.erste, anzahl - self.sichtbar))
+        indizes = self.reihenfolge[self.erste:self.erste + self.sichtbar]
+        
+        zeilen = self.tree.get_children()
+        if self.tree.selection():
+            self.tree.selection_set(())
+        for position, index in enumerate(indizes):
+            if position < len(zeilen):
+                self.tree.item(zeilen[position], values=self._zeile(index))
+            else:
+                self.tree.insert('', 'end', values=self._zeile(index))
+        if len(zeilen) > len(indizes):
+            self.tree.delete(*zeilen[len(indizes):])
+            
+        if anzahl:
+            self.scrollbar.set(self.erste / anzahl, (self.erste + len(indizes)) / anzahl)
+        else:
+            self.scrollbar.set(0, 1)
+
+
 class FoerdermittelGUI:
     def __init__(self, root):
         self.root = root
@@ -26,7 +328,35 @@ class FoerdermittelGUI:
         
         # Rechner-Instanz
         self.rechner = None
-        self.kommunen_data = []
+        
+        # Laufende Aufträge (Berechnung bzw. Export), solange abbrechbar
+        self.auftrag = None
+        self.export_auftrag = None
+        
+        # Live-Berechnung: Warteschlange des Hintergrund-Threads, Nummer der
+        # aktuellen Anfrage (ältere Ergebnisse werden verworfen), an den
+        # Thread übermittelter Stand des Kommunen-Modells
+        self.live_queue = queue.Queue()
+        self.live_thread = None
+        self.live_generation = 0
+        self.live_version = -1
+        self.live_after_id = None
+        self.live_auftrag = None
+        
+        # Datenmodell der Kommunen (die Tabelle ist nur eine Ansicht davon)
+        self.kommunen = KommunenModell()
+        
+        # Erst bei Bedarf aufgebaute Teile der Oberfläche
+        self.calculation_tab_built = False
+        self.results_tab_built = False
+        self.method_window = None
+        
+        # Nachrichten der Hintergrund-Threads an die Oberfläche; Threads
+        # greifen nie direkt auf Widgets zu
+        self.ui_queue = queue.Queue()
+        
+        # Signalisiert, dass die Hintergrund-Importe abgeschlossen sind
+        self.modules_ready = threading.Event()
         
         # GUI Setup
         self.setup_styles()
@@ -36,6 +366,63 @@ class FoerdermittelGUI:
         # Keyboard shortcuts
         self.setup_shortcuts()
         
+        # Schwere Module erst laden, wenn das Fenster sichtbar ist
+        self.root.after(100, self.start_background_imports)
+        
+        # Warteschlange der Hintergrund-Threads regelmäßig abarbeiten
+        self.root.after(UI_INTERVALL_MS, self.process_ui_queue)
+        
+    def post_ui(self, funktion, *args):
+        """Lässt eine Funktion im Hauptthread ausführen (aus beliebigem Thread)"""
+        self.ui_queue.put((funktion, args))
+        
+    def post_log(self, message):
+        """Stellt eine Protokollzeile in die Warteschlange (aus beliebigem Thread)"""
+        self.ui_queue.put((None, self.format_log_line(message)))
+        
+    def process_ui_queue(self):
+        """Arbeitet die Warteschlange stapelweise im Hauptthread ab"""
+        zeilen = []
+        anzahl = 0
+        try:
+            while anzahl < UI_STAPELGROESSE:
+                funktion, daten = self.ui_queue.get_nowait()
+                anzahl += 1
+                if funktion is None:
+                    # Aufeinanderfolgende Protokollzeilen gemeinsam einfügen
+                    zeilen.append(daten)
+                    continue
+                if zeilen:
+                    self.append_log(zeilen)
+                    zeilen = []
+                funktion(*daten)
+        except queue.Empty:
+            pass
+        finally:
+            if zeilen:
+                self.append_log(zeilen)
+            # Bei vollem Stapel sofort weitermachen, sonst nach dem Intervall
+            self.root.after(1 if anzahl >= UI_STAPELGROESSE else UI_INTERVALL_MS,
+                            self.process_ui_queue)
+        
+    def start_background_imports(self):
+        """Startet das Laden von NumPy, pandas und openpyxl im Hintergrund"""
+        thread = threading.Thread(target=self._import_modules, daemon=True)
+        thread.start()
+        
+    def _import_modules(self):
+        """Importiert die schweren Module (läuft in separatem Thread)"""
+        import importlib
+        try:
+            for modul in HINTERGRUND_MODULE:
+                try:
+                    importlib.import_module(modul)
+                except ImportError:
+                    # Fehlt ein Modul, tritt der Fehler bei der Verwendung auf
+                    pass
+        finally:
+            self.modules_ready.set()
+        
     def setup_styles(self):
         """Konfiguriert moderne Styles für die GUI"""
         style = ttk.Style()
@@ -102,7 +489,8 @@ class FoerdermittelGUI:
                        background=self.colors['surface'],
                        foreground=self.colors['text'],
                        fieldbackground=self.colors['surface'],
-                       font=('Segoe UI', 9))
+                       font=('Segoe UI', 9),
+                       rowheight=ZEILENHOEHE)
         
         style.configure('Custom.Treeview.Heading',
                        background=self.colors['primary'],
@@ -122,10 +510,17 @@ class FoerdermittelGUI:
         self.notebook = ttk.Notebook(self.main_frame, style='Custom.TNotebook')
         self.notebook.pack(fill='both', expand=True, pady=(10, 0))
         
-        # Tabs erstellen
+        # Tabs erstellen; Berechnung und Ergebnisse werden erst bei der
+        # ersten Verwendung aufgebaut
         self.create_input_tab()
-        self.create_calculation_tab()
-        self.create_results_tab()
+        
+        self.calc_frame = ttk.Frame(self.notebook)
+        self.notebook.add(self.calc_frame, text="⚙️ Berechnung")
+        
+        self.results_frame = ttk.Frame(self.notebook)
+        self.notebook.add(self.results_frame, text="📊 Ergebnisse")
+        
+        self.notebook.bind('<<NotebookTabChanged>>', self.on_tab_changed)
         
         # Beispieldaten laden (nach Erstellung aller Widgets)
         self.load_example_data()
@@ -249,6 +644,16 @@ class FoerdermittelGUI:
                                 width=15)
         sockel_entry.pack(side='right')
         
+        # Live-Berechnung
+        self.live_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(param_card,
+                       text="⚡ Live-Berechnung (Ergebnisse bei jeder Änderung aktualisieren)",
+                       variable=self.live_var,
+                       command=self.toggle_live_calculation).pack(anchor='w', pady=(10, 0))
+        
+        for var in (self.gesamtsumme_var, self.mindestbetrag_var, self.sockelbetrag_var):
+            var.trace_add('write', self.schedule_live_calculation)
+        
     def create_kommunen_section(self, parent):
         """Erstellt die Kommunen-Verwaltungs-Sektion"""
         # Kommunen Card
@@ -337,11 +742,28 @@ class FoerdermittelGUI:
         # Doppelklick für Bearbeitung
         self.kommunen_tree.bind('<Double-1>', lambda e: self.edit_kommune())
         
-    def create_calculation_tab(self):
-        """Erstellt den Berechnungs-Tab"""
-        self.calc_frame = ttk.Frame(self.notebook)
-        self.notebook.add(self.calc_frame, text="⚙️ Berechnung")
+    def on_tab_changed(self, event):
+        """Baut den ausgewählten Tab bei der ersten Anzeige auf"""
+        selected = self.notebook.index('current')
+        if selected == 1:
+            self.ensure_calculation_tab()
+        elif selected == 2:
+            self.ensure_results_tab()
+            
+    def ensure_calculation_tab(self):
+        """Stellt sicher, dass der Berechnungs-Tab aufgebaut ist"""
+        if not self.calculation_tab_built:
+            self.calculation_tab_built = True
+            self.create_calculation_tab()
+            
+    def ensure_results_tab(self):
+        """Stellt sicher, dass der Ergebnis-Tab aufgebaut ist"""
+        if not self.results_tab_built:
+            self.results_tab_built = True
+            self.create_results_tab()
         
+    def create_calculation_tab(self):
+        """Erstellt den Inhalt des Berechnungs-Tabs"""
         # Berechnung Card
         calc_card = ttk.LabelFrame(self.calc_frame, text="🔄 Berechnung durchführen", 
                                   style='Card.TFrame',
@@ -379,12 +801,23 @@ class FoerdermittelGUI:
                                    style='TButton')
         explain_button.pack(side='left', padx=(0, 10))
         
-        # Progress Bar
+        # Abbrechen Button
+        self.cancel_button = ttk.Button(button_frame,
+                                       text="⏹ Abbrechen",
+                                       command=self.cancel_calculation,
+                                       state='disabled')
+        self.cancel_button.pack(side='left', padx=(0, 10))
+        
+        # Progress Bar mit Phase und Restzeit
         self.progress = ttk.Progressbar(button_frame, 
-                                       mode='indeterminate',
+                                       mode='determinate',
+                                       maximum=100,
                                        length=200)
         self.progress.pack(side='left', padx=10)
         
+        self.progress_label = ttk.Label(button_frame, text="", font=('Segoe UI', 9))
+        self.progress_label.pack(side='left')
+        
         # Log-Bereich
         log_frame = ttk.LabelFrame(calc_card, text="📋 Berechnungsprotokoll")
         log_frame.pack(fill='both', expand=True, pady=(20, 0))
@@ -401,10 +834,7 @@ class FoerdermittelGUI:
         log_scrollbar.pack(side='right', fill='y')
         
     def create_results_tab(self):
-        """Erstellt den Ergebnis-Tab"""
-        self.results_frame = ttk.Frame(self.notebook)
-        self.notebook.add(self.results_frame, text="📊 Ergebnisse")
-        
+        """Erstellt den Inhalt des Ergebnis-Tabs"""
         # Ergebnis-Übersicht
         summary_card = ttk.LabelFrame(self.results_frame, text="📈 Übersicht", 
                                      style='Card.TFrame',
@@ -432,16 +862,23 @@ class FoerdermittelGUI:
         ttk.Button(export_frame, text="📋 In Zwischenablage", 
                   command=self.copy_to_clipboard).pack(side='left')
         
+        # Fortschritt und Abbruch des Exports
+        self.export_cancel_button = ttk.Button(export_frame, text="⏹ Export abbrechen",
+                                              command=self.cancel_export,
+                                              state='disabled')
+        self.export_cancel_button.pack(side='right')
+        
+        self.export_progress = ttk.Progressbar(export_frame, mode='determinate',
+                                              maximum=100, length=150)
+        self.export_progress.pack(side='right', padx=10)
+        
         # Ergebnis-Tabelle
         results_table_frame = ttk.Frame(results_card)
         results_table_frame.pack(fill='both', expand=True)
         
         # Treeview für Ergebnisse
-        result_columns = ('Name', 'Wert_2019', 'Kinder_U3', 'Sockelbetrag', 
-                         'U3_Anteil', 'Zwischensumme', 'Endbetrag', 'Status')
-        
         self.results_tree = ttk.Treeview(results_table_frame, 
-                                        columns=result_columns, 
+                                        columns=ERGEBNIS_SPALTEN, 
                                         show='headings',
                                         style='Custom.Treeview')
         
@@ -461,14 +898,16 @@ class FoerdermittelGUI:
             self.results_tree.heading(col, text=text)
             self.results_tree.column(col, width=width, anchor=anchor)
         
-        # Scrollbars für Ergebnisse
-        results_v_scrollbar = ttk.Scrollbar(results_table_frame, orient='vertical', 
-                                           command=self.results_tree.yview)
+        # Scrollbars für Ergebnisse (die vertikale steuert die virtuelle Tabelle)
+        results_v_scrollbar = ttk.Scrollbar(results_table_frame, orient='vertical')
         results_h_scrollbar = ttk.Scrollbar(results_table_frame, orient='horizontal', 
                                            command=self.results_tree.xview)
         
-        self.results_tree.configure(yscrollcommand=results_v_scrollbar.set, 
-                                   xscrollcommand=results_h_scrollbar.set)
+        self.results_tree.configure(xscrollcommand=results_h_scrollbar.set)
+        
+        # Nur die sichtbaren Zeilen werden in das Treeview eingefügt
+        self.results_table = VirtuelleTabelle(self.results_tree, results_v_scrollbar,
+                                              ERGEBNIS_FORMATE)
         
         # Layout
         self.results_tree.pack(side='left', fill='both', expand=True)
@@ -551,7 +990,7 @@ class FoerdermittelGUI:
         version_frame = ttk.Frame(dev_frame)
         version_frame.pack(fill='x', pady=3)
         ttk.Label(version_frame, text="Version:", font=('Segoe UI', 10, 'bold')).pack(side='left')
-        ttk.Label(version_frame, text="0.8 (2025)", font=('Segoe UI', 10)).pack(side='left', padx=(10, 0))
+        ttk.Label(version_frame, text=f"{VERSION} (2025)", font=('Segoe UI', 10)).pack(side='left', padx=(10, 0))
         
         # Open-Source-Komponenten
         opensource_frame = ttk.LabelFrame(main_frame, text="Verwendete Open-Source-Programme", padding=15)
@@ -606,7 +1045,16 @@ Vollständige Lizenzinformationen finden Sie in den Dateien LICENSE.md und THIRD
     
     def show_calculation_method(self):
         """Zeigt eine verständliche Erklärung der Berechnungsmethode an"""
+        # Das Fenster wird beim ersten Aufruf aufgebaut und danach nur noch eingeblendet
+        if self.method_window is not None and self.method_window.winfo_exists():
+            self.method_window.deiconify()
+            self.method_window.lift()
+            self.method_window.grab_set()
+            self.method_window.focus_set()
+            return
+            
         method_window = tk.Toplevel(self.root)
+        self.method_window = method_window
         method_window.title("Berechnungsmethode - Fördermittelverteilung")
         method_window.geometry("700x600")
         method_window.resizable(True, True)
@@ -615,6 +1063,11 @@ Vollständige Lizenzinformationen finden Sie in den Dateien LICENSE.md und THIRD
         method_window.transient(self.root)
         method_window.grab_set()
         
+        def hide_window():
+            method_window.grab_release()
+            method_window.withdraw()
+        method_window.protocol('WM_DELETE_WINDOW', hide_window)
+        
         # Hauptframe mit Scrollbar
         main_frame = ttk.Frame(method_window)
         main_frame.pack(fill='both', expand=True, padx=20, pady=20)
@@ -721,7 +1174,7 @@ Vollständige Lizenzinformationen finden Sie in den Dateien LICENSE.md und THIRD
         # Schließen Button
         close_button = ttk.Button(scrollable_frame,
                                  text="Verstanden - Fenster schließen",
-                                 command=method_window.destroy,
+                                 command=hide_window,
                                  style='Primary.TButton')
         close_button.pack(pady=(20, 0))
         
@@ -745,11 +1198,18 @@ Vollständige Lizenzinformationen finden Sie in den Dateien LICENSE.md und THIRD
         self.root.update_idletasks()
         
     def log_message(self, message):
-        """Fügt eine Nachricht zum Berechnungsprotokoll hinzu"""
+        """Fügt eine Nachricht zum Berechnungsprotokoll hinzu (nur im Hauptthread)"""
+        self.append_log([self.format_log_line(message)])
+        
+    def format_log_line(self, message):
+        """Versieht eine Protokollzeile mit der Uhrzeit"""
         timestamp = datetime.now().strftime("%H:%M:%S")
-        self.log_text.insert('end', f"[{timestamp}] {message}\n")
+        return f"[{timestamp}] {message}"
+        
+    def append_log(self, zeilen):
+        """Fügt mehrere Protokollzeilen mit einer Einfügeoperation hinzu"""
+        self.log_text.insert('end', ''.join(f"{zeile}\n" for zeile in zeilen))
         self.log_text.see('end')
-        self.root.update_idletasks()
         
     def clear_log(self):
         """Löscht das Berechnungsprotokoll"""
@@ -758,23 +1218,26 @@ Vollständige Lizenzinformationen finden Sie in den Dateien LICENSE.md und THIRD
     def validate_parameters(self):
         """Validiert die eingegebenen Parameter"""
         try:
-            gesamtsumme = float(self.gesamtsumme_var.get().replace(',', ''))
-            mindestbetrag = float(self.mindestbetrag_var.get().replace(',', ''))
-            sockelbetrag = float(self.sockelbetrag_var.get()) / 100
-            
-            if gesamtsumme <= 0:
-                raise ValueError("Gesamtsumme muss positiv sein")
-            if mindestbetrag < 0:
-                raise ValueError("Mindestbetrag darf nicht negativ sein")
-            if not 0 <= sockelbetrag <= 1:
-                raise ValueError("Sockelbetrag muss zwischen 0 und 100% liegen")
-                
-            return gesamtsumme, mindestbetrag, sockelbetrag
-            
+            return self.parse_parameters()
         except ValueError as e:
             messagebox.showerror("Eingabefehler", f"Ungültige Parameter: {str(e)}")
             return None
             
+    def parse_parameters(self):
+        """Liest die Parameter; löst bei ungültigen Eingaben ValueError aus"""
+        gesamtsumme = float(self.gesamtsumme_var.get().replace(',', ''))
+        mindestbetrag = float(self.mindestbetrag_var.get().replace(',', ''))
+        sockelbetrag = float(self.sockelbetrag_var.get()) / 100
+        
+        if gesamtsumme <= 0:
+            raise ValueError("Gesamtsumme muss positiv sein")
+        if mindestbetrag < 0:
+            raise ValueError("Mindestbetrag darf nicht negativ sein")
+        if not 0 <= sockelbetrag <= 1:
+            raise ValueError("Sockelbetrag muss zwischen 0 und 100% liegen")
+            
+        return gesamtsumme, mindestbetrag, sockelbetrag
+            
     def add_kommune(self):
         """Fügt eine neue Kommune hinzu"""
         name = self.kommune_name_var.get().strip()
@@ -791,20 +1254,20 @@ Vollständige Lizenzinformationen finden Sie in den Dateien LICENSE.md und THIRD
                 raise ValueError("Werte dürfen nicht negativ sein")
                 
             # Prüfe auf doppelte Namen
-            for item in self.kommunen_tree.get_children():
-                if self.kommunen_tree.item(item)['values'][0] == name:
-                    messagebox.showwarning("Eingabefehler", "Eine Kommune mit diesem Namen existiert bereits.")
-                    return
-                    
-            # Füge zur Tabelle hinzu
-            self.kommunen_tree.insert('', 'end', values=(name, f"{wert_2019:,.2f}", kinder_u3))
+            if name in self.kommunen:
+                messagebox.showwarning("Eingabefehler", "Eine Kommune mit diesem Namen existiert bereits.")
+                return
+                
+            # Füge zum Modell und zur Tabelle hinzu
+            self.kommunen.hinzufuegen(name, wert_2019, kinder_u3)
+            self.insert_kommune_row(name, wert_2019, kinder_u3)
             
             # Leere Eingabefelder
             self.kommune_name_var.set('')
             self.wert_2019_var.set('')
             self.kinder_u3_var.set('')
             
-            self.update_calculation_info()
+            self.kommunen_changed()
             self.update_status(f"Kommune '{name}' hinzugefügt", self.colors['success'])
             
         except ValueError as e:
@@ -817,16 +1280,18 @@ Vollständige Lizenzinformationen finden Sie in den Dateien LICENSE.md und THIRD
             messagebox.showinfo("Hinweis", "Bitte wählen Sie eine Kommune zum Bearbeiten aus.")
             return
             
-        item = selection[0]
-        values = self.kommunen_tree.item(item)['values']
+        name = selection[0]
+        wert_2019, kinder_u3 = self.kommunen.werte(name)
         
         # Setze Werte in Eingabefelder
-        self.kommune_name_var.set(values[0])
-        self.wert_2019_var.set(str(values[1]).replace(',', ''))
-        self.kinder_u3_var.set(str(values[2]))
+        self.kommune_name_var.set(name)
+        self.wert_2019_var.set(f"{wert_2019:.2f}")
+        self.kinder_u3_var.set(format_anzahl(kinder_u3).replace(',', ''))
         
         # Lösche alte Zeile
-        self.kommunen_tree.delete(item)
+        self.kommunen.entfernen([name])
+        self.kommunen_tree.delete(name)
+        self.kommunen_changed()
         
     def delete_kommune(self):
         """Löscht die ausgewählte Kommune"""
@@ -836,18 +1301,22 @@ Vollständige Lizenzinformationen finden Sie in den Dateien LICENSE.md und THIRD
             return
             
         if messagebox.askyesno("Bestätigung", "Möchten Sie die ausgewählte Kommune wirklich löschen?"):
-            for item in selection:
-                name = self.kommunen_tree.item(item)['values'][0]
-                self.kommunen_tree.delete(item)
-                self.update_status(f"Kommune '{name}' gelöscht", self.colors['text_secondary'])
+            self.kommunen.entfernen(selection)
+            self.kommunen_tree.delete(*selection)
+            
+            if len(selection) == 1:
+                self.update_status(f"Kommune '{selection[0]}' gelöscht", self.colors['text_secondary'])
+            else:
+                self.update_status(f"{len(selection)} Kommunen gelöscht", self.colors['text_secondary'])
                 
-            self.update_calculation_info()
+            self.kommunen_changed()
             
     def clear_all_kommunen(self):
         """Löscht alle Kommunen"""
         if messagebox.askyesno("Bestätigung", "Möchten Sie wirklich alle Kommunen löschen?"):
+            self.kommunen.leeren()
             self.kommunen_tree.delete(*self.kommunen_tree.get_children())
-            self.update_calculation_info()
+            self.kommunen_changed()
             self.update_status("Alle Kommunen gelöscht", self.colors['text_secondary'])
             
     def load_example_data(self):
@@ -866,9 +1335,20 @@ Vollständige Lizenzinformationen finden Sie in den Dateien LICENSE.md und THIRD
         ]
         
         for name, wert_2019, kinder_u3 in beispiel_kommunen:
-            self.kommunen_tree.insert('', 'end', values=(name, f"{wert_2019:,.2f}", kinder_u3))
+            self.kommunen.hinzufuegen(name, wert_2019, kinder_u3)
+            self.insert_kommune_row(name, wert_2019, kinder_u3)
             
+        self.kommunen_changed()
+        
+    def insert_kommune_row(self, name, wert_2019, kinder_u3):
+        """Zeigt eine Kommune des Modells in der Tabelle an (Zeilen-ID = Name)"""
+        self.kommunen_tree.insert('', 'end', iid=name,
+                                  values=(name, f"{wert_2019:,.2f}", format_anzahl(kinder_u3)))
+        
+    def kommunen_changed(self):
+        """Wird nach jeder Änderung der Kommunenliste aufgerufen"""
         self.update_calculation_info()
+        self.schedule_live_calculation()
         
     def update_calculation_info(self):
         """Aktualisiert die Berechnungsinformationen"""
@@ -876,21 +1356,14 @@ Vollständige Lizenzinformationen finden Sie in den Dateien LICENSE.md und THIRD
         if not hasattr(self, 'info_text'):
             return
             
-        anzahl_kommunen = len(self.kommunen_tree.get_children())
-        
-        if anzahl_kommunen > 0:
-            total_wert_2019 = sum(float(self.kommunen_tree.item(item)['values'][1].replace(',', '')) 
-                                 for item in self.kommunen_tree.get_children())
-            total_kinder_u3 = sum(float(self.kommunen_tree.item(item)['values'][2]) 
-                                 for item in self.kommunen_tree.get_children())
-        else:
-            total_wert_2019 = 0
-            total_kinder_u3 = 0
+        anzahl_kommunen = len(self.kommunen)
+        total_wert_2019 = self.kommunen.summe_wert_2019
+        total_kinder_u3 = self.kommunen.summe_kinder_u3
             
         info_text = f"""Berechnungsgrundlage:
 • Anzahl Kommunen: {anzahl_kommunen}
 • Summe Wert 2019: {total_wert_2019:,.2f} €
-• Summe Kinder U3: {total_kinder_u3}"""
+• Summe Kinder U3: {format_anzahl(total_kinder_u3)}"""
         
         self.info_text.delete('1.0', 'end')
         self.info_text.insert('1.0', info_text)
@@ -905,63 +1378,245 @@ Vollständige Lizenzinformationen finden Sie in den Dateien LICENSE.md und THIRD
         gesamtsumme, mindestbetrag, sockelbetrag = params
         
         # Prüfe ob Kommunen vorhanden
-        if len(self.kommunen_tree.get_children()) == 0:
+        if len(self.kommunen) == 0:
             messagebox.showwarning("Keine Daten", "Bitte fügen Sie mindestens eine Kommune hinzu.")
             return
             
+        self.ensure_calculation_tab()
+        
+        from foerdermittel_auftrag import Berechnungsauftrag
+        self.auftrag = Berechnungsauftrag(
+            fortschritt=lambda info: self.post_ui(self.update_progress, info))
+        
         # UI für Berechnung vorbereiten
         self.calc_button.config(state='disabled', text="⏳ Berechnung läuft...")
-        self.progress.start()
+        self.cancel_button.config(state='normal')
+        self.progress['value'] = 0
+        self.progress_label.config(text="")
         self.clear_log()
         self.update_status("Berechnung läuft...", self.colors['primary'])
         
         # Starte Berechnung in separatem Thread
+        # Der Thread erhält eine Kopie der Spalten, damit Änderungen während
+        # der Berechnung keinen Einfluss haben
         thread = threading.Thread(target=self._run_calculation, 
-                                 args=(gesamtsumme, mindestbetrag, sockelbetrag))
+                                 args=(self.auftrag, gesamtsumme, mindestbetrag, sockelbetrag,
+                                       *self.kommunen.kopie()))
         thread.daemon = True
         thread.start()
         
-    def _run_calculation(self, gesamtsumme, mindestbetrag, sockelbetrag):
-        """Führt die Berechnung durch (läuft in separatem Thread)"""
+    def _run_calculation(self, auftrag, gesamtsumme, mindestbetrag, sockelbetrag,
+                         namen, werte_2019, kinder):
+        """
+        Führt die Berechnung durch (läuft in separatem Thread)
+        
+        Der Thread greift nicht auf Widgets zu; Protokollzeilen und das
+        Ergebnis gehen über die UI-Warteschlange an den Hauptthread.
+        """
+        from foerdermittel_auftrag import AuftragAbgebrochen
         try:
-            # Erstelle Rechner-Instanz
-            self.rechner = FoerdermittelRechner(gesamtsumme)
-            self.rechner.mindestbetrag = mindestbetrag
-            self.rechner.sockelbetrag_prozent = sockelbetrag
+            from foerdermittel_rechner import FoerdermittelRechner
+            from foerdermittel_ereignisse import RueckrufAusgabe
             
-            self.log_message("Berechnung gestartet...")
-            self.log_message(f"Gesamtsumme: {gesamtsumme:,.2f} €")
-            self.log_message(f"Mindestbetrag: {mindestbetrag:,.2f} €")
-            self.log_message(f"Sockelbetrag: {sockelbetrag*100:.1f}%")
-            self.log_message("-" * 50)
+            # Erstelle Rechner-Instanz; Rundenereignisse gehen ins Protokoll
+            rechner = FoerdermittelRechner(gesamtsumme, ausgabe=RueckrufAusgabe(self.post_log))
+            rechner.mindestbetrag = mindestbetrag
+            rechner.sockelbetrag_prozent = sockelbetrag
+            
+            self.post_log("Berechnung gestartet...")
+            self.post_log(f"Gesamtsumme: {gesamtsumme:,.2f} €")
+            self.post_log(f"Mindestbetrag: {mindestbetrag:,.2f} €")
+            self.post_log(f"Sockelbetrag: {sockelbetrag*100:.1f}%")
+            self.post_log("-" * 50)
             
             # Füge Kommunen hinzu
-            for item in self.kommunen_tree.get_children():
-                values = self.kommunen_tree.item(item)['values']
-                name = values[0]
-                wert_2019 = float(values[1].replace(',', ''))
-                kinder_u3 = float(values[2])
-                
-                self.rechner.kommune_hinzufuegen(name, wert_2019, kinder_u3)
-                self.log_message(f"Kommune hinzugefügt: {name}")
-                
-            self.log_message("-" * 50)
-            self.log_message("Starte iterative Berechnung...")
+            rechner.kommunen_hinzufuegen(namen, werte_2019, kinder)
+            self.post_log(f"{len(namen)} Kommunen übernommen")
             
-            # Führe Berechnung durch
-            ergebnis = self.rechner.berechne_verteilung()
+            self.post_log("-" * 50)
+            self.post_log("Starte iterative Berechnung...")
+            
+            # Führe Berechnung als abbrechbaren Auftrag durch
+            ergebnis = auftrag.ausfuehren(rechner)
             
             # Aktualisiere UI im Hauptthread
-            self.root.after(0, self._calculation_completed, ergebnis)
+            self.post_ui(self._calculation_completed, rechner, ergebnis)
             
+        except AuftragAbgebrochen:
+            self.post_ui(self._calculation_cancelled)
         except Exception as e:
-            self.root.after(0, self._calculation_error, str(e))
+            self.post_ui(self._calculation_error, str(e))
+            
+    def toggle_live_calculation(self):
+        """Schaltet die Live-Berechnung ein oder aus"""
+        if self.live_var.get():
+            self.schedule_live_calculation()
+        else:
+            if self.live_after_id is not None:
+                self.root.after_cancel(self.live_after_id)
+                self.live_after_id = None
+            # Laufende Live-Berechnung abbrechen und ihr Ergebnis verwerfen
+            self.live_generation += 1
+            if self.live_auftrag is not None:
+                self.live_auftrag.abbrechen()
+                self.live_auftrag = None
+                
+    def schedule_live_calculation(self, *args):
+        """Plant die Live-Berechnung nach der letzten Änderung (Entprellung)"""
+        if not self.live_var.get():
+            return
+        if self.live_after_id is not None:
+            self.root.after_cancel(self.live_after_id)
+        self.live_after_id = self.root.after(LIVE_VERZOEGERUNG_MS, self.start_live_calculation)
+        
+    def start_live_calculation(self):
+        """Übergibt die aktuellen Eingaben an den Thread der Live-Berechnung"""
+        self.live_after_id = None
+        try:
+            gesamtsumme, mindestbetrag, sockelbetrag = self.parse_parameters()
+        except ValueError as e:
+            self.update_status(f"Live-Berechnung: {e}", 'red')
+            return
+        if len(self.kommunen) == 0:
+            return
             
-    def _calculation_completed(self, ergebnis):
+        from foerdermittel_auftrag import Berechnungsauftrag
+        
+        # Laufende Berechnung mit veralteten Eingaben abbrechen
+        if self.live_auftrag is not None:
+            self.live_auftrag.abbrechen()
+        self.live_auftrag = Berechnungsauftrag()
+        self.live_generation += 1
+        
+        # Nur die Änderungen seit der letzten Anfrage übertragen
+        aenderungen = self.kommunen.aenderungen_seit(self.live_version)
+        if aenderungen is None:
+            kommunen = ('neu', self.kommunen.kopie())
+        else:
+            kommunen = ('aenderungen', aenderungen)
+        self.live_version = self.kommunen.version
+        
+        self.live_queue.put({'generation': self.live_generation, 'auftrag': self.live_auftrag,
+                             'gesamtsumme': gesamtsumme, 'mindestbetrag': mindestbetrag,
+                             'sockelbetrag': sockelbetrag, 'kommunen': kommunen})
+        
+        if self.live_thread is None:
+            self.live_thread = threading.Thread(target=self._live_worker, daemon=True)
+            self.live_thread.start()
+        self.update_status("Live-Berechnung läuft...", self.colors['primary'])
+        
+    def _live_worker(self):
+        """
+        Thread der Live-Berechnung
+        
+        Hält einen InkrementellerRechner, führt die Änderungen der
+        Kommunenliste nach und berechnet nur die jeweils neueste Anfrage.
+        Ergebnisse gehen über die UI-Warteschlange an den Hauptthread.
+        """
+        from foerdermittel_inkrementell import InkrementellerRechner
+        from foerdermittel_ereignisse import StilleAusgabe
+        from foerdermittel_auftrag import AuftragAbgebrochen
+        
+        rechner = None
+        while True:
+            anfragen = [self.live_queue.get()]
+            while True:
+                try:
+                    anfragen.append(self.live_queue.get_nowait())
+                except queue.Empty:
+                    break
+                    
+            anfrage = anfragen[-1]
+            try:
+                # Änderungen aller Anfragen in ihrer Reihenfolge übernehmen
+                for vorherige in anfragen:
+                    art, daten = vorherige['kommunen']
+                    if art == 'neu':
+                        rechner = InkrementellerRechner(vorherige['gesamtsumme'],
+                                                        ausgabe=StilleAusgabe())
+                        rechner.kommunen_hinzufuegen(*daten)
+                    elif rechner is not None:
+                        for aenderung in daten:
+                            if aenderung[0] == 'hinzufuegen':
+                                rechner.kommune_hinzufuegen(*aenderung[1:])
+                            else:
+                                for name in aenderung[1]:
+                                    rechner.kommune_entfernen(name)
+                                    
+                # Nur die neueste Anfrage berechnen, sofern sie noch aktuell ist
+                if rechner is None or anfrage['generation'] != self.live_generation:
+                    continue
+                rechner.gesamtsumme = anfrage['gesamtsumme']
+                rechner.mindestbetrag = anfrage['mindestbetrag']
+                rechner.sockelbetrag_prozent = anfrage['sockelbetrag']
+                ergebnis = anfrage['auftrag'].ausfuehren(rechner)
+                
+                # Momentaufnahme ohne gemeinsame Arrays, damit Anzeige und Export
+                # vom weiterrechnenden Rechner unabhängig sind
+                self.post_ui(self._live_calculation_completed, anfrage['generation'],
+                             rechner.momentaufnahme(), ergebnis)
+            except AuftragAbgebrochen:
+                continue
+            except Exception as e:
+                # Beim nächsten Mal vollständig neu aufbauen
+                rechner = None
+                self.post_ui(self._live_calculation_error, anfrage['generation'], str(e))
+                
+    def _live_calculation_completed(self, generation, rechner, ergebnis):
+        """Zeigt das Ergebnis der Live-Berechnung an, sofern es noch aktuell ist"""
+        if generation != self.live_generation:
+            return
+        self.live_auftrag = None
+        self.rechner = rechner
+        self.display_results(ergebnis)
+        self.update_status(f"Live-Berechnung aktualisiert ({datetime.now().strftime('%H:%M:%S')})",
+                           self.colors['success'])
+        
+    def _live_calculation_error(self, generation, error_message):
+        """Meldet einen Fehler der Live-Berechnung in der Statuszeile"""
+        # Der Thread baut den Rechner bei der nächsten Anfrage neu auf
+        self.live_version = -1
+        if generation == self.live_generation:
+            self.live_auftrag = None
+            self.update_status(f"Live-Berechnung fehlgeschlagen: {error_message}", 'red')
+            
+    def update_progress(self, info):
+        """Zeigt Fortschritt, Phase und geschätzte Restzeit einer Berechnung an"""
+        from foerdermittel_auftrag import formatiere_restzeit
+        
+        self.progress['value'] = info['anteil'] * 100
+        phase = PHASEN_TEXTE.get(info['phase'], info['phase'])
+        self.progress_label.config(
+            text=f"{phase}: {info['anteil']:.0%} – Restzeit {formatiere_restzeit(info['restzeit'])}")
+        
+    def cancel_calculation(self):
+        """Fordert den Abbruch der laufenden Berechnung an"""
+        if self.auftrag is not None:
+            self.auftrag.abbrechen()
+            self.cancel_button.config(state='disabled')
+            self.update_status("Berechnung wird abgebrochen...", self.colors['text_secondary'])
+            
+    def reset_calculation_ui(self):
+        """Setzt Buttons und Fortschrittsanzeige nach einer Berechnung zurück"""
+        self.auftrag = None
+        self.calc_button.config(state='normal', text="🚀 Berechnung starten")
+        self.cancel_button.config(state='disabled')
+        self.progress_label.config(text="")
+        
+    def _calculation_cancelled(self):
+        """Wird aufgerufen wenn die Berechnung abgebrochen wurde"""
+        self.reset_calculation_ui()
+        self.progress['value'] = 0
+        self.update_status("Berechnung abgebrochen", self.colors['text_secondary'])
+        self.log_message("⏹ Berechnung abgebrochen")
+        
+    def _calculation_completed(self, rechner, ergebnis):
         """Wird aufgerufen wenn die Berechnung abgeschlossen ist"""
+        self.rechner = rechner
+        
         # UI zurücksetzen
-        self.calc_button.config(state='normal', text="🚀 Berechnung starten")
-        self.progress.stop()
+        self.reset_calculation_ui()
+        self.progress['value'] = 100
         self.update_status("Berechnung abgeschlossen", self.colors['success'])
         
         self.log_message("=" * 50)
@@ -978,8 +1633,8 @@ Vollständige Lizenzinformationen finden Sie in den Dateien LICENSE.md und THIRD
     def _calculation_error(self, error_message):
         """Wird aufgerufen wenn ein Fehler bei der Berechnung auftritt"""
         # UI zurücksetzen
-        self.calc_button.config(state='normal', text="🚀 Berechnung starten")
-        self.progress.stop()
+        self.reset_calculation_ui()
+        self.progress['value'] = 0
         self.update_status("Fehler bei Berechnung", 'red')
         
         self.log_message(f"❌ FEHLER: {error_message}")
@@ -988,8 +1643,7 @@ Vollständige Lizenzinformationen finden Sie in den Dateien LICENSE.md und THIRD
         
     def display_results(self, ergebnis):
         """Zeigt die Berechnungsergebnisse an"""
-        # Lösche alte Ergebnisse
-        self.results_tree.delete(*self.results_tree.get_children())
+        self.ensure_results_tab()
         
         # Lösche alte Summary
         for widget in self.summary_frame.winfo_children():
@@ -1016,177 +1670,120 @@ Vollständige Lizenzinformationen finden Sie in den Dateien LICENSE.md und THIRD
             ttk.Label(frame, text=value, font=('Segoe UI', 12, 'bold'), 
                      foreground=color).pack()
                      
-        # Ergebnisse in Tabelle einfügen
-        for _, row in ergebnis.iterrows():
-            values = (
-                row['Name'],
-                f"{row['Wert_2019']:,.0f}",
-                f"{row['Kinder_U3']:.6f}",  # BUGFIX: Verwende volle Dezimalstellen für präzise Berechnung
-                f"{row['Sockelbetrag']:,.0f}",
-                f"{row['U3_Anteil']:,.0f}",
-                f"{row['Zwischensumme']:,.0f}",
-                f"{row['Endbetrag']:,.0f}",
-                row['Status']
-            )
-            self.results_tree.insert('', 'end', values=values)
+        # Ergebnisse spaltenweise an die virtuelle Tabelle übergeben
+        self.results_table.setze_daten([ergebnis[spalte].tolist() for spalte in ERGEBNIS_SPALTEN])
             
     def import_excel(self):
-        """Importiert Kommunendaten aus Excel"""
+        """Importiert Kommunendaten aus Excel (liest die Datei im Hintergrund)"""
         filename = filedialog.askopenfilename(
             title="Excel-Datei auswählen",
-            filetypes=[("Excel files", "*.xlsx *.xls"), ("All files", "*.*")]
+            filetypes=[("Excel files", "*.xlsx *.xls"), ("CSV files", "*.csv"), ("All files", "*.*")]
         )
         
         if not filename:
             return
             
+        from foerdermittel_auftrag import Auftrag
+        from foerdermittel_ereignisse import PHASE_IMPORT
+        
+        auftrag = Auftrag((PHASE_IMPORT,),
+                          fortschritt=lambda info: self.post_ui(self.update_import_progress, info))
+        self.update_status("Import läuft...", self.colors['primary'])
+        
+        thread = threading.Thread(target=self._run_import, args=(auftrag, filename))
+        thread.daemon = True
+        thread.start()
+        
+    def _run_import(self, auftrag, filename):
+        """
+        Liest und konvertiert die Excel-Datei (läuft in separatem Thread)
+        
+        Die Datei wird einmal im read-only-Modus gelesen, die Zahlen werden
+        spaltenweise umgewandelt; das Ergebnis geht über die
+        UI-Warteschlange an den Hauptthread. Wurde dieselbe Datei schon
+        einmal importiert, kommen die Daten aus dem Import-Cache.
+        """
+        from foerdermittel_import import lies_kommunen, FehlendeSpalten
+        from foerdermittel_importcache import ImportCache
         try:
-            # Versuche verschiedene Sheets und Formate
-            df = None
+            auftrag.starten()
+            # Werte spaltenweise umwandeln, ungültige Zeilen werden verworfen
+            daten = lies_kommunen(filename, fortschritt=auftrag.melde, cache=ImportCache())
             
-            # Versuche zuerst "Kommunendaten" Sheet
-            try:
-                df = pd.read_excel(filename, sheet_name="Kommunendaten", skiprows=7)
-            except:
-                # Versuche erstes Sheet
-                df = pd.read_excel(filename)
-                
-            if df is None:
-                raise ValueError("Konnte keine Daten lesen")
-                
-            # Spalten-Mapping versuchen
-            column_mapping = {
-                'Kommune': 'Name',
-                'Name': 'Name', 
-                'Gemeinde': 'Name',
-                'Stadt': 'Name',
-                'Wert 2019 (€)': 'Wert_2019',
-                'Wert 2019': 'Wert_2019',
-                'Wert_2019': 'Wert_2019',
-                'Kinder U3 im SGB-II-Bezug': 'Kinder_U3',
-                'Kinder U3': 'Kinder_U3',
-                'Kinder_U3': 'Kinder_U3',
-                'U3': 'Kinder_U3'
-            }
-            
-            # Rename columns
-            for old_name, new_name in column_mapping.items():
-                if old_name in df.columns:
-                    df = df.rename(columns={old_name: new_name})
-                    
-            # Prüfe erforderliche Spalten
-            required_cols = ['Name', 'Wert_2019', 'Kinder_U3']
-            missing_cols = [col for col in required_cols if col not in df.columns]
-            
-            if missing_cols:
-                messagebox.showerror("Import-Fehler", 
-                                   f"Fehlende Spalten: {', '.join(missing_cols)}\n\n" +
-                                   "Erwartete Spalten: Kommune, Wert 2019 (€), Kinder U3 im SGB-II-Bezug")
-                return
-                
-            # Bereinige Daten
-            df = df.dropna(subset=['Name'])
-            
-            # Verbesserte Zahlenkonvertierung für deutsche Formate
-            def convert_german_number(value):
-                """Konvertiert deutsche Zahlenformate (z.B. 1.000,50 oder 35,000)"""
-                if pd.isna(value):
-                    return None
-                
-                # Bereits numerisch?
-                if isinstance(value, (int, float)):
-                    return float(value)
-                
-                # String-Verarbeitung
-                str_val = str(value).strip()
-                if not str_val:
-                    return None
-                
-                # Entferne Währungssymbole und Leerzeichen
-                str_val = str_val.replace('€', '').replace(' ', '')
-                
-                # Intelligente Zahlenformatierung
-                if ',' in str_val and '.' in str_val:
-                    comma_pos = str_val.rfind(',')
-                    dot_pos = str_val.rfind('.')
-                    
-                    if comma_pos > dot_pos:
-                        # Format: 1.000,50 (deutsch) → 1000.50
-                        str_val = str_val.replace('.', '').replace(',', '.')
-                    else:
-                        # Format: 1,000.50 (amerikanisch) → 1000.50
-                        # Entferne alle Kommata außer dem letzten Punkt
-                        parts = str_val.split('.')
-                        if len(parts) >= 2:
-                            # Behalte nur den letzten Teil nach dem Punkt als Dezimalstellen
-                            integer_part = '.'.join(parts[:-1]).replace(',', '')
-                            decimal_part = parts[-1]
-                            str_val = f"{integer_part}.{decimal_part}"
-                        else:
-                            str_val = str_val.replace(',', '')
-                elif ',' in str_val:
-                    # Prüfe ob Komma als Dezimaltrennzeichen oder Tausendertrennzeichen
-                    comma_pos = str_val.rfind(',')
-                    after_comma = str_val[comma_pos+1:]
-                    # Wenn nach Komma genau 1-2 Ziffern → wahrscheinlich Dezimaltrennzeichen
-                    # Wenn nach Komma genau 3 Ziffern → wahrscheinlich Tausendertrennzeichen
-                    if len(after_comma) <= 2 and after_comma.isdigit():
-                        # Prüfe ob es mehrere Kommata gibt (dann Tausendertrennzeichen)
-                        comma_count = str_val.count(',')
-                        if comma_count == 1:
-                            str_val = str_val.replace(',', '.')
-                        else:
-                            # Mehrere Kommata → alle entfernen außer dem letzten
-                            parts = str_val.split(',')
-                            if len(parts) >= 2:
-                                integer_part = ''.join(parts[:-1])
-                                decimal_part = parts[-1]
-                                str_val = f"{integer_part}.{decimal_part}"
-                    else:
-                        # 3+ Ziffern nach Komma oder nicht-numerisch → Tausendertrennzeichen
-                        str_val = str_val.replace(',', '')
-                
-                try:
-                    return float(str_val)
-                except ValueError:
-                    return None
+            self.post_ui(self._import_loaded, daten['namen'], daten['wert_2019'].tolist(),
+                         daten['kinder_u3'].tolist(), daten['ungueltige_zeilen'],
+                         daten['aus_cache'])
             
-            # Konvertiere Werte mit verbesserter Funktion
-            df['Wert_2019'] = df['Wert_2019'].apply(convert_german_number)
-            df['Kinder_U3'] = df['Kinder_U3'].apply(convert_german_number)
+        except FehlendeSpalten as e:
+            self.post_ui(self._import_failed,
+                         f"{e}\n\nErwartete Spalten: Kommune, Wert 2019 (€), Kinder U3 im SGB-II-Bezug")
+        except Exception as e:
+            self.post_ui(self._import_failed, f"Fehler beim Import:\n{str(e)}")
             
-            # Entferne ungültige Daten
-            df = df.dropna(subset=['Wert_2019', 'Kinder_U3'])
-            df = df[(df['Wert_2019'] >= 0) & (df['Kinder_U3'] >= 0)]
+    def update_import_progress(self, info):
+        """Zeigt den Fortschritt des Imports in der Statuszeile an"""
+        if info['gesamt']:
+            self.update_status(f"Import: {info['schritt']:,} von {info['gesamt']:,} Zeilen gelesen",
+                               self.colors['primary'])
+        else:
+            self.update_status(f"Import: {info['schritt']:,} Zeilen gelesen", self.colors['primary'])
             
-            if len(df) == 0:
-                messagebox.showwarning("Import-Warnung", "Keine gültigen Daten in der Datei gefunden.")
-                return
-                
-            # Lösche bestehende Daten
-            if messagebox.askyesno("Bestätigung", 
-                                  f"Sollen die {len(df)} importierten Kommunen die bestehenden Daten ersetzen?"):
-                self.kommunen_tree.delete(*self.kommunen_tree.get_children())
-                
-            # Füge neue Daten hinzu
-            imported_count = 0
-            for _, row in df.iterrows():
-                try:
-                    name = str(row['Name']).strip()
-                    wert_2019 = float(row['Wert_2019'])
-                    kinder_u3 = float(row['Kinder_U3'])  # BUGFIX: Verwende float() statt int() für Konsistenz
-                    
-                    self.kommunen_tree.insert('', 'end', values=(name, f"{wert_2019:,.2f}", f"{kinder_u3:.6f}"))
-                    imported_count += 1
-                except:
-                    continue
-                    
-            self.update_calculation_info()
-            self.update_status(f"{imported_count} Kommunen importiert", self.colors['success'])
-            messagebox.showinfo("Import erfolgreich", f"{imported_count} Kommunen wurden erfolgreich importiert.")
+    def _import_failed(self, message):
+        """Meldet einen fehlgeschlagenen Import"""
+        self.update_status("Import fehlgeschlagen", 'red')
+        messagebox.showerror("Import-Fehler", message)
+        
+    def _import_loaded(self, namen, werte_2019, kinder, ungueltige_zeilen=(), aus_cache=False):
+        """Übernimmt die im Hintergrund gelesenen Kommunen (im Hauptthread)"""
+        hinweis = ""
+        if ungueltige_zeilen:
+            hinweis = (f"\n{len(ungueltige_zeilen)} Zeilen enthalten Werte, die nicht als Zahl "
+                       f"gelesen werden konnten (Zeilen {format_zeilen(ungueltige_zeilen)}).")
             
-        except Exception as e:
-            messagebox.showerror("Import-Fehler", f"Fehler beim Import:\n{str(e)}")
+        if len(namen) == 0:
+            self.update_status("Import: keine gültigen Daten", 'red')
+            messagebox.showwarning("Import-Warnung", "Keine gültigen Daten in der Datei gefunden." + hinweis)
+            return
+            
+        # Lösche bestehende Daten
+        if messagebox.askyesno("Bestätigung", 
+                              f"Sollen die {len(namen)} importierten Kommunen die bestehenden Daten ersetzen?"):
+            self.kommunen.leeren()
+            self.kommunen_tree.delete(*self.kommunen_tree.get_children())
+            
+        # Füge neue Daten zum Modell hinzu
+        neue_namen = []
+        duplicate_count = 0
+        for name, wert_2019, kinder_u3 in zip(namen, werte_2019, kinder):
+            if name in self.kommunen:
+                duplicate_count += 1
+                continue
+            self.kommunen.hinzufuegen(name, wert_2019, kinder_u3)
+            neue_namen.append(name)
+        imported_count = len(neue_namen)
+        
+        # Tabelle blockweise füllen, damit die Oberfläche bedienbar bleibt
+        self.insert_kommune_rows(neue_namen)
+                
+        self.kommunen_changed()
+        herkunft = " (aus dem Import-Cache)" if aus_cache else ""
+        self.update_status(f"{imported_count} Kommunen importiert{herkunft}", self.colors['success'])
+        meldung = f"{imported_count} Kommunen wurden erfolgreich importiert."
+        if duplicate_count:
+            meldung += f"\n{duplicate_count} bereits vorhandene Kommunen wurden übersprungen."
+        if hinweis:
+            messagebox.showwarning("Import mit Hinweisen", meldung + hinweis)
+        else:
+            messagebox.showinfo("Import erfolgreich", meldung)
+        
+    def insert_kommune_rows(self, namen, start=0):
+        """Fügt Kommunen des Modells in Blöcken von IMPORT_STAPELGROESSE Zeilen in die Tabelle ein"""
+        for name in namen[start:start + IMPORT_STAPELGROESSE]:
+            # Inzwischen gelöschte oder bereits angezeigte Kommunen überspringen
+            if name in self.kommunen and not self.kommunen_tree.exists(name):
+                self.insert_kommune_row(name, *self.kommunen.werte(name))
+        if start + IMPORT_STAPELGROESSE < len(namen):
+            self.root.after(1, self.insert_kommune_rows, namen, start + IMPORT_STAPELGROESSE)
             
     def create_template(self):
         """Erstellt eine Excel-Vorlage"""
@@ -1212,7 +1809,7 @@ Vollständige Lizenzinformationen finden Sie in den Dateien LICENSE.md und THIRD
             messagebox.showerror("Fehler", f"Fehler beim Erstellen der Vorlage:\n{str(e)}")
             
     def export_excel(self):
-        """Exportiert die Ergebnisse nach Excel"""
+        """Exportiert die Ergebnisse nach Excel (oder ein anderes Format je nach Dateiendung)"""
         if self.rechner is None:
             messagebox.showwarning("Keine Ergebnisse", "Bitte führen Sie zuerst eine Berechnung durch.")
             return
@@ -1220,21 +1817,82 @@ Vollständige Lizenzinformationen finden Sie in den Dateien LICENSE.md und THIRD
         filename = filedialog.asksaveasfilename(
             title="Ergebnisse exportieren",
             defaultextension=".xlsx",
-            filetypes=[("Excel files", "*.xlsx"), ("All files", "*.*")],
+            filetypes=[("Excel files", "*.xlsx"), ("CSV files", "*.csv"),
+                       ("JSON Lines", "*.jsonl"), ("Parquet files", "*.parquet"),
+                       ("Arrow files", "*.arrow *.feather"), ("NumPy archives", "*.npz"),
+                       ("All files", "*.*")],
             initialfile=f"foerdermittel_ergebnis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
         )
         
         if not filename:
             return
             
+        if self.export_auftrag is not None:
+            messagebox.showwarning("Export läuft", "Bitte warten Sie, bis der laufende Export beendet ist.")
+            return
+            
+        from foerdermittel_auftrag import Exportauftrag
+        self.export_auftrag = Exportauftrag(
+            filename, fortschritt=lambda info: self.post_ui(self.update_export_progress, info))
+        
+        self.export_progress['value'] = 0
+        self.export_cancel_button.config(state='normal')
+        self.update_status("Export läuft...", self.colors['primary'])
+        
+        # Export in separatem Thread, damit er abgebrochen werden kann
+        thread = threading.Thread(target=self._run_export,
+                                 args=(self.export_auftrag, self.rechner, filename))
+        thread.daemon = True
+        thread.start()
+        
+    def _run_export(self, auftrag, rechner, filename):
+        """Führt den Export durch (läuft in separatem Thread)"""
+        from foerdermittel_auftrag import AuftragAbgebrochen
         try:
-            self.rechner.exportiere_excel(filename)
+            auftrag.ausfuehren(rechner)
+            self.post_ui(self._export_finished, filename, None)
+        except AuftragAbgebrochen:
+            self.post_ui(self._export_finished, filename, False)
+        except Exception as e:
+            self.post_ui(self._export_finished, filename, str(e))
+            
+    def update_export_progress(self, info):
+        """Zeigt den Fortschritt des Exports an"""
+        from foerdermittel_auftrag import formatiere_restzeit
+        
+        self.export_progress['value'] = info['anteil'] * 100
+        self.update_status(f"Export: {info['anteil']:.0%} – Restzeit "
+                           f"{formatiere_restzeit(info['restzeit'])}", self.colors['primary'])
+        
+    def cancel_export(self):
+        """Fordert den Abbruch des laufenden Exports an"""
+        if self.export_auftrag is not None:
+            self.export_auftrag.abbrechen()
+            self.export_cancel_button.config(state='disabled')
+            
+    def _export_finished(self, filename, fehler):
+        """
+        Wird nach dem Export aufgerufen
+        
+        Args:
+            filename: Ziel-Datei
+            fehler: None bei Erfolg, False bei Abbruch, sonst Fehlermeldung
+        """
+        self.export_auftrag = None
+        self.export_cancel_button.config(state='disabled')
+        
+        if fehler is None:
+            self.export_progress['value'] = 100
+            self.update_status("Export abgeschlossen", self.colors['success'])
             messagebox.showinfo("Export erfolgreich", 
                               f"Die Ergebnisse wurden erfolgreich exportiert:\n{filename}")
-            self.update_status("Export abgeschlossen", self.colors['success'])
-            
-        except Exception as e:
-            messagebox.showerror("Export-Fehler", f"Fehler beim Export:\n{str(e)}")
+        elif fehler is False:
+            self.export_progress['value'] = 0
+            self.update_status("Export abgebrochen", self.colors['text_secondary'])
+        else:
+            self.export_progress['value'] = 0
+            self.update_status("Fehler beim Export", 'red')
+            messagebox.showerror("Export-Fehler", f"Fehler beim Export:\n{fehler}")
             
     def copy_to_clipboard(self):
         """Kopiert die Ergebnisse in die Zwischenablage"""
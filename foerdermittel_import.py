@@ -0,0 +1,238 @@
+"""
+Einlesen von Kommunendaten aus Excel-Dateien
+
+Die Datei wird genau einmal geöffnet und zeilenweise gelesen (openpyxl im
+read-only-Modus). Dabei werden das Tabellenblatt ("Kommunendaten", sonst
+das erste Blatt) und die Kopfzeile in einem Durchlauf erkannt: Die erste
+Zeile, die Spalten für Name, Wert 2019 und Kinder U3 enthält, gilt als
+Kopfzeile, alle folgenden Zeilen als Daten. Dateien im alten .xls-Format
+werden über pandas gelesen, CSV-Dateien (Trennzeichen ; , oder Tabulator,
+UTF-8 oder Windows-1252) mit dem csv-Modul; beide werden ebenso ausgewertet.
+"""
+import csv
+import io
+import os
+from foerdermittel_ereignisse import PHASE_IMPORT
+
+# Spaltenüberschriften und zugehörige Spalten
+SPALTEN_ZUORDNUNG = {
+    'Kommune': 'Name',
+    'Name': 'Name',
+    'Gemeinde': 'Name',
+    'Stadt': 'Name',
+    'Wert 2019 (€)': 'Wert_2019',
+    'Wert 2019': 'Wert_2019',
+    'Wert_2019': 'Wert_2019',
+    'Kinder U3 im SGB-II-Bezug': 'Kinder_U3',
+    'Kinder U3': 'Kinder_U3',
+    'Kinder_U3': 'Kinder_U3',
+    'U3': 'Kinder_U3'
+}
+
+ERFORDERLICHE_SPALTEN = ('Name', 'Wert_2019', 'Kinder_U3')
+
+# Bevorzugtes Tabellenblatt (Import-Vorlage)
+VORLAGEN_BLATT = "Kommunendaten"
+
+# In so vielen Zeilen wird nach der Kopfzeile gesucht
+KOPFZEILEN_SUCHE = 50
+
+
+class _CsvSemikolon(csv.excel):
+    """CSV-Format für Dateien, deren Trennzeichen nicht erkannt wird"""
+    delimiter = ';'
+
+
+class FehlendeSpalten(ValueError):
+    def __init__(self, fehlende):
+        """
+        Die Datei enthält nicht alle erforderlichen Spalten
+
+        Args:
+            fehlende: Liste der fehlenden Spalten (Name, Wert_2019, Kinder_U3)
+        """
+        super().__init__(f"Fehlende Spalten: {', '.join(fehlende)}")
+        self.fehlende = fehlende
+
+
+def _zeilen_oeffnen(dateiname):
+    """
+    Öffnet die Datei und liefert Blattname, Zeilen-Iterator, geschätzte
+    Zeilenzahl und eine Funktion zum Schließen der Datei
+    """
+    endung = os.path.splitext(dateiname)[1].lower()
+    if endung == '.csv':
+        with open(dateiname, 'rb') as datei:
+            inhalt = datei.read()
+        try:
+            text = inhalt.decode('utf-8-sig')
+        except UnicodeDecodeError:
+            text = inhalt.decode('cp1252')
+        try:
+            dialekt = csv.Sniffer().sniff(text[:64 * 1024], delimiters=';,\t')
+        except csv.Error:
+            dialekt = _CsvSemikolon
+        zeilen = csv.reader(io.StringIO(text), dialekt)
+        return os.path.basename(dateiname), zeilen, text.count('\n') + 1, lambda: None
+
+    if endung == '.xls':
+        import pandas as pd
+
+        blaetter = pd.ExcelFile(dateiname)
+        blatt = VORLAGEN_BLATT if VORLAGEN_BLATT in blaetter.sheet_names else blaetter.sheet_names[0]
+        df = blaetter.parse(blatt, header=None)
+        return blatt, df.itertuples(index=False, name=None), len(df), blaetter.close
+
+    from openpyxl import load_workbook
+
+    wb = load_workbook(dateiname, read_only=True, data_only=True)
+    blatt = VORLAGEN_BLATT if VORLAGEN_BLATT in wb.sheetnames else wb.sheetnames[0]
+    ws = wb[blatt]
+    return blatt, ws.iter_rows(values_only=True), ws.max_row, wb.close
+
+
+def _kopfzeile_zuordnen(zeile):
+    """Liefert die Spaltenpositionen, deren Überschrift zugeordnet werden kann"""
+    positionen = {}
+    for position, wert in enumerate(zeile):
+        if wert is None:
+            continue
+        spalte = SPALTEN_ZUORDNUNG.get(str(wert).strip())
+        if spalte is not None:
+            positionen.setdefault(spalte, position)
+    return positionen
+
+
+def _leer(wert):
+    """Prüft, ob eine Zelle leer ist (None, NaN oder nur Leerzeichen)"""
+    return wert is None or wert != wert or (isinstance(wert, str) and not wert.strip())
+
+
+def lies_kommunen_excel(dateiname, fortschritt=None):
+    """
+    Liest die Rohdaten der Kommunen aus einer Excel-Datei
+
+    Zeilen ohne Namen werden übersprungen. Die Werte werden nicht
+    umgewandelt; Zahlen im Textformat (z.B. "1.000,50") bleiben Text.
+
+    Args:
+        dateiname: Pfad der Datei (.xlsx, .xls oder .csv)
+        fortschritt: Optionale Fortschrittsfunktion fortschritt(phase, schritt, gesamt),
+                     die alle 1000 Zeilen aufgerufen wird; löst sie eine Ausnahme
+                     aus, wird das Einlesen abgebrochen
+
+    Returns:
+        Dictionary mit Blattname ('blatt'), Nummer der Kopfzeile ('kopfzeile'),
+        den Listen 'namen', 'wert_2019' und 'kinder_u3' sowie den
+        Zeilennummern der Daten ('zeilen')
+
+    Raises:
+        FehlendeSpalten: wenn keine Kopfzeile mit allen Spalten gefunden wurde
+    """
+    blatt, zeilen, anzahl, schliessen = _zeilen_oeffnen(dateiname)
+    try:
+        kopfzeile = None
+        beste = {}
+        namen, wert_2019, kinder_u3, nummern = [], [], [], []
+
+        for nummer, zeile in enumerate(zeilen, 1):
+            if fortschritt is not None and nummer % 1000 == 0:
+                fortschritt(PHASE_IMPORT, nummer, anzahl)
+
+            if kopfzeile is None:
+                positionen = _kopfzeile_zuordnen(zeile)
+                if len(positionen) > len(beste):
+                    beste = positionen
+                if len(positionen) == len(ERFORDERLICHE_SPALTEN):
+                    kopfzeile = nummer
+                    pos_name, pos_wert, pos_kinder = (positionen[spalte]
+                                                      for spalte in ERFORDERLICHE_SPALTEN)
+                    breite = max(pos_name, pos_wert, pos_kinder) + 1
+                elif nummer >= KOPFZEILEN_SUCHE:
+                    break
+                continue
+
+            if len(zeile) < breite:
+                zeile = tuple(zeile) + (None,) * (breite - len(zeile))
+            name = zeile[pos_name]
+            if _leer(name):
+                continue
+            namen.append(name)
+            wert_2019.append(zeile[pos_wert])
+            kinder_u3.append(zeile[pos_kinder])
+            nummern.append(nummer)
+    finally:
+        schliessen()
+
+    if kopfzeile is None:
+        raise FehlendeSpalten([spalte for spalte in ERFORDERLICHE_SPALTEN if spalte not in beste])
+
+    if fortschritt is not None:
+        fortschritt(PHASE_IMPORT, nummer, nummer)
+
+    return {'blatt': blatt, 'kopfzeile': kopfzeile, 'namen': namen, 'wert_2019': wert_2019,
+            'kinder_u3': kinder_u3, 'zeilen': nummern}
+
+
+def lies_kommunen(dateiname, fortschritt=None, cache=None):
+    """
+    Liest die Kommunen aus einer Excel-Datei und wandelt die Werte in Zahlen um
+
+    Die Spalten Wert 2019 und Kinder U3 werden mit lies_zahlen() aus
+    foerdermittel_zahlen umgewandelt (deutsches oder amerikanisches
+    Zahlenformat, je Spalte erkannt). Zeilen mit leeren, nicht lesbaren
+    oder negativen Werten werden verworfen, Namen als Text übernommen.
+
+    Args:
+        dateiname: Pfad der Datei (.xlsx, .xls oder .csv)
+        fortschritt: Optionale Fortschrittsfunktion (siehe lies_kommunen_excel)
+        cache: Optionaler ImportCache (foerdermittel_importcache); bei einem
+               Treffer wird die Excel-Datei nicht gelesen
+
+    Returns:
+        Dictionary wie lies_kommunen_excel() mit den gültigen Zeilen; 'wert_2019'
+        und 'kinder_u3' sind NumPy-Arrays. Zusätzlich enthält es die
+        Zeilennummern der Werte, die nicht als Zahl gelesen werden konnten
+        ('ungueltige_zeilen'), die Anzahl der verworfenen Zeilen ('verworfen')
+        und ob die Daten aus dem Cache stammen ('aus_cache')
+
+    Raises:
+        FehlendeSpalten: wenn keine Kopfzeile mit allen Spalten gefunden wurde
+    """
+    if cache is not None:
+        from foerdermittel_importcache import datei_hash
+
+        schluessel = datei_hash(dateiname)
+        daten = cache.laden(schluessel)
+        if daten is not None:
+            daten['aus_cache'] = True
+            return daten
+
+    daten = _kommunen_umwandeln(lies_kommunen_excel(dateiname, fortschritt))
+    if cache is not None:
+        cache.speichern(schluessel, daten)
+    daten['aus_cache'] = False
+    return daten
+
+
+def _kommunen_umwandeln(daten):
+    """Wandelt die Rohdaten von lies_kommunen_excel() um (siehe lies_kommunen)"""
+    import numpy as np
+    from foerdermittel_zahlen import lies_zahlen
+
+    wert_2019, ungueltig_wert = lies_zahlen(daten['wert_2019'])
+    kinder_u3, ungueltig_kinder = lies_zahlen(daten['kinder_u3'])
+
+    zeilen = np.array(daten['zeilen'], dtype=int)
+    gueltig = ~(np.isnan(wert_2019) | np.isnan(kinder_u3) | (wert_2019 < 0) | (kinder_u3 < 0))
+    positionen = np.flatnonzero(gueltig)
+
+    daten.update({
+        'namen': [str(daten['namen'][position]).strip() for position in positionen],
+        'wert_2019': wert_2019[gueltig],
+        'kinder_u3': kinder_u3[gueltig],
+        'zeilen': zeilen[gueltig].tolist(),
+        'ungueltige_zeilen': zeilen[np.union1d(ungueltig_wert, ungueltig_kinder)].tolist(),
+        'verworfen': int(len(gueltig) - len(positionen)),
+    })
+    return daten
@@ -0,0 +1,205 @@
+"""
+Zwischenspeicher (Cache) für eingelesene Kommunendaten
+
+Dieselben Excel-Dateien werden oft mehrfach importiert. Der Cache legt die
+bereinigten Spalten Name, Wert_2019 und Kinder_U3 je Datei als komprimiertes
+NumPy-Archiv (.npz, ein Array je Spalte) ab. Schlüssel ist ein SHA-256-Hash über den
+Dateiinhalt und IMPORT_VERSION; geänderte Dateien oder geänderte Regeln für
+Einlesen und Zahlenumwandlung führen so automatisch zu einem neuen Eintrag.
+Bei einem Treffer wird die Excel-Datei nicht mehr geöffnet, nur noch gehasht.
+
+Der Cache ist in der Größe begrenzt: Nach dem Speichern werden die am
+längsten nicht verwendeten Einträge gelöscht (LRU, Zeitpunkt der letzten
+Verwendung ist die Änderungszeit der Datei), bis die Grenze eingehalten ist.
+Fehler beim Lesen oder Schreiben des Caches brechen den Import nie ab; der
+Eintrag wird dann verworfen bzw. nicht gespeichert.
+"""
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import zipfile
+
+import numpy as np
+
+# Bei Änderungen an Einlesen oder Zahlenumwandlung erhöhen
+IMPORT_VERSION = 1
+
+# Standardgrenze für die Gesamtgröße des Caches in Bytes
+MAX_CACHE_GROESSE = 200 * 1024 * 1024
+
+_ENDUNG = '.npz'
+
+
+def standard_verzeichnis():
+    """Liefert das Cache-Verzeichnis des Benutzers (LOCALAPPDATA bzw. ~/.cache)"""
+    if sys.platform == 'win32' and os.environ.get('LOCALAPPDATA'):
+        basis = os.environ['LOCALAPPDATA']
+    else:
+        basis = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(basis, 'Foerdermittelrechner', 'import')
+
+
+def datei_hash(dateiname, blockgroesse=1024 * 1024):
+    """
+    Berechnet den Schlüssel einer Datei aus Inhalt und IMPORT_VERSION
+
+    Args:
+        dateiname: Pfad der Datei
+        blockgroesse: Größe der gelesenen Blöcke in Bytes
+
+    Returns:
+        SHA-256-Hash als Hex-Text
+    """
+    pruefsumme = hashlib.sha256(f"foerdermittel-import-{IMPORT_VERSION}\n".encode())
+    with open(dateiname, 'rb') as datei:
+        for block in iter(lambda: datei.read(blockgroesse), b''):
+            pruefsumme.update(block)
+    return pruefsumme.hexdigest()
+
+
+class ImportCache:
+    def __init__(self, verzeichnis=None, max_groesse=MAX_CACHE_GROESSE):
+        """
+        Größenbegrenzter Cache für Ergebnisse von lies_kommunen()
+
+        Args:
+            verzeichnis: Verzeichnis der Cache-Dateien (Standard: standard_verzeichnis())
+            max_groesse: Maximale Gesamtgröße aller Einträge in Bytes
+        """
+        self.verzeichnis = verzeichnis or standard_verzeichnis()
+        self.max_groesse = max_groesse
+
+    def _pfad(self, schluessel):
+        return os.path.join(self.verzeichnis, schluessel + _ENDUNG)
+
+    def _eintraege(self):
+        """Liefert (letzte Verwendung, Größe, Pfad) aller Einträge"""
+        try:
+            namen = os.listdir(self.verzeichnis)
+        except OSError:
+            return []
+        eintraege = []
+        for name in namen:
+            if not name.endswith(_ENDUNG):
+                continue
+            pfad = os.path.join(self.verzeichnis, name)
+            try:
+                status = os.stat(pfad)
+            except OSError:
+                continue
+            eintraege.append((status.st_mtime, status.st_size, pfad))
+        return eintraege
+
+    @property
+    def groesse(self):
+        """Gesamtgröße aller Einträge in Bytes"""
+        return sum(groesse for _, groesse, _ in self._eintraege())
+
+    def laden(self, schluessel):
+        """
+        Lädt die Daten eines Eintrags
+
+        Args:
+            schluessel: Schlüssel der Datei (siehe datei_hash)
+
+        Returns:
+            Dictionary wie lies_kommunen() oder None, wenn kein gültiger Eintrag existiert
+        """
+        pfad = self._pfad(schluessel)
+        try:
+            with np.load(pfad, allow_pickle=False) as archiv:
+                info = json.loads(str(archiv['info']))
+                if info.get('version') != IMPORT_VERSION:
+                    return None
+                grenzen = archiv['namen_grenzen']
+                text = archiv['namen_text'].tobytes()
+                daten = {
+                    'blatt': info['blatt'],
+                    'kopfzeile': info['kopfzeile'],
+                    'namen': [text[anfang:ende].decode('utf-8')
+                              for anfang, ende in zip(grenzen[:-1], grenzen[1:])],
+                    'wert_2019': archiv['wert_2019'],
+                    'kinder_u3': archiv['kinder_u3'],
+                    'zeilen': archiv['zeilen'].tolist(),
+                    'ungueltige_zeilen': archiv['ungueltige_zeilen'].tolist(),
+                    'verworfen': info['verworfen'],
+                }
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile):
+            # Beschädigter Eintrag
+            self._loeschen(pfad)
+            return None
+
+        # Letzte Verwendung für die LRU-Verdrängung vermerken
+        try:
+            os.utime(pfad)
+        except OSError:
+            pass
+        return daten
+
+    def speichern(self, schluessel, daten):
+        """
+        Speichert die Daten eines Imports und verdrängt bei Bedarf alte Einträge
+
+        Args:
+            schluessel: Schlüssel der Datei (siehe datei_hash)
+            daten: Dictionary von lies_kommunen()
+
+        Returns:
+            True, wenn der Eintrag gespeichert wurde
+        """
+        kodiert = [name.encode('utf-8') for name in daten['namen']]
+        grenzen = np.zeros(len(kodiert) + 1, dtype=np.int64)
+        np.cumsum([len(name) for name in kodiert], out=grenzen[1:])
+        info = {'version': IMPORT_VERSION, 'blatt': daten['blatt'],
+                'kopfzeile': daten['kopfzeile'], 'verworfen': daten['verworfen']}
+
+        try:
+            os.makedirs(self.verzeichnis, exist_ok=True)
+            # Erst in eine temporäre Datei schreiben, dann umbenennen
+            handle, temp = tempfile.mkstemp(suffix='.tmp', dir=self.verzeichnis)
+            try:
+                with os.fdopen(handle, 'wb') as datei:
+                    np.savez_compressed(datei,
+                                        info=np.array(json.dumps(info)),
+                                        namen_text=np.frombuffer(b''.join(kodiert), dtype=np.uint8),
+                                        namen_grenzen=grenzen,
+                                        wert_2019=np.asarray(daten['wert_2019'], dtype=np.float64),
+                                        kinder_u3=np.asarray(daten['kinder_u3'], dtype=np.float64),
+                                        zeilen=np.asarray(daten['zeilen'], dtype=np.int64),
+                                        ungueltige_zeilen=np.asarray(daten['ungueltige_zeilen'], dtype=np.int64))
+                os.replace(temp, self._pfad(schluessel))
+            except BaseException:
+                self._loeschen(temp)
+                raise
+        except OSError:
+            return False
+
+        self.verdraengen()
+        return True
+
+    def verdraengen(self):
+        """Löscht die am längsten nicht verwendeten Einträge, bis max_groesse eingehalten ist"""
+        eintraege = sorted(self._eintraege())
+        gesamt = sum(groesse for _, groesse, _ in eintraege)
+        for _, groesse, pfad in eintraege:
+            if gesamt <= self.max_groesse:
+                break
+            if self._loeschen(pfad):
+                gesamt -= groesse
+
+    def leeren(self):
+        """Löscht alle Einträge"""
+        for _, _, pfad in self._eintraege():
+            self._loeschen(pfad)
+
+    @staticmethod
+    def _loeschen(pfad):
+        try:
+            os.remove(pfad)
+            return True
+        except OSError:
+            return False
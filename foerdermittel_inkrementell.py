@@ -0,0 +1,381 @@
+import numpy as np
+from foerdermittel_kern import (berechne_runden_exakt, status_texte, STATUS_OK,
+                                STATUS_MINDESTBETRAG, STATUS_WERT_RUNDE_1)
+from foerdermittel_kommunen import kommunen_spalten
+from foerdermittel_rechner import FoerdermittelRechner
+from foerdermittel_ereignisse import PHASE_FIXIERUNG, PHASE_RUNDUNG, PHASE_VALIDIERUNG
+
+
+def berechne_schwellen(sockelbetrag, kinder_u3, mindestbetrag):
+    """
+    Berechnet je Kommune den Multiplikator, unterhalb dessen sie fixiert wird
+
+    Kommunen ohne Kinder U3 werden unabhängig vom Multiplikator fixiert
+    (Sockelbetrag unter Mindestbetrag, +inf) oder nie fixiert (-inf).
+    """
+    sockelbetrag = np.asarray(sockelbetrag, dtype=float)
+    kinder_u3 = np.asarray(kinder_u3, dtype=float)
+    schwelle = np.where(sockelbetrag < mindestbetrag, np.inf, -np.inf)
+    positiv = kinder_u3 > 0
+    schwelle[positiv] = (mindestbetrag - sockelbetrag[positiv]) / kinder_u3[positiv]
+    return schwelle
+
+
+class InkrementellerRechner(FoerdermittelRechner):
+    def __init__(self, gesamtsumme, ausgabe=None):
+        """
+        Fördermittelrechner mit inkrementeller Neuberechnung
+
+        Die Kommunen werden nach der Runde gruppiert, in der sie fixiert
+        werden (Gruppe 0 = nicht fixiert). Je Gruppe werden Anzahl, Summe der
+        Sockelbeträge, Summe der Kinder U3 sowie kleinster und größter
+        Schwellwert mitgeführt. Änderungen einer Kommune aktualisieren nur
+        diese Summen; die Multiplikatoren aller Runden ergeben sich daraus in
+        O(Anzahl Runden). Nur wenn sich dadurch die fixierte Menge ändern
+        würde, wird vollständig mit dem Verfahren 'exakt' neu berechnet.
+
+        Änderungen von Mindestbetrag oder Sockelbetrag führen ebenfalls zu
+        einer vollständigen Berechnung, Änderungen der Gesamtsumme nicht.
+
+        Args:
+            gesamtsumme: Gesamte zu verteilende Fördersumme
+            ausgabe: Empfänger der Berechnungsereignisse (siehe FoerdermittelRechner)
+        """
+        self._namen = np.empty(0, dtype=object)
+        self._wert = np.empty(0)
+        self._kinder = np.empty(0)
+        self._schwelle = np.empty(0)
+        self._gruppe = np.empty(0, dtype=np.int64)
+        self._belegt = np.empty(0, dtype=bool)
+        self._anzahl_positionen = 0
+        self._index = {}
+        self._struktur = None
+        self.statistik = {'vollstaendig': 0, 'inkrementell': 0}
+
+        super().__init__(gesamtsumme, verfahren='exakt', ausgabe=ausgabe)
+
+    @property
+    def kommunen_daten(self):
+        """Kommunendaten im Format von FoerdermittelRechner"""
+        return [{'Name': self._namen[pos], 'Wert_2019': self._wert[pos],
+                 'Kinder_U3': self._kinder[pos], 'Status': 'In Berechnung'}
+                for pos in np.flatnonzero(self._belegt[:self._anzahl_positionen])]
+
+    @kommunen_daten.setter
+    def kommunen_daten(self, daten):
+        self._anzahl_positionen = 0
+        self._index = {}
+        self._struktur = None
+        self.kommunen_hinzufuegen(daten)
+
+    def kommune_hinzufuegen(self, name, wert_2019, kinder_u3):
+        """
+        Fügt eine Kommune hinzu
+
+        Args:
+            name: Name der Kommune (eindeutig)
+            wert_2019: Förderwert aus 2019
+            kinder_u3: Anzahl der Kinder U3 im SGB-II-Bezug
+        """
+        if name in self._index:
+            raise ValueError(f"Kommune '{name}' existiert bereits")
+
+        if self._anzahl_positionen == len(self._wert):
+            self._vergroessern()
+
+        pos = self._anzahl_positionen
+        self._anzahl_positionen += 1
+        self._index[name] = pos
+        self._namen[pos] = name
+        self._belegt[pos] = True
+        self._werte_setzen(pos, wert_2019, kinder_u3)
+
+        if self._struktur is not None:
+            self._gruppe[pos] = self._gruppe_bestimmen(self._schwelle[pos])
+            self._beitrag(pos, 1)
+
+    def kommunen_hinzufuegen(self, kommunen, wert_2019=None, kinder_u3=None):
+        """
+        Fügt viele Kommunen auf einmal hinzu
+
+        Die Werte werden blockweise in die Arrays kopiert; die nächste
+        Berechnung erfolgt vollständig.
+
+        Args:
+            kommunen: Namen, DataFrame oder Iterierbares (siehe
+                      FoerdermittelRechner.kommunen_hinzufuegen)
+            wert_2019: Array der Förderwerte 2019
+            kinder_u3: Array der Kinder U3 im SGB-II-Bezug
+        """
+        namen, wert_2019, kinder_u3 = kommunen_spalten(kommunen, wert_2019, kinder_u3)
+        neue_namen = dict.fromkeys(namen.tolist())
+        if len(neue_namen) != len(namen):
+            raise ValueError("Die Namen der Kommunen müssen eindeutig sein")
+        for name in neue_namen:
+            if name in self._index:
+                raise ValueError(f"Kommune '{name}' existiert bereits")
+
+        start = self._anzahl_positionen
+        ende = start + len(namen)
+        if ende > len(self._wert):
+            self._vergroessern(ende)
+
+        self._namen[start:ende] = namen
+        self._wert[start:ende] = wert_2019
+        self._kinder[start:ende] = kinder_u3
+        self._belegt[start:ende] = True
+        self._index.update(zip(neue_namen, range(start, ende)))
+        self._anzahl_positionen = ende
+        self._struktur = None
+
+    def kommune_aendern(self, name, wert_2019, kinder_u3):
+        """
+        Ändert Wert 2019 und Kinder U3 einer vorhandenen Kommune
+        """
+        pos = self._index[name]
+        if self._struktur is not None:
+            self._beitrag(pos, -1)
+        self._werte_setzen(pos, wert_2019, kinder_u3)
+        if self._struktur is not None:
+            self._beitrag(pos, 1)
+
+    def kommune_entfernen(self, name):
+        """
+        Entfernt eine Kommune
+        """
+        pos = self._index.pop(name)
+        if self._struktur is not None:
+            self._beitrag(pos, -1)
+        self._belegt[pos] = False
+        self._namen[pos] = None
+
+    def berechne_verteilung(self, als_dataframe=True):
+        """
+        Berechnet die Verteilung, wenn möglich inkrementell
+
+        Args:
+            als_dataframe: Nur True wird unterstützt (Ergebnis-DataFrame)
+        """
+        if not als_dataframe:
+            raise ValueError("InkrementellerRechner liefert nur einen DataFrame")
+        self.berechnungs_log = []
+        self._fortschritt(PHASE_FIXIERUNG, 0, None)
+        struktur = self._struktur
+        if (struktur is None
+                or struktur['mindestbetrag'] != self.mindestbetrag
+                or struktur['sockelbetrag_prozent'] != self.sockelbetrag_prozent):
+            multiplikatoren = self._vollstaendig_berechnen()
+        else:
+            multiplikatoren = self._multiplikatoren()
+            if self._struktur_gueltig(multiplikatoren):
+                self.statistik['inkrementell'] += 1
+            else:
+                multiplikatoren = self._vollstaendig_berechnen()
+
+        df = self._ergebnis_aufbauen(multiplikatoren)
+        self._fortschritt(PHASE_RUNDUNG, 0, 1)
+        ergebnis = self._runde_und_validiere(df)
+        self._fortschritt(PHASE_VALIDIERUNG, 1, 1)
+        return ergebnis
+
+    def momentaufnahme(self):
+        """
+        Liefert einen unabhängigen FoerdermittelRechner mit Parametern,
+        Kommunen und Ergebnis der letzten Berechnung
+
+        Anders als bei copy.copy() teilt die Momentaufnahme keine Arrays mit
+        diesem Rechner; spätere Änderungen der Kommunen oder Berechnungen
+        wirken sich nicht auf sie aus.
+        """
+        kopie = FoerdermittelRechner(self.gesamtsumme, verfahren=self.verfahren,
+                                     rundungsverfahren=self.rundungsverfahren,
+                                     ausgabe=self.ausgabe)
+        kopie.mindestbetrag = self.mindestbetrag
+        kopie.sockelbetrag_prozent = self.sockelbetrag_prozent
+        positionen = np.flatnonzero(self._belegt[:self._anzahl_positionen])
+        kopie.kommunen_hinzufuegen(self._namen[positionen], self._wert[positionen],
+                                   self._kinder[positionen])
+        kopie.berechnungs_log = list(self.berechnungs_log)
+        if self.ergebnis_df is not None:
+            kopie.ergebnis_df = self.ergebnis_df.copy()
+        return kopie
+
+    def _vergroessern(self, mindestens=0):
+        """Verdoppelt die Kapazität der Arrays"""
+        kapazitaet = max(16, 2 * len(self._wert), mindestens)
+        for attribut in ('_namen', '_wert', '_kinder', '_schwelle', '_gruppe', '_belegt'):
+            alt = getattr(self, attribut)
+            neu = np.zeros(kapazitaet, dtype=alt.dtype)
+            neu[:len(alt)] = alt
+            setattr(self, attribut, neu)
+
+    def _werte_setzen(self, pos, wert_2019, kinder_u3):
+        """Setzt die Werte einer Position und deren Schwellwert"""
+        self._wert[pos] = wert_2019
+        self._kinder[pos] = kinder_u3
+        self._schwelle[pos] = berechne_schwellen([wert_2019 * self.sockelbetrag_prozent],
+                                                 [kinder_u3], self.mindestbetrag)[0]
+
+    def _beitrag(self, pos, vorzeichen):
+        """Addiert (+1) oder entfernt (-1) eine Kommune in den Gruppensummen"""
+        struktur = self._struktur
+        gruppe = self._gruppe[pos]
+        schwelle = self._schwelle[pos]
+
+        struktur['anzahl'][gruppe] += vorzeichen
+        if struktur['anzahl'][gruppe] == 0:
+            struktur['summe_sockel'][gruppe] = 0.0
+            struktur['summe_kinder'][gruppe] = 0.0
+        else:
+            struktur['summe_sockel'][gruppe] += vorzeichen * self._wert[pos] * self.sockelbetrag_prozent
+            struktur['summe_kinder'][gruppe] += vorzeichen * self._kinder[pos]
+
+        if vorzeichen > 0:
+            struktur['min_schwelle'][gruppe] = min(struktur['min_schwelle'][gruppe], schwelle)
+            struktur['max_schwelle'][gruppe] = max(struktur['max_schwelle'][gruppe], schwelle)
+        elif (schwelle <= struktur['min_schwelle'][gruppe]
+              or schwelle >= struktur['max_schwelle'][gruppe]):
+            struktur['veraltet'].add(gruppe)
+
+    def _gruppe_bestimmen(self, schwelle):
+        """Ordnet eine neue Kommune der Runde zu, in der sie fixiert würde"""
+        multiplikatoren = self._multiplikatoren()
+        for runde in range(1, self._struktur['anzahl_gruppen'] + 1):
+            if schwelle > multiplikatoren[runde - 1]:
+                return runde
+        return 0
+
+    def _multiplikatoren(self):
+        """Berechnet die Multiplikatoren aller Runden aus den Gruppensummen"""
+        struktur = self._struktur
+        anzahl_gruppen = struktur['anzahl_gruppen']
+        anzahl = struktur['anzahl']
+        summe_sockel = struktur['summe_sockel']
+        summe_kinder = struktur['summe_kinder']
+
+        runden = anzahl_gruppen + (1 if anzahl[0] > 0 else 0)
+        fixiert_summe = 0.0
+        multiplikatoren = []
+        for runde in range(1, runden + 1):
+            sockel_aktiv = summe_sockel[0] + summe_sockel[runde:].sum()
+            kinder_aktiv = summe_kinder[0] + summe_kinder[runde:].sum()
+            verfuegbares_budget = self.gesamtsumme - fixiert_summe
+            restbudget = verfuegbares_budget - sockel_aktiv
+            multiplikatoren.append(restbudget / kinder_aktiv if kinder_aktiv > 0 else 0)
+
+            if runde <= anzahl_gruppen:
+                if runde == 1:
+                    fixiert_summe += self.mindestbetrag * anzahl[1]
+                else:
+                    fixiert_summe += summe_sockel[runde] + summe_kinder[runde] * multiplikatoren[0]
+
+        return multiplikatoren
+
+    def _struktur_gueltig(self, multiplikatoren):
+        """Prüft, ob jede Gruppe genau in ihrer Runde fixiert würde"""
+        struktur = self._struktur
+        anzahl_gruppen = struktur['anzahl_gruppen']
+        anzahl = struktur['anzahl']
+
+        if anzahl_gruppen > 0 and (anzahl[1:] <= 0).any():
+            return False
+
+        for gruppe in struktur['veraltet']:
+            mitglieder = self._schwelle[:self._anzahl_positionen][
+                self._belegt[:self._anzahl_positionen]
+                & (self._gruppe[:self._anzahl_positionen] == gruppe)]
+            struktur['min_schwelle'][gruppe] = mitglieder.min() if len(mitglieder) else np.inf
+            struktur['max_schwelle'][gruppe] = mitglieder.max() if len(mitglieder) else -np.inf
+        struktur['veraltet'].clear()
+
+        # Nicht fixierte Kommunen dürfen auch in der letzten Runde nicht fixiert werden
+        spaeter_max = struktur['max_schwelle'][0] if anzahl[0] > 0 else -np.inf
+        if anzahl[0] > 0 and spaeter_max > multiplikatoren[anzahl_gruppen]:
+            return False
+
+        for runde in range(anzahl_gruppen, 0, -1):
+            multiplikator = multiplikatoren[runde - 1]
+            if struktur['min_schwelle'][runde] <= multiplikator or spaeter_max > multiplikator:
+                return False
+            spaeter_max = max(spaeter_max, struktur['max_schwelle'][runde])
+
+        return True
+
+    def _vollstaendig_berechnen(self):
+        """Berechnet die Gruppenstruktur vollständig neu"""
+        # Entfernte Positionen verdichten
+        belegt = np.flatnonzero(self._belegt[:self._anzahl_positionen])
+        anzahl = len(belegt)
+        for attribut in ('_namen', '_wert', '_kinder'):
+            werte = getattr(self, attribut)
+            werte[:anzahl] = werte[belegt]
+        self._belegt[:anzahl] = True
+        self._anzahl_positionen = anzahl
+        self._index = {name: pos for pos, name in enumerate(self._namen[:anzahl])}
+
+        sockelbetrag = self._wert[:anzahl] * self.sockelbetrag_prozent
+        kinder_u3 = self._kinder[:anzahl]
+        ergebnis = berechne_runden_exakt(sockelbetrag, kinder_u3, self.gesamtsumme,
+                                         self.mindestbetrag)
+
+        gruppe = np.where(ergebnis['status'] == STATUS_OK, 0, ergebnis['runde'])
+        anzahl_gruppen = len(ergebnis['protokoll']) - (0 if ergebnis['alle_fixiert'] else 1)
+        schwelle = berechne_schwellen(sockelbetrag, kinder_u3, self.mindestbetrag)
+        self._gruppe[:anzahl] = gruppe
+        self._schwelle[:anzahl] = schwelle
+
+        min_schwelle = np.full(anzahl_gruppen + 1, np.inf)
+        max_schwelle = np.full(anzahl_gruppen + 1, -np.inf)
+        np.minimum.at(min_schwelle, gruppe, schwelle)
+        np.maximum.at(max_schwelle, gruppe, schwelle)
+
+        self._struktur = {
+            'mindestbetrag': self.mindestbetrag,
+            'sockelbetrag_prozent': self.sockelbetrag_prozent,
+            'anzahl_gruppen': anzahl_gruppen,
+            'anzahl': np.bincount(gruppe, minlength=anzahl_gruppen + 1),
+            'summe_sockel': np.bincount(gruppe, weights=sockelbetrag, minlength=anzahl_gruppen + 1),
+            'summe_kinder': np.bincount(gruppe, weights=kinder_u3, minlength=anzahl_gruppen + 1),
+            'min_schwelle': min_schwelle,
+            'max_schwelle': max_schwelle,
+            'veraltet': set()
+        }
+        self.statistik['vollstaendig'] += 1
+
+        return self._multiplikatoren()
+
+    def _ergebnis_aufbauen(self, multiplikatoren):
+        """Erstellt den Ergebnis-DataFrame aus Gruppen und Multiplikatoren"""
+        import pandas as pd
+
+        positionen = np.flatnonzero(self._belegt[:self._anzahl_positionen])
+        wert_2019 = self._wert[positionen]
+        kinder_u3 = self._kinder[positionen]
+        gruppe = self._gruppe[positionen]
+        sockelbetrag = wert_2019 * self.sockelbetrag_prozent
+        multiplikatoren = np.asarray(multiplikatoren, dtype=float)
+
+        runde = np.where(gruppe == 0, self._struktur['anzahl_gruppen'] + 1, gruppe)
+        u3_anteil = kinder_u3 * multiplikatoren[runde - 1]
+        zwischensumme = sockelbetrag + u3_anteil
+        erste_berechnung = sockelbetrag + kinder_u3 * multiplikatoren[0]
+
+        # Ab Runde 2 fixierte Kommunen erhalten den Wert aus Runde 1
+        spaeter = (gruppe > 1) & (erste_berechnung >= self.mindestbetrag)
+        status = np.where(gruppe == 0, STATUS_OK,
+                          np.where(spaeter, STATUS_WERT_RUNDE_1, STATUS_MINDESTBETRAG))
+        endbetrag = np.where(gruppe == 0, zwischensumme,
+                             np.where(spaeter, erste_berechnung, self.mindestbetrag))
+
+        return pd.DataFrame({
+            'Name': self._namen[positionen],
+            'Wert_2019': wert_2019,
+            'Kinder_U3': kinder_u3,
+            'Status': status_texte(status, runde, erste_berechnung),
+            'Sockelbetrag': sockelbetrag,
+            'U3_Anteil': u3_anteil,
+            'Zwischensumme': zwischensumme,
+            'Endbetrag': endbetrag,
+            'Runde': runde,
+            'Erste_Berechnung': erste_berechnung
+        })
@@ -0,0 +1,554 @@
+"""
+Berechnungskern des Fördermittelrechners
+
+Enthält die iterativen Runden, die Cent-Arithmetik und die Rundungsverfahren
+als Funktionen auf NumPy-Arrays. Das Modul benötigt nur NumPy und die
+Standardbibliothek, damit Berechnungen ohne den Import von pandas und
+openpyxl gestartet werden können.
+"""
+from fractions import Fraction
+import numpy as np
+
+# Status-Codes des NumPy-Verfahrens
+STATUS_IN_BERECHNUNG = 0
+STATUS_OK = 1
+STATUS_MINDESTBETRAG = 2
+STATUS_WERT_RUNDE_1 = 3
+
+
+# ========== NUMPY-BERECHNUNG ==========
+
+def berechne_runden_numpy(sockelbetrag, kinder_u3, gesamtsumme, mindestbetrag,
+                          namen=None, max_runden=10, rueckruf=None):
+    """
+    Führt die iterativen Runden auf NumPy-Arrays durch
+    
+    Args:
+        sockelbetrag: Array der Sockelbeträge
+        kinder_u3: Array der Kinder U3 im SGB-II-Bezug
+        gesamtsumme: Gesamte zu verteilende Fördersumme
+        mindestbetrag: Mindestbetrag pro Kommune
+        namen: Optionale Namen; gleichnamige Kommunen werden wie im
+               pandas-Verfahren gemeinsam fixiert
+        max_runden: Sicherheitslimit für die Anzahl der Runden
+        rueckruf: Optionale Funktion rueckruf(runde, max_runden), die zu
+                  Beginn jeder Runde aufgerufen wird (Fortschritt/Abbruch)
+    
+    Returns:
+        Dictionary mit den Ergebnis-Arrays und einem Protokoll je Runde
+    """
+    sockelbetrag = np.asarray(sockelbetrag)
+    kinder_u3 = np.asarray(kinder_u3)
+    n = len(sockelbetrag)
+    
+    u3_anteil = np.zeros(n)
+    zwischensumme = np.zeros(n)
+    endbetrag = np.zeros(n)
+    runden = np.zeros(n, dtype=np.int64)
+    erste_berechnung = np.zeros(n)
+    status = np.full(n, STATUS_IN_BERECHNUNG, dtype=np.int8)
+    
+    # Namens-Codes, damit Duplikate wie bei isin() gemeinsam fixiert werden
+    codes = None
+    if namen is not None:
+        index = {}
+        codes = np.fromiter((index.setdefault(name, len(index)) for name in namen),
+                            dtype=np.intp, count=n)
+        if len(index) == n:
+            codes = None
+        else:
+            fixierte_codes = np.zeros(len(index), dtype=bool)
+    
+    fixiert = np.zeros(n, dtype=bool)
+    protokoll = []
+    alle_fixiert = False
+    runde = 0
+    
+    while runde < max_runden:
+        runde += 1
+        if rueckruf is not None:
+            rueckruf(runde, max_runden)
+        aktiv = ~fixiert
+        
+        if not aktiv.any():
+            alle_fixiert = True
+            break
+        
+        summe_sockel = sockelbetrag[aktiv].sum()
+        bereits_fixiert_summe = endbetrag[fixiert].sum()
+        verfuegbares_budget = gesamtsumme - bereits_fixiert_summe
+        restbudget = verfuegbares_budget - summe_sockel
+        
+        summe_u3 = kinder_u3[aktiv].sum()
+        if summe_u3 > 0:
+            multiplikator = restbudget / summe_u3
+        else:
+            multiplikator = 0
+        
+        u3_anteil[aktiv] = kinder_u3[aktiv] * multiplikator
+        zwischensumme[aktiv] = sockelbetrag[aktiv] + u3_anteil[aktiv]
+        runden[aktiv] = runde
+        if runde == 1:
+            erste_berechnung[aktiv] = zwischensumme[aktiv]
+        
+        # Prüfe Mindestbeträge
+        unter_minimum = aktiv & (zwischensumme < mindestbetrag)
+        if runde > 1:
+            aus_runde_1 = unter_minimum & (erste_berechnung >= mindestbetrag)
+        else:
+            aus_runde_1 = np.zeros(n, dtype=bool)
+        auf_minimum = unter_minimum & ~aus_runde_1
+        ueber_minimum = aktiv & ~unter_minimum
+        
+        endbetrag[aus_runde_1] = erste_berechnung[aus_runde_1]
+        status[aus_runde_1] = STATUS_WERT_RUNDE_1
+        endbetrag[auf_minimum] = mindestbetrag
+        status[auf_minimum] = STATUS_MINDESTBETRAG
+        endbetrag[ueber_minimum] = zwischensumme[ueber_minimum]
+        
+        neu_fixiert = np.flatnonzero(unter_minimum)
+        protokoll.append({
+            'verfuegbares_budget': verfuegbares_budget,
+            'summe_sockel': summe_sockel,
+            'restbudget': restbudget,
+            'summe_u3': summe_u3,
+            'multiplikator': multiplikator,
+            'neu_fixiert': neu_fixiert
+        })
+        
+        if len(neu_fixiert) == 0:
+            status[aktiv] = STATUS_OK
+            break
+        
+        if codes is None:
+            fixiert |= unter_minimum
+        else:
+            fixierte_codes[codes[neu_fixiert]] = True
+            fixiert = fixierte_codes[codes]
+    
+    return {
+        'u3_anteil': u3_anteil,
+        'zwischensumme': zwischensumme,
+        'endbetrag': endbetrag,
+        'runde': runden,
+        'erste_berechnung': erste_berechnung,
+        'status': status,
+        'protokoll': protokoll,
+        'alle_fixiert': alle_fixiert
+    }
+
+
+def berechne_runden_exakt(sockelbetrag, kinder_u3, gesamtsumme, mindestbetrag, rueckruf=None):
+    """
+    Bestimmt das Ergebnis der iterativen Runden ohne Rundenlimit
+    
+    Nach Runde 1 wird jede Kommune genau dann fixiert, wenn der Multiplikator
+    unter ihren Schwellwert (Mindestbetrag - Sockelbetrag) / Kinder_U3 fällt.
+    Da der Multiplikator von Runde zu Runde sinkt, werden die Kommunen in
+    absteigender Reihenfolge dieses Schwellwerts fixiert. Nach einmaligem
+    Sortieren lässt sich jede weitere Runde daher über Präfix-/Suffixsummen
+    und eine binäre Suche in O(log n) bestimmen, insgesamt O(n log n).
+    
+    Das Ergebnis entspricht dem des Rundenverfahrens einschließlich der
+    Regel "Wert aus Runde 1" und der Rundennummer je Kommune, ist aber nicht
+    auf 10 Runden begrenzt. Gleichnamige Kommunen werden unabhängig
+    voneinander behandelt.
+    
+    Args:
+        sockelbetrag: Array der Sockelbeträge
+        kinder_u3: Array der Kinder U3 im SGB-II-Bezug (nicht negativ)
+        gesamtsumme: Gesamte zu verteilende Fördersumme
+        mindestbetrag: Mindestbetrag pro Kommune
+        rueckruf: Optionale Funktion rueckruf(runde, None), die zu Beginn
+                  jeder Runde aufgerufen wird (Fortschritt/Abbruch)
+    
+    Returns:
+        Dictionary im Format von berechne_runden_numpy()
+    """
+    sockelbetrag = np.asarray(sockelbetrag)
+    kinder_u3 = np.asarray(kinder_u3)
+    n = len(sockelbetrag)
+    
+    runden = np.ones(n, dtype=np.int64)
+    status = np.full(n, STATUS_OK, dtype=np.int8)
+    endbetrag = np.empty(n)
+    protokoll = []
+    alle_fixiert = False
+    
+    # Runde 1 über alle Kommunen
+    if rueckruf is not None:
+        rueckruf(1, None)
+    summe_sockel = sockelbetrag.sum()
+    summe_u3 = kinder_u3.sum()
+    restbudget = gesamtsumme - summe_sockel
+    multiplikator_1 = restbudget / summe_u3 if summe_u3 > 0 else 0
+    erste_berechnung = sockelbetrag + kinder_u3 * multiplikator_1
+    fixiert_runde_1 = erste_berechnung < mindestbetrag
+    protokoll.append({
+        'verfuegbares_budget': gesamtsumme,
+        'summe_sockel': summe_sockel,
+        'restbudget': restbudget,
+        'summe_u3': summe_u3,
+        'multiplikator': multiplikator_1,
+        'neu_fixiert': np.flatnonzero(fixiert_runde_1)
+    })
+    multiplikatoren = [multiplikator_1]
+    
+    endbetrag[fixiert_runde_1] = mindestbetrag
+    status[fixiert_runde_1] = STATUS_MINDESTBETRAG
+    
+    # Kandidaten für spätere Runden nach absteigendem Schwellwert sortieren
+    kandidaten = np.flatnonzero(~fixiert_runde_1)
+    k = kinder_u3[kandidaten]
+    s = sockelbetrag[kandidaten]
+    schwelle = np.full(len(kandidaten), -np.inf)
+    positiv = k > 0
+    schwelle[positiv] = (mindestbetrag - s[positiv]) / k[positiv]
+    reihenfolge = np.argsort(-schwelle, kind='stable')
+    kandidaten = kandidaten[reihenfolge]
+    negative_schwelle = -schwelle[reihenfolge]
+    
+    # Später fixierte Kommunen erhalten den Wert aus Runde 1 (mindestens den Mindestbetrag)
+    erste_kandidaten = erste_berechnung[kandidaten]
+    aus_runde_1 = erste_kandidaten >= mindestbetrag
+    betrag_fixiert = np.where(aus_runde_1, erste_kandidaten, mindestbetrag)
+    
+    # Präfixsummen der fixierten, Suffixsummen der aktiven Kandidaten
+    fixiert_summe = np.concatenate(([0.0], np.cumsum(betrag_fixiert)))
+    fixiert_summe += mindestbetrag * np.count_nonzero(fixiert_runde_1)
+    sockel_aktiv = np.concatenate((np.cumsum(sockelbetrag[kandidaten][::-1])[::-1], [0]))
+    u3_aktiv = np.concatenate((np.cumsum(kinder_u3[kandidaten][::-1])[::-1], [0]))
+    
+    j = 0
+    runde = 1
+    if len(protokoll[0]['neu_fixiert']) > 0:
+        while True:
+            runde += 1
+            if rueckruf is not None:
+                rueckruf(runde, None)
+            if j == len(kandidaten):
+                alle_fixiert = True
+                break
+            
+            verfuegbares_budget = gesamtsumme - fixiert_summe[j]
+            restbudget = verfuegbares_budget - sockel_aktiv[j]
+            summe_u3 = u3_aktiv[j]
+            multiplikator = restbudget / summe_u3 if summe_u3 > 0 else 0
+            multiplikatoren.append(multiplikator)
+            
+            j_neu = max(j, int(np.searchsorted(negative_schwelle, -multiplikator, side='left')))
+            neu_fixiert = kandidaten[j:j_neu]
+            runden[kandidaten[j:]] = runde
+            protokoll.append({
+                'verfuegbares_budget': verfuegbares_budget,
+                'summe_sockel': sockel_aktiv[j],
+                'restbudget': restbudget,
+                'summe_u3': summe_u3,
+                'multiplikator': multiplikator,
+                'neu_fixiert': np.sort(neu_fixiert)
+            })
+            
+            if j_neu == j:
+                break
+            j = j_neu
+    
+    fixiert_spaeter = kandidaten[:j]
+    aktiv = kandidaten[j:]
+    endbetrag[fixiert_spaeter] = betrag_fixiert[:j]
+    status[fixiert_spaeter] = np.where(aus_runde_1[:j], STATUS_WERT_RUNDE_1, STATUS_MINDESTBETRAG)
+    
+    # Anteile mit dem Multiplikator der jeweils letzten Runde jeder Kommune
+    u3_anteil = kinder_u3 * np.asarray(multiplikatoren, dtype=float)[runden - 1]
+    zwischensumme = sockelbetrag + u3_anteil
+    endbetrag[aktiv] = zwischensumme[aktiv]
+    
+    return {
+        'u3_anteil': u3_anteil,
+        'zwischensumme': zwischensumme,
+        'endbetrag': endbetrag,
+        'runde': runden,
+        'erste_berechnung': erste_berechnung,
+        'status': status,
+        'protokoll': protokoll,
+        'alle_fixiert': alle_fixiert
+    }
+
+
+def in_cent(betraege):
+    """
+    Rechnet Euro-Beträge in ganze Cent (int64) um
+    """
+    return np.round(np.asarray(betraege, dtype=float) * 100).astype(np.int64)
+
+
+def berechne_runden_cent(wert_2019_cent, kinder_u3, gesamtsumme_cent, mindestbetrag_cent,
+                         sockelbetrag_prozent, namen=None, max_runden=10, rueckruf=None):
+    """
+    Führt die iterativen Runden in ganzzahliger Cent-Arithmetik durch
+    
+    Alle Geldbeträge sind int64-Cent. Der Sockelbetrag-Anteil wird als Bruch
+    dargestellt, der U3-Multiplikator als Bruch Restbudget / Summe Kinder U3;
+    jeder U3-Anteil wird daraus ganzzahlig auf den Cent gerundet (0,5 Cent
+    aufwärts). Das Ergebnis ist damit auf jedem Rechner centgenau identisch.
+    Nicht ganzzahlige Kinder U3 werden in Millionstel skaliert. Droht bei
+    den Zwischenprodukten ein int64-Überlauf, wird mit Python-Ganzzahlen
+    gerechnet.
+    
+    Args:
+        wert_2019_cent: Array der Förderwerte 2019 in Cent
+        kinder_u3: Array der Kinder U3 im SGB-II-Bezug
+        gesamtsumme_cent: Gesamtsumme in Cent
+        mindestbetrag_cent: Mindestbetrag in Cent
+        sockelbetrag_prozent: Sockelbetrag-Anteil (0.5 = 50%)
+        namen: Optionale Namen, siehe berechne_runden_numpy()
+        max_runden: Sicherheitslimit für die Anzahl der Runden
+        rueckruf: Optionale Funktion, siehe berechne_runden_numpy()
+    
+    Returns:
+        Dictionary im Format von berechne_runden_numpy() mit Beträgen in Cent
+        und zusätzlich dem Array 'sockelbetrag'
+    """
+    wert_2019_cent = np.asarray(wert_2019_cent, dtype=np.int64)
+    kinder_u3 = np.asarray(kinder_u3, dtype=float)
+    gesamtsumme_cent = int(gesamtsumme_cent)
+    mindestbetrag_cent = int(mindestbetrag_cent)
+    n = len(wert_2019_cent)
+    
+    # Sockelbetrag = Wert 2019 × Zähler / Nenner, kaufmännisch auf Cent gerundet
+    anteil = Fraction(sockelbetrag_prozent).limit_denominator(10000)
+    sockelbetrag = (2 * wert_2019_cent * anteil.numerator + anteil.denominator) // (2 * anteil.denominator)
+    
+    # Kinder U3 als ganze Zahlen (bei Bruchteilen in Millionstel)
+    if np.all(kinder_u3 == np.round(kinder_u3)):
+        kinder_faktor = 1
+    else:
+        kinder_faktor = 10 ** 6
+    kinder = np.round(kinder_u3 * kinder_faktor).astype(np.int64)
+    
+    # Obergrenze für |2 × Kinder × Restbudget + Summe Kinder|
+    grenze = (abs(gesamtsumme_cent) + int(np.abs(sockelbetrag).sum())
+              + abs(mindestbetrag_cent) * n + int(np.abs(wert_2019_cent).max(initial=0)))
+    grenze = 2 * int(kinder.max(initial=0)) * grenze + int(kinder.sum())
+    if grenze >= 2 ** 62:
+        kinder = kinder.astype(object)
+        sockelbetrag = sockelbetrag.astype(object)
+    
+    u3_anteil = np.zeros(n, dtype=kinder.dtype)
+    zwischensumme = np.zeros(n, dtype=kinder.dtype)
+    endbetrag = np.zeros(n, dtype=kinder.dtype)
+    runden = np.zeros(n, dtype=np.int64)
+    erste_berechnung = np.zeros(n, dtype=kinder.dtype)
+    status = np.full(n, STATUS_IN_BERECHNUNG, dtype=np.int8)
+    
+    codes = None
+    if namen is not None:
+        index = {}
+        codes = np.fromiter((index.setdefault(name, len(index)) for name in namen),
+                            dtype=np.intp, count=n)
+        if len(index) == n:
+            codes = None
+        else:
+            fixierte_codes = np.zeros(len(index), dtype=bool)
+    
+    fixiert = np.zeros(n, dtype=bool)
+    protokoll = []
+    alle_fixiert = False
+    runde = 0
+    
+    while runde < max_runden:
+        runde += 1
+        if rueckruf is not None:
+            rueckruf(runde, max_runden)
+        aktiv = ~fixiert
+        
+        if not aktiv.any():
+            alle_fixiert = True
+            break
+        
+        summe_sockel = int(sockelbetrag[aktiv].sum())
+        bereits_fixiert_summe = int(endbetrag[fixiert].sum())
+        verfuegbares_budget = gesamtsumme_cent - bereits_fixiert_summe
+        restbudget = verfuegbares_budget - summe_sockel
+        summe_kinder = int(kinder[aktiv].sum())
+        
+        # U3-Anteil = Kinder × Restbudget / Summe Kinder, auf Cent gerundet
+        if summe_kinder > 0:
+            u3_anteil[aktiv] = (2 * kinder[aktiv] * restbudget + summe_kinder) // (2 * summe_kinder)
+            multiplikator = Fraction(restbudget * kinder_faktor, summe_kinder)
+        else:
+            u3_anteil[aktiv] = 0
+            multiplikator = Fraction(0)
+        zwischensumme[aktiv] = sockelbetrag[aktiv] + u3_anteil[aktiv]
+        runden[aktiv] = runde
+        if runde == 1:
+            erste_berechnung[aktiv] = zwischensumme[aktiv]
+        
+        unter_minimum = aktiv & (zwischensumme < mindestbetrag_cent)
+        if runde > 1:
+            aus_runde_1 = unter_minimum & (erste_berechnung >= mindestbetrag_cent)
+        else:
+            aus_runde_1 = np.zeros(n, dtype=bool)
+        auf_minimum = unter_minimum & ~aus_runde_1
+        ueber_minimum = aktiv & ~unter_minimum
+        
+        endbetrag[aus_runde_1] = erste_berechnung[aus_runde_1]
+        status[aus_runde_1] = STATUS_WERT_RUNDE_1
+        endbetrag[auf_minimum] = mindestbetrag_cent
+        status[auf_minimum] = STATUS_MINDESTBETRAG
+        endbetrag[ueber_minimum] = zwischensumme[ueber_minimum]
+        
+        neu_fixiert = np.flatnonzero(unter_minimum)
+        protokoll.append({
+            'verfuegbares_budget': verfuegbares_budget / 100,
+            'summe_sockel': summe_sockel / 100,
+            'restbudget': restbudget / 100,
+            'summe_u3': summe_kinder if kinder_faktor == 1 else summe_kinder / kinder_faktor,
+            'multiplikator': float(multiplikator) / 100,
+            'multiplikator_bruch': multiplikator,
+            'neu_fixiert': neu_fixiert
+        })
+        
+        if len(neu_fixiert) == 0:
+            status[aktiv] = STATUS_OK
+            break
+        
+        if codes is None:
+            fixiert |= unter_minimum
+        else:
+            fixierte_codes[codes[neu_fixiert]] = True
+            fixiert = fixierte_codes[codes]
+    
+    return {
+        'sockelbetrag': sockelbetrag.astype(np.int64),
+        'u3_anteil': u3_anteil.astype(np.int64),
+        'zwischensumme': zwischensumme.astype(np.int64),
+        'endbetrag': endbetrag.astype(np.int64),
+        'runde': runden,
+        'erste_berechnung': erste_berechnung.astype(np.int64),
+        'status': status,
+        'protokoll': protokoll,
+        'alle_fixiert': alle_fixiert
+    }
+
+
+def runde_cent_auf_euro(endbetrag_cent, gesamtsumme_cent):
+    """
+    Rundet Cent-Beträge ganzzahlig auf ganze Euro und gleicht die Differenz
+    zur Gesamtsumme bei der Kommune mit der größten Fördersumme aus
+    
+    Gerundet wird wie bei round() auf die nächste gerade Zahl bei genau 50 Cent.
+    
+    Returns:
+        Tuple (gerundete Beträge in Cent, Index der Ausgleichskommune oder None,
+        Rundungsdifferenz in Cent)
+    """
+    euro, rest = np.divmod(np.asarray(endbetrag_cent, dtype=np.int64), 100)
+    aufrunden = (rest > 50) | ((rest == 50) & (euro % 2 == 1))
+    gerundet = (euro + aufrunden) * 100
+    
+    rundungs_differenz = int(gesamtsumme_cent) - int(gerundet.sum())
+    max_idx = None
+    if abs(rundungs_differenz) >= 100:
+        max_idx = int(gerundet.argmax())
+        gerundet[max_idx] += rundungs_differenz
+    
+    return gerundet, max_idx, rundungs_differenz
+
+
+def ist_fixiert(status):
+    """
+    Liefert eine Maske der auf den Mindestbetrag bzw. Wert aus Runde 1 fixierten Kommunen
+    """
+    return np.fromiter((text.startswith(('Fixiert', 'Wert aus Runde 1')) for text in status),
+                       dtype=bool, count=len(status))
+
+
+def _groesste_auswaehlen(werte, anzahl):
+    """
+    Liefert die Indizes der anzahl größten Werte in O(n)
+    
+    Bei Gleichstand werden die Kommunen mit kleinerem Index bevorzugt, damit
+    das Ergebnis unabhängig von der Sortierimplementierung ist.
+    """
+    n = len(werte)
+    if anzahl <= 0:
+        return np.empty(0, dtype=np.intp)
+    if anzahl >= n:
+        return np.arange(n)
+    schwelle = werte[np.argpartition(werte, n - anzahl)[n - anzahl]]
+    groesser = np.flatnonzero(werte > schwelle)
+    gleich = np.flatnonzero(werte == schwelle)[:anzahl - len(groesser)]
+    return np.concatenate((groesser, gleich))
+
+
+def runde_groesste_reste(endbetrag, gesamtsumme, fixiert=None, mindestbetrag=0, einheit=1):
+    """
+    Rundet auf ganze Euro nach dem Verfahren der größten Reste (Hamilton)
+    
+    Alle Beträge werden zunächst abgerundet; die fehlenden ganzen Euro bis
+    zur Gesamtsumme erhalten die Kommunen mit den größten Nachkommaresten.
+    Fixierte Kommunen werden dabei nie unter den (auf ganze Euro
+    aufgerundeten) Mindestbetrag gesetzt. Ist weniger zu verteilen als die
+    Summe der abgerundeten Beträge, werden die Kommunen mit den kleinsten
+    Resten abgerundet.
+    
+    Args:
+        endbetrag: Beträge vor Rundung (Euro oder mit einheit=100 ganze Cent)
+        gesamtsumme: Gesamtsumme in derselben Einheit
+        fixiert: Optionale Maske der fixierten Kommunen
+        mindestbetrag: Mindestbetrag in derselben Einheit
+        einheit: Anzahl Einheiten je Euro
+    
+    Returns:
+        Array der gerundeten Beträge in derselben Einheit
+    """
+    endbetrag = np.asarray(endbetrag)
+    n = len(endbetrag)
+    gerundet = (endbetrag // einheit) * einheit
+    
+    spielraum = np.full(n, np.inf)
+    if fixiert is not None:
+        untergrenze = -(-mindestbetrag // einheit) * einheit
+        gerundet[fixiert] = np.maximum(gerundet[fixiert], untergrenze)
+        spielraum[fixiert] = (gerundet[fixiert] - untergrenze) // einheit
+    
+    reste = (endbetrag - gerundet) / einheit
+    fehlend = int(np.round((gesamtsumme - gerundet.sum()) / einheit))
+    anpassung = np.zeros(n, dtype=np.int64)
+    
+    if fehlend > 0 and n > 0:
+        je_kommune, anzahl = divmod(fehlend, n)
+        anpassung += je_kommune
+        anpassung[_groesste_auswaehlen(reste, anzahl)] += 1
+    
+    while fehlend < 0:
+        restspielraum = spielraum + anpassung
+        erlaubt = np.flatnonzero(restspielraum > 0)
+        if len(erlaubt) == 0:
+            break
+        # Größere Überhänge zunächst gleichmäßig im Rahmen des Spielraums abziehen
+        je_kommune = -fehlend // len(erlaubt)
+        if je_kommune > 0:
+            abzug = np.minimum(je_kommune, restspielraum[erlaubt]).astype(np.int64)
+            anpassung[erlaubt] -= abzug
+            fehlend += int(abzug.sum())
+            continue
+        auswahl = _groesste_auswaehlen(-reste[erlaubt], -fehlend)
+        anpassung[erlaubt[auswahl]] -= 1
+        fehlend = 0
+    
+    return gerundet + anpassung * einheit
+
+
+def status_texte(status, runden, erste_berechnung):
+    """
+    Übersetzt die Status-Codes des NumPy-Verfahrens in die Status-Texte
+    """
+    texte = np.empty(len(status), dtype=object)
+    texte[status == STATUS_IN_BERECHNUNG] = 'In Berechnung'
+    texte[status == STATUS_OK] = 'OK'
+    for idx in np.flatnonzero(status == STATUS_MINDESTBETRAG):
+        texte[idx] = f'Fixiert auf Mindestbetrag (Runde {runden[idx]})'
+    for idx in np.flatnonzero(status == STATUS_WERT_RUNDE_1):
+        texte[idx] = f'Wert aus Runde 1 ({erste_berechnung[idx]:,.2f} €)'
+    return texte
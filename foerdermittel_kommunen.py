@@ -0,0 +1,157 @@
+import itertools
+import numpy as np
+
+
+def kommunen_spalten(kommunen, wert_2019=None, kinder_u3=None):
+    """
+    Wandelt Kommunendaten in die drei Spalten Name, Wert_2019 und Kinder_U3 um
+
+    Args:
+        kommunen: Eine der folgenden Formen:
+                  - Array/Liste der Namen, wenn wert_2019 und kinder_u3 angegeben sind
+                  - DataFrame oder Dictionary mit den Spalten Name, Wert_2019, Kinder_U3
+                  - Iterierbares von Dictionaries (wie kommunen_daten) oder
+                    Tupeln (Name, Wert_2019, Kinder_U3)
+        wert_2019: Array der Förderwerte 2019 (nur mit Namens-Array)
+        kinder_u3: Array der Kinder U3 im SGB-II-Bezug (nur mit Namens-Array)
+
+    Returns:
+        Tupel (namen, wert_2019, kinder_u3) aus NumPy-Arrays
+    """
+    if wert_2019 is not None or kinder_u3 is not None:
+        if wert_2019 is None or kinder_u3 is None:
+            raise ValueError("wert_2019 und kinder_u3 müssen gemeinsam angegeben werden")
+        namen = kommunen
+    elif hasattr(kommunen, 'columns') or isinstance(kommunen, dict):
+        # DataFrame oder Dictionary von Spalten
+        namen = kommunen['Name']
+        wert_2019 = kommunen['Wert_2019']
+        kinder_u3 = kommunen['Kinder_U3']
+    else:
+        zeilen = iter(kommunen)
+        erste = next(zeilen, None)
+        if erste is None:
+            return np.empty(0, dtype=object), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        zeilen = itertools.chain((erste,), zeilen)
+        if isinstance(erste, dict):
+            zeilen = ((k['Name'], k['Wert_2019'], k['Kinder_U3']) for k in zeilen)
+        namen, wert_2019, kinder_u3 = zip(*zeilen)
+
+    namen = np.asarray(namen, dtype=object)
+    wert_2019 = _zahlen_array(wert_2019)
+    kinder_u3 = _zahlen_array(kinder_u3)
+    if not len(namen) == len(wert_2019) == len(kinder_u3):
+        raise ValueError("Name, Wert_2019 und Kinder_U3 müssen gleich lang sein")
+
+    return namen, wert_2019, kinder_u3
+
+
+def _zahlen_array(werte):
+    """Liefert ein Ganzzahl- oder Gleitkomma-Array"""
+    werte = np.asarray(werte)
+    if werte.dtype.kind in 'iu':
+        return werte.astype(np.int64, copy=False)
+    return werte.astype(np.float64, copy=False)
+
+
+class KommunenSpeicher:
+    def __init__(self):
+        """
+        Spaltenorientierter Speicher für die Kommunendaten
+
+        Namen, Förderwerte 2019 und Kinder U3 liegen in je einem NumPy-Array,
+        dessen Kapazität bei Bedarf verdoppelt wird. Ganzzahlige Werte
+        bleiben ganzzahlig, bis der erste Gleitkommawert hinzukommt.
+        Zusätzlich wird ein Dictionary Name → Position geführt (bei
+        gleichnamigen Kommunen die erste Position).
+        """
+        self._namen = np.empty(0, dtype=object)
+        self._wert = np.empty(0, dtype=np.int64)
+        self._kinder = np.empty(0, dtype=np.int64)
+        self._anzahl = 0
+        self.index = {}
+
+    def __len__(self):
+        return self._anzahl
+
+    def __contains__(self, name):
+        return name in self.index
+
+    @property
+    def namen(self):
+        """Array der Namen"""
+        return self._namen[:self._anzahl]
+
+    @property
+    def wert_2019(self):
+        """Array der Förderwerte 2019"""
+        return self._wert[:self._anzahl]
+
+    @property
+    def kinder_u3(self):
+        """Array der Kinder U3 im SGB-II-Bezug"""
+        return self._kinder[:self._anzahl]
+
+    def leeren(self):
+        """Entfernt alle Kommunen"""
+        self.__init__()
+
+    def _platz_schaffen(self, anzahl, wert_dtype, kinder_dtype):
+        """Vergrößert die Arrays und passt bei Bedarf den Datentyp an"""
+        benoetigt = self._anzahl + anzahl
+        kapazitaet = len(self._namen)
+        if benoetigt > kapazitaet:
+            kapazitaet = max(16, 2 * kapazitaet, benoetigt)
+        wert_dtype = np.result_type(self._wert.dtype, wert_dtype)
+        kinder_dtype = np.result_type(self._kinder.dtype, kinder_dtype)
+
+        for attribut, dtype in (('_namen', object), ('_wert', wert_dtype),
+                                ('_kinder', kinder_dtype)):
+            alt = getattr(self, attribut)
+            if len(alt) != kapazitaet or alt.dtype != dtype:
+                neu = np.empty(kapazitaet, dtype=dtype)
+                neu[:self._anzahl] = alt[:self._anzahl]
+                setattr(self, attribut, neu)
+
+    def hinzufuegen(self, name, wert_2019, kinder_u3):
+        """
+        Fügt eine einzelne Kommune hinzu (amortisiert O(1))
+        """
+        wert_2019 = _zahlen_array(wert_2019)
+        kinder_u3 = _zahlen_array(kinder_u3)
+        self._platz_schaffen(1, wert_2019.dtype, kinder_u3.dtype)
+
+        pos = self._anzahl
+        self._namen[pos] = name
+        self._wert[pos] = wert_2019
+        self._kinder[pos] = kinder_u3
+        self._anzahl += 1
+        self.index.setdefault(name, pos)
+
+    def hinzufuegen_viele(self, namen, wert_2019, kinder_u3):
+        """
+        Fügt viele Kommunen mit einer Kopie je Spalte hinzu
+
+        Args:
+            namen: Array der Namen
+            wert_2019: Array der Förderwerte 2019
+            kinder_u3: Array der Kinder U3 im SGB-II-Bezug
+        """
+        anzahl = len(namen)
+        self._platz_schaffen(anzahl, wert_2019.dtype, kinder_u3.dtype)
+
+        start = self._anzahl
+        self._namen[start:start + anzahl] = namen
+        self._wert[start:start + anzahl] = wert_2019
+        self._kinder[start:start + anzahl] = kinder_u3
+        self._anzahl += anzahl
+        for pos, name in enumerate(namen, start):
+            self.index.setdefault(name, pos)
+
+    def als_dicts(self):
+        """
+        Liefert die Kommunen als Liste von Dictionaries (Format kommunen_daten)
+        """
+        return [{'Name': name, 'Wert_2019': wert, 'Kinder_U3': kinder, 'Status': 'In Berechnung'}
+                for name, wert, kinder in zip(self.namen.tolist(), self.wert_2019.tolist(),
+                                              self.kinder_u3.tolist())]
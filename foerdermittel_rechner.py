@@ -1,25 +1,86 @@
-import pandas as pd
 import numpy as np
-from openpyxl import Workbook
-from openpyxl.styles import PatternFill, Font, Alignment, Border, Side
-from openpyxl.utils.dataframe import dataframe_to_rows
 import warnings
+import sys
+from foerdermittel_kern import STATUS_WERT_RUNDE_1, in_cent, ist_fixiert, runde_groesste_reste
+from foerdermittel_kommunen import KommunenSpeicher, kommunen_spalten
+from foerdermittel_ereignisse import (KonsolenAusgabe, DEBUG, INFO, WARNUNG, RUNDE_GESTARTET,
+                                      KOMMUNE_FIXIERT, RUNDE_BEENDET, BERECHNUNG_ABGESCHLOSSEN,
+                                      RUNDUNG_ANGEWENDET, VALIDIERUNG, EXPORT, PHASE_FIXIERUNG,
+                                      PHASE_RUNDUNG, PHASE_VALIDIERUNG, PHASE_EXPORT)
 warnings.filterwarnings('ignore')
 
+# Verfügbare Berechnungsverfahren für die iterativen Runden
+VERFAHREN = ('pandas', 'numpy', 'exakt', 'cent')
+
+# Verfügbare Verfahren für die Rundung auf ganze Euro
+RUNDUNGSVERFAHREN = ('maximum', 'hamilton')
+
 class FoerdermittelRechner:
-    def __init__(self, gesamtsumme):
+    def __init__(self, gesamtsumme, verfahren='pandas', rundungsverfahren='maximum',
+                 ausgabe=None):
         """
         Initialisiert den Fördermittelrechner
         
         Args:
             gesamtsumme: Gesamte zu verteilende Fördersumme
+            verfahren: Berechnungsverfahren für die Runden ('pandas', 'numpy', 'exakt'
+                       oder 'cent' für ganzzahlige Cent-Arithmetik)
+            rundungsverfahren: Ausgleich der Rundungsdifferenz ('maximum' bei der
+                               größten Fördersumme oder 'hamilton' nach größten Resten)
+            ausgabe: Empfänger der Berechnungsereignisse (Standard: KonsolenAusgabe,
+                     StilleAusgabe unterdrückt jede Ausgabe und Protokollierung)
         """
+        if verfahren not in VERFAHREN:
+            raise ValueError(f"Unbekanntes Berechnungsverfahren: {verfahren}")
+        if rundungsverfahren not in RUNDUNGSVERFAHREN:
+            raise ValueError(f"Unbekanntes Rundungsverfahren: {rundungsverfahren}")
+        
         self.gesamtsumme = gesamtsumme
+        self.verfahren = verfahren
+        self.rundungsverfahren = rundungsverfahren
+        self.ausgabe = ausgabe if ausgabe is not None else KonsolenAusgabe()
         self.mindestbetrag = 12500
         self.sockelbetrag_prozent = 0.5
-        self.kommunen_daten = []
+        self.kommunen = KommunenSpeicher()
         self.berechnungs_log = []
         
+        # Unveränderliches Ergebnis der Verfahren 'numpy', 'exakt' und 'cent'
+        # (siehe foerdermittel_berechnung), ergebnis_df wird daraus erst beim
+        # ersten Zugriff erstellt
+        self.ergebnis = None
+        self._ergebnis_df = None
+        
+        # Optionale Fortschrittsfunktion fortschritt(phase, schritt, gesamt);
+        # löst sie eine Ausnahme aus, wird die Berechnung abgebrochen
+        # (siehe foerdermittel_auftrag)
+        self.fortschritt = None
+    
+    @property
+    def kommunen_daten(self):
+        """
+        Kommunendaten als Liste von Dictionaries (Kopie des Kommunen-Speichers)
+        """
+        return self.kommunen.als_dicts()
+    
+    @kommunen_daten.setter
+    def kommunen_daten(self, daten):
+        self.kommunen.leeren()
+        self.kommunen_hinzufuegen(daten)
+    
+    @property
+    def ergebnis_df(self):
+        """
+        Ergebnis-DataFrame der letzten Berechnung (erst beim ersten Zugriff erstellt)
+        """
+        if self._ergebnis_df is None and self.ergebnis is not None:
+            self._ergebnis_df = self.ergebnis.als_dataframe()
+        return self._ergebnis_df
+    
+    @ergebnis_df.setter
+    def ergebnis_df(self, df):
+        self._ergebnis_df = df
+        self.ergebnis = None
+        
     def kommune_hinzufuegen(self, name, wert_2019, kinder_u3):
         """
         Fügt eine Kommune mit ihren Daten hinzu
@@ -29,19 +90,101 @@ class FoerdermittelRechner:
             wert_2019: Förderwert aus 2019
             kinder_u3: Anzahl der Kinder U3 im SGB-II-Bezug
         """
-        self.kommunen_daten.append({
-            'Name': name,
-            'Wert_2019': wert_2019,
-            'Kinder_U3': kinder_u3,
+        self.kommunen.hinzufuegen(name, wert_2019, kinder_u3)
+    
+    def kommunen_hinzufuegen(self, kommunen, wert_2019=None, kinder_u3=None):
+        """
+        Fügt viele Kommunen auf einmal hinzu
+        
+        Args:
+            kommunen: Array der Namen (mit wert_2019 und kinder_u3), DataFrame
+                      mit den Spalten Name, Wert_2019 und Kinder_U3 oder
+                      Iterierbares von Dictionaries bzw. Tupeln
+            wert_2019: Array der Förderwerte 2019
+            kinder_u3: Array der Kinder U3 im SGB-II-Bezug
+        """
+        self.kommunen.hinzufuegen_viele(*kommunen_spalten(kommunen, wert_2019, kinder_u3))
+    
+    def _kommunen_dataframe(self):
+        """
+        Erstellt den Ausgangs-DataFrame der Berechnung aus dem Kommunen-Speicher
+        """
+        import pandas as pd
+        
+        return pd.DataFrame({
+            'Name': self.kommunen.namen,
+            'Wert_2019': self.kommunen.wert_2019,
+            'Kinder_U3': self.kommunen.kinder_u3,
             'Status': 'In Berechnung'
         })
     
-    def berechne_verteilung(self):
+    def _meldet(self, level):
+        """
+        Prüft, ob Ereignisse dieses Levels verarbeitet werden
+        """
+        return level >= self.ausgabe.level
+    
+    def _melde(self, ereignis, level=INFO, **daten):
+        """
+        Legt ein Ereignis im Berechnungsprotokoll ab und gibt es aus
+        
+        Args:
+            ereignis: Ereignistyp (siehe foerdermittel_ereignisse)
+            level: Level des Ereignisses
+            **daten: Ereignisdaten
+        """
+        if level < self.ausgabe.level:
+            return
+        eintrag = {'ereignis': ereignis, 'level': level}
+        for schluessel, wert in daten.items():
+            eintrag[schluessel] = wert.item() if isinstance(wert, np.generic) else wert
+        self.berechnungs_log.append(eintrag)
+        self.ausgabe.verarbeite(eintrag)
+    
+    def _fortschritt(self, phase, schritt, gesamt):
+        """
+        Meldet den Fortschritt an die Fortschrittsfunktion (falls gesetzt)
+        """
+        if self.fortschritt is not None:
+            self.fortschritt(phase, schritt, gesamt)
+    
+    def berechne_verteilung(self, als_dataframe=True):
         """
         Führt die iterative Berechnung der Fördermittelverteilung durch
+        
+        Die Verfahren 'numpy', 'exakt' und 'cent' rechnen mit
+        foerdermittel_berechnung direkt auf den Arrays des Kommunen-Speichers
+        und laden pandas erst, wenn der Ergebnis-DataFrame angefordert wird.
+        
+        Args:
+            als_dataframe: True liefert den Ergebnis-DataFrame, False das
+                           unveränderliche Ergebnis ohne pandas (nicht beim
+                           Verfahren 'pandas')
+        
+        Returns:
+            Ergebnis-DataFrame bzw. Ergebnis
+        """
+        if not als_dataframe and self.verfahren == 'pandas':
+            raise ValueError("Das Verfahren 'pandas' liefert nur einen DataFrame")
+        self.berechnungs_log = []
+        if self.verfahren == 'pandas':
+            df = self._berechne_runden_pandas()
+            self._fortschritt(PHASE_RUNDUNG, 0, 1)
+            ergebnis = self._runde_und_validiere(df)
+            self._fortschritt(PHASE_VALIDIERUNG, 1, 1)
+            return ergebnis
+        
+        self._berechne_arrays()
+        self.validiere_ergebnis()
+        self._fortschritt(PHASE_VALIDIERUNG, 1, 1)
+        return self.ergebnis_df if als_dataframe else self.ergebnis
+    
+    def _berechne_runden_pandas(self):
+        """
+        Iterative Runden mit zeilenweisem Zugriff auf den DataFrame
         """
         # Erstelle DataFrame
-        df = pd.DataFrame(self.kommunen_daten)
+        df = self._kommunen_dataframe()
         df['Sockelbetrag'] = df['Wert_2019'] * self.sockelbetrag_prozent
         df['U3_Anteil'] = 0
         df['Zwischensumme'] = 0
@@ -56,14 +199,15 @@ class FoerdermittelRechner:
         
         while runde < max_runden:
             runde += 1
-            print(f"\n=== Runde {runde} ===")
+            self._fortschritt(PHASE_FIXIERUNG, runde - 1, max_runden)
             
             # Filter aktive Kommunen (nicht fixiert)
             aktive_mask = ~df['Name'].isin(fixierte_kommunen)
             aktive_df = df[aktive_mask].copy()
             
             if len(aktive_df) == 0:
-                print("Alle Kommunen wurden bearbeitet.")
+                self._melde(BERECHNUNG_ABGESCHLOSSEN, runden=runde - 1, abgeschlossen=True,
+                            alle_fixiert=True)
                 break
             
             # Berechne Sockelbeträge für aktive Kommunen
@@ -74,10 +218,6 @@ class FoerdermittelRechner:
             verfuegbares_budget = self.gesamtsumme - bereits_fixiert_summe
             restbudget = verfuegbares_budget - summe_sockel
             
-            print(f"Verfügbares Budget: {verfuegbares_budget:,.2f} €")
-            print(f"Summe Sockelbeträge: {summe_sockel:,.2f} €")
-            print(f"Restbudget für U3-Verteilung: {restbudget:,.2f} €")
-            
             # Berechne U3-Multiplikator
             summe_u3 = aktive_df['Kinder_U3'].sum()
             if summe_u3 > 0:
@@ -85,11 +225,17 @@ class FoerdermittelRechner:
             else:
                 multiplikator = 0
             
-            print(f"U3-Kinder gesamt: {summe_u3}")
-            print(f"Multiplikator: {multiplikator:,.2f} €/Kind")
+            self._melde(RUNDE_GESTARTET, runde=runde, verfuegbares_budget=verfuegbares_budget,
+                        summe_sockel=summe_sockel, restbudget=restbudget, summe_u3=summe_u3,
+                        multiplikator=multiplikator)
+            einzeln_melden = self._meldet(DEBUG)
             
             # Berechne U3-Anteile und Zwischensummen
-            for idx in aktive_df.index:
+            anzahl_aktiv = len(aktive_df)
+            for position, idx in enumerate(aktive_df.index):
+                if position % 1000 == 0:
+                    self._fortschritt(PHASE_FIXIERUNG, runde - 1 + position / (2 * anzahl_aktiv),
+                                      max_runden)
                 df.loc[idx, 'U3_Anteil'] = df.loc[idx, 'Kinder_U3'] * multiplikator
                 df.loc[idx, 'Zwischensumme'] = df.loc[idx, 'Sockelbetrag'] + df.loc[idx, 'U3_Anteil']
                 df.loc[idx, 'Runde'] = runde
@@ -100,7 +246,10 @@ class FoerdermittelRechner:
             
             # Prüfe Mindestbeträge
             neue_fixierungen = []
-            for idx in aktive_df.index:
+            for position, idx in enumerate(aktive_df.index):
+                if position % 1000 == 0:
+                    self._fortschritt(PHASE_FIXIERUNG, runde - 0.5 + position / (2 * anzahl_aktiv),
+                                      max_runden)
                 zwischensumme = df.loc[idx, 'Zwischensumme']
                 
                 if zwischensumme < self.mindestbetrag:
@@ -108,11 +257,14 @@ class FoerdermittelRechner:
                     if runde > 1 and df.loc[idx, 'Erste_Berechnung'] >= self.mindestbetrag:
                         df.loc[idx, 'Endbetrag'] = df.loc[idx, 'Erste_Berechnung']
                         df.loc[idx, 'Status'] = f'Wert aus Runde 1 ({df.loc[idx, "Erste_Berechnung"]:,.2f} €)'
-                        print(f"  {df.loc[idx, 'Name']}: Verwendet Wert aus Runde 1")
                     else:
                         df.loc[idx, 'Endbetrag'] = self.mindestbetrag
                         df.loc[idx, 'Status'] = f'Fixiert auf Mindestbetrag (Runde {runde})'
-                        print(f"  {df.loc[idx, 'Name']}: Auf Mindestbetrag fixiert")
+                    
+                    if einzeln_melden:
+                        self._melde(KOMMUNE_FIXIERT, DEBUG, runde=runde, name=df.loc[idx, 'Name'],
+                                    endbetrag=df.loc[idx, 'Endbetrag'],
+                                    wert_aus_runde_1=df.loc[idx, 'Status'].startswith('Wert aus Runde 1'))
                     
                     neue_fixierungen.append(df.loc[idx, 'Name'])
                 else:
@@ -120,6 +272,7 @@ class FoerdermittelRechner:
             
             # Füge neue Fixierungen hinzu
             fixierte_kommunen.update(neue_fixierungen)
+            self._melde(RUNDE_BEENDET, runde=runde, neu_fixiert=len(neue_fixierungen))
             
             # Prüfe ob Iteration beendet werden kann
             if len(neue_fixierungen) == 0:
@@ -127,13 +280,70 @@ class FoerdermittelRechner:
                 for idx in aktive_df.index:
                     if df.loc[idx, 'Name'] not in fixierte_kommunen:
                         df.loc[idx, 'Status'] = 'OK'
-                print(f"\nBerechnung abgeschlossen nach {runde} Runden.")
+                self._melde(BERECHNUNG_ABGESCHLOSSEN, runden=runde, abgeschlossen=True,
+                            alle_fixiert=False)
                 break
-            
-            print(f"Neu fixierte Kommunen: {len(neue_fixierungen)}")
+        else:
+            self._melde(BERECHNUNG_ABGESCHLOSSEN, runden=runde, abgeschlossen=False,
+                        alle_fixiert=False)
+        
+        return df
+    
+    def _berechne_arrays(self):
+        """
+        Iterative Runden und Rundung mit maskierten Array-Operationen
+        
+        Liefert dieselben Endbeträge, Runden und Status wie das
+        pandas-Verfahren, arbeitet aber pro Runde auf zusammenhängenden
+        NumPy-Arrays statt auf einzelnen DataFrame-Zellen. Beim Verfahren
+        'exakt' wird die fixierte Menge per Sortierung bestimmt, beim
+        Verfahren 'cent' wird in ganzen Cent gerechnet. Das Ergebnis wird in
+        self.ergebnis abgelegt.
+        """
+        from foerdermittel_berechnung import Parameter, berechne_mit_protokoll
+        
+        rueckruf = None
+        if self.fortschritt is not None:
+            rueckruf = lambda runde, gesamt: self._fortschritt(PHASE_FIXIERUNG, runde - 1, gesamt)
+        
+        parameter = Parameter(self.gesamtsumme, self.mindestbetrag, self.sockelbetrag_prozent,
+                              self.verfahren, self.rundungsverfahren)
+        kommunen = {'Name': self.kommunen.namen, 'Wert_2019': self.kommunen.wert_2019,
+                    'Kinder_U3': self.kommunen.kinder_u3}
+        ergebnis, protokoll, rundung = berechne_mit_protokoll(kommunen, parameter, rueckruf=rueckruf)
+        self.ergebnis_df = None
+        self.ergebnis = ergebnis
+        
+        if self._meldet(INFO):
+            einzeln_melden = self._meldet(DEBUG)
+            for runde, info in enumerate(protokoll, 1):
+                self._melde(RUNDE_GESTARTET, runde=runde,
+                            verfuegbares_budget=info['verfuegbares_budget'],
+                            summe_sockel=info['summe_sockel'], restbudget=info['restbudget'],
+                            summe_u3=info['summe_u3'], multiplikator=info['multiplikator'])
+                if einzeln_melden:
+                    for idx in info['neu_fixiert']:
+                        self._melde(KOMMUNE_FIXIERT, DEBUG, runde=runde, name=ergebnis.namen[idx],
+                                    endbetrag=ergebnis.endbetrag_vor_rundung[idx],
+                                    wert_aus_runde_1=ergebnis.status[idx] == STATUS_WERT_RUNDE_1)
+                self._melde(RUNDE_BEENDET, runde=runde, neu_fixiert=len(info['neu_fixiert']))
+            abgeschlossen = ergebnis.alle_fixiert or (
+                len(protokoll) > 0 and len(protokoll[-1]['neu_fixiert']) == 0)
+            self._melde(BERECHNUNG_ABGESCHLOSSEN, runden=len(protokoll),
+                        abgeschlossen=abgeschlossen, alle_fixiert=ergebnis.alle_fixiert)
+        
+        self._fortschritt(PHASE_RUNDUNG, 0, 1)
+        self._melde(RUNDUNG_ANGEWENDET, **rundung)
+    
+    def _runde_und_validiere(self, df):
+        """
+        Rundet die Endbeträge auf ganze Euro, gleicht die Differenz aus
+        und validiert das Ergebnis
+        """
+        if self.rundungsverfahren == 'hamilton':
+            return self._runde_hamilton_und_validiere(df)
         
         # Runde alle Endbeträge auf ganze Euro
-        print("\n=== RUNDUNG AUF GANZE EURO ===")
         df['Endbetrag_vor_Rundung'] = df['Endbetrag'].copy()
         df['Endbetrag'] = df['Endbetrag'].round(0)
         
@@ -141,10 +351,7 @@ class FoerdermittelRechner:
         summe_vor_rundung = df['Endbetrag_vor_Rundung'].sum()
         summe_nach_rundung = df['Endbetrag'].sum()
         rundungs_differenz = self.gesamtsumme - summe_nach_rundung
-        
-        print(f"Summe vor Rundung: {summe_vor_rundung:,.2f} €")
-        print(f"Summe nach Rundung: {summe_nach_rundung:,.0f} €")
-        print(f"Rundungsdifferenz: {rundungs_differenz:,.0f} €")
+        kommune_name = alter_betrag = neuer_betrag = None
         
         # Gleiche Differenz bei Kommune mit größter Fördersumme aus
         if abs(rundungs_differenz) >= 1:
@@ -157,12 +364,16 @@ class FoerdermittelRechner:
             df.loc[max_idx, 'Endbetrag'] += rundungs_differenz
             neuer_betrag = df.loc[max_idx, 'Endbetrag']
             
-            print(f"Ausgleich bei {kommune_name}: {alter_betrag:,.0f} € → {neuer_betrag:,.0f} € (Differenz: {rundungs_differenz:+,.0f} €)")
-            
             # Aktualisiere Status
             if 'Rundungsausgleich' not in df.loc[max_idx, 'Status']:
                 df.loc[max_idx, 'Status'] += ' + Rundungsausgleich'
         
+        df['Rundungsanpassung'] = df['Endbetrag'] - df['Endbetrag_vor_Rundung']
+        self._melde(RUNDUNG_ANGEWENDET, verfahren='maximum', summe_vor_rundung=summe_vor_rundung,
+                    summe_nach_rundung=summe_nach_rundung, rundungs_differenz=rundungs_differenz,
+                    ausgleich_kommune=kommune_name, alter_betrag=alter_betrag,
+                    neuer_betrag=neuer_betrag)
+        
         # Speichere Ergebnisse
         self.ergebnis_df = df
         
@@ -171,27 +382,112 @@ class FoerdermittelRechner:
         
         return df
     
-    def validiere_ergebnis(self):
+    def _runde_hamilton_und_validiere(self, df):
         """
-        Überprüft die Korrektheit der Berechnung
+        Rundet die Endbeträge nach dem Verfahren der größten Reste auf ganze
+        Euro und validiert das Ergebnis
+        """
+        endbetrag = df['Endbetrag'].to_numpy(dtype=float)
+        gerundet = runde_groesste_reste(endbetrag, self.gesamtsumme,
+                                        fixiert=ist_fixiert(df['Status']),
+                                        mindestbetrag=self.mindestbetrag)
+        self._hamilton_uebernehmen(df, endbetrag, gerundet)
+        
+        # Speichere Ergebnisse
+        self.ergebnis_df = df
+        
+        # Validierung
+        self.validiere_ergebnis()
+        
+        return df
+    
+    def _hamilton_uebernehmen(self, df, vor_rundung, gerundet, einheit=1):
         """
-        gesamt_verteilt = self.ergebnis_df['Endbetrag'].sum()
-        differenz = abs(self.gesamtsumme - gesamt_verteilt)
+        Schreibt das Ergebnis der Rundung nach größten Resten in den DataFrame
+        """
+        anpassung = (gerundet - vor_rundung) / einheit
         
-        print(f"\n=== VALIDIERUNG ===")
-        print(f"Gesamtsumme (Soll): {self.gesamtsumme:,.2f} €")
-        print(f"Gesamtsumme (Ist):  {gesamt_verteilt:,.2f} €")
-        print(f"Differenz:          {differenz:,.2f} €")
+        df['Endbetrag_vor_Rundung'] = vor_rundung / einheit
+        df['Endbetrag'] = gerundet / einheit
+        df['Rundungsanpassung'] = anpassung
         
-        if differenz > 0.01:  # Toleranz für Rundungsfehler
-            print("⚠️ WARNUNG: Differenz größer als 1 Cent!")
+        self._melde(RUNDUNG_ANGEWENDET, verfahren='hamilton',
+                    summe_vor_rundung=vor_rundung.sum() / einheit,
+                    summe_nach_rundung=gerundet.sum() / einheit,
+                    rundungs_differenz=(gerundet.sum() - vor_rundung.sum()) / einheit,
+                    aufgerundet=np.count_nonzero(anpassung > 0),
+                    abgerundet=np.count_nonzero(anpassung < 0))
+    
+    def validiere_ergebnis(self):
+        """
+        Überprüft die Korrektheit der Berechnung
+        """
+        self._fortschritt(PHASE_VALIDIERUNG, 0, 1)
+        if self.ergebnis is not None:
+            # Ohne den DataFrame zu erstellen
+            endbetrag = self.ergebnis.endbetrag
+            endbetrag_cent = self.ergebnis.cent.get('endbetrag')
+        else:
+            endbetrag = self.ergebnis_df['Endbetrag']
+            endbetrag_cent = self.ergebnis_df.get('Endbetrag_Cent')
+        if endbetrag_cent is not None:
+            # Cent-Verfahren: exakter ganzzahliger Vergleich
+            gesamt_verteilt = int(endbetrag_cent.sum()) / 100
+            differenz = abs(int(in_cent(self.gesamtsumme)) - int(endbetrag_cent.sum())) / 100
         else:
-            print("✓ Validierung erfolgreich!")
+            gesamt_verteilt = endbetrag.sum()
+            differenz = abs(self.gesamtsumme - gesamt_verteilt)
+        
+        erfolgreich = differenz <= 0.01  # Toleranz für Rundungsfehler
+        self._melde(VALIDIERUNG, INFO if erfolgreich else WARNUNG, soll=self.gesamtsumme,
+                    ist=gesamt_verteilt, differenz=differenz, erfolgreich=erfolgreich)
+        return erfolgreich
     
-    def exportiere_excel(self, dateiname='foerdermittel_verteilung.xlsx'):
+    def exportiere(self, dateiname, format=None):
+        """
+        Exportiert die Ergebnisse als Excel-, CSV-, JSON-Lines-, Parquet-, Arrow- oder NPZ-Datei
+        
+        Die maschinenlesbaren Formate werden in einem Durchgang aus den
+        Ergebnisspalten geschrieben und enthalten außer bei 'csv' (RFC 4180)
+        Gesamtsumme, Mindestbetrag und Sockelbetrag als Metadaten (siehe
+        foerdermittel_export).
+        
+        Args:
+            dateiname: Ziel-Datei
+            format: 'xlsx', 'csv', 'csv-de', 'jsonl', 'parquet', 'arrow' oder 'npz'
+                    (Standard: aus der Dateiendung)
+        """
+        from foerdermittel_export import schreibe_ergebnis, format_aus_dateiname
+        
+        if format is None:
+            format = format_aus_dateiname(dateiname)
+        if format == 'xlsx':
+            self.exportiere_excel(dateiname)
+            return
+        schreibe_ergebnis(dateiname, self.ergebnis_df, self.gesamtsumme, self.mindestbetrag,
+                          self.sockelbetrag_prozent, format=format, fortschritt=self._fortschritt)
+        self._melde(EXPORT, dateiname=dateiname, format=format)
+    
+    def exportiere_excel(self, dateiname='foerdermittel_verteilung.xlsx', streaming=True):
         """
         Exportiert die Ergebnisse in eine formatierte Excel-Datei
+        
+        Args:
+            dateiname: Ziel-Datei
+            streaming: True schreibt die Zeilen mit einem write-only-Workbook und
+                       benannten Stilen (foerdermittel_export, für große Ergebnisse),
+                       False formatiert jede Zelle einzeln in einem normalen Workbook
         """
+        if streaming:
+            from foerdermittel_export import schreibe_ergebnis
+            schreibe_ergebnis(dateiname, self.ergebnis_df, self.gesamtsumme, self.mindestbetrag,
+                              self.sockelbetrag_prozent, format='xlsx', fortschritt=self._fortschritt)
+            self._melde(EXPORT, dateiname=dateiname)
+            return
+        
+        from openpyxl import Workbook
+        from openpyxl.styles import PatternFill, Font, Alignment, Border, Side
+        
         # Erstelle Workbook
         wb = Workbook()
         ws = wb.active
@@ -241,7 +537,10 @@ class FoerdermittelRechner:
             cell.alignment = Alignment(horizontal='center')
         
         # Daten
+        anzahl_zeilen = len(self.ergebnis_df)
         for row_idx, row_data in enumerate(self.ergebnis_df.itertuples(index=False), start_row + 1):
+            if (row_idx - start_row - 1) % 1000 == 0:
+                self._fortschritt(PHASE_EXPORT, row_idx - start_row - 1, anzahl_zeilen + 1)
             ws.cell(row=row_idx, column=1, value=row_data.Name).border = border
             ws.cell(row=row_idx, column=2, value=row_data.Wert_2019).border = border
             ws.cell(row=row_idx, column=2).number_format = '#,##0.00 €'
@@ -280,8 +579,10 @@ class FoerdermittelRechner:
             ws.column_dimensions[chr(64 + i)].width = width
         
         # Speichern
+        self._fortschritt(PHASE_EXPORT, anzahl_zeilen, anzahl_zeilen + 1)
         wb.save(dateiname)
-        print(f"\n✓ Excel-Datei '{dateiname}' wurde erfolgreich erstellt!")
+        self._fortschritt(PHASE_EXPORT, anzahl_zeilen + 1, anzahl_zeilen + 1)
+        self._melde(EXPORT, dateiname=dateiname)
 
 
 # ========== BEISPIEL-VERWENDUNG ==========
@@ -313,8 +614,7 @@ def beispiel_berechnung():
         ("Gemeinde J", 18000, 35),
     ]
     
-    for name, wert_2019, kinder_u3 in beispiel_kommunen:
-        rechner.kommune_hinzufuegen(name, wert_2019, kinder_u3)
+    rechner.kommunen_hinzufuegen(beispiel_kommunen)
     
     # Führe Berechnung durch
     print(f"\nGesamtsumme zur Verteilung: {gesamtsumme:,.2f} €")
@@ -342,48 +642,52 @@ def beispiel_berechnung():
 
 # ========== FLEXIBLE EINGABE-FUNKTION ==========
 
-def importiere_excel(dateiname):
+def importiere_excel(dateiname, cache=True):
     """
     Importiert Kommunendaten aus einer Excel-Datei
+
+    Liest die Datei wie die grafische Oberfläche (foerdermittel_import);
+    Zahlen im deutschen oder amerikanischen Format werden spaltenweise
+    umgewandelt.
+
+    Args:
+        dateiname: Pfad der Excel-Datei
+        cache: True für den Import-Cache im Standardverzeichnis, False ohne
+               Cache oder ein ImportCache (foerdermittel_importcache)
     """
+    import pandas as pd
+    from foerdermittel_import import lies_kommunen, FehlendeSpalten
+    
+    if cache is True:
+        from foerdermittel_importcache import ImportCache
+        cache = ImportCache()
+    
     try:
-        # Lese Excel-Datei ein
-        df = pd.read_excel(dateiname, sheet_name="Kommunendaten", skiprows=7)
-        
-        # Überprüfe Spalten
-        erwartete_spalten = ['Kommune', 'Wert 2019 (€)', 'Kinder U3 im SGB-II-Bezug']
-        if not all(spalte in df.columns for spalte in erwartete_spalten):
-            print("⚠️ Die Excel-Datei hat nicht das erwartete Format. Bitte verwenden Sie die Import-Vorlage.")
-            return None
-        
-        # Bereinige Daten
-        df = df.dropna(subset=['Kommune'])  # Entferne Zeilen ohne Kommunennamen
-        df = df.rename(columns={
-            'Kommune': 'Name',
-            'Wert 2019 (€)': 'Wert_2019',
-            'Kinder U3 im SGB-II-Bezug': 'Kinder_U3'
-        })
-        
-        # Konvertiere Datentypen
-        df['Wert_2019'] = pd.to_numeric(df['Wert_2019'], errors='coerce')
-        df['Kinder_U3'] = pd.to_numeric(df['Kinder_U3'], errors='coerce')
-        
-        # Entferne ungültige Einträge
-        df = df.dropna(subset=['Wert_2019', 'Kinder_U3'])
-        
-        # Überprüfe auf negative Werte
-        df = df[(df['Wert_2019'] >= 0) & (df['Kinder_U3'] >= 0)]
-        
-        if len(df) == 0:
-            print("⚠️ Keine gültigen Kommunendaten in der Excel-Datei gefunden.")
-            return None
-        
-        print(f"✓ {len(df)} Kommunen erfolgreich aus Excel importiert.")
-        return df
-        
+        daten = lies_kommunen(dateiname, cache=cache or None)
+    except FehlendeSpalten as e:
+        print(f"⚠️ Die Excel-Datei hat nicht das erwartete Format ({e}). "
+              "Bitte verwenden Sie die Import-Vorlage.")
+        return None
     except Exception as e:
         print(f"⚠️ Fehler beim Import der Excel-Datei: {str(e)}")
         return None
+    
+    if daten['ungueltige_zeilen']:
+        zeilen = ", ".join(str(zeile) for zeile in daten['ungueltige_zeilen'])
+        print(f"⚠️ Nicht lesbare Zahlen in Zeile(n) {zeilen} - diese Zeilen werden übersprungen.")
+    
+    if len(daten['namen']) == 0:
+        print("⚠️ Keine gültigen Kommunendaten in der Excel-Datei gefunden.")
+        return None
+    
+    df = pd.DataFrame({
+        'Name': daten['namen'],
+        'Wert_2019': daten['wert_2019'],
+        'Kinder_U3': daten['kinder_u3']
+    })
+    
+    print(f"✓ {len(df)} Kommunen erfolgreich aus Excel importiert.")
+    return df
 
 def interaktive_eingabe():
     """
@@ -463,8 +767,7 @@ def interaktive_eingabe():
                 continue
                 
             # Füge Kommunen zum Rechner hinzu
-            for _, row in kommunen_df.iterrows():
-                rechner.kommune_hinzufuegen(row['Name'], row['Wert_2019'], row['Kinder_U3'])
+            rechner.kommunen_hinzufuegen(kommunen_df)
             break
             
         else:
@@ -503,6 +806,9 @@ def erstelle_import_vorlage(dateiname='import_vorlage.xlsx'):
     """
     Erstellt eine Excel-Vorlage für den Import von Kommunendaten
     """
+    from openpyxl import Workbook
+    from openpyxl.styles import PatternFill, Font, Alignment, Border, Side
+    
     wb = Workbook()
     ws = wb.active
     ws.title = "Kommunendaten"
@@ -561,6 +867,11 @@ def erstelle_import_vorlage(dateiname='import_vorlage.xlsx'):
 # ========== HAUPTPROGRAMM ==========
 
 if __name__ == "__main__":
+    # Mit Argumenten ohne Rückfragen rechnen (siehe foerdermittel_batch)
+    if len(sys.argv) > 1:
+        import foerdermittel_batch
+        sys.exit(foerdermittel_batch.main())
+    
     print("\nWillkommen zum Fördermittel-Verteilungsrechner!")
     print("\nWählen Sie eine Option:")
     print("1. Beispielberechnung mit Testdaten durchführen")
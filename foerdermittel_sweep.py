@@ -0,0 +1,183 @@
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from foerdermittel_rechner import FoerdermittelRechner
+from foerdermittel_kommunen import kommunen_spalten
+from foerdermittel_ereignisse import StilleAusgabe, PHASE_SWEEP
+
+# Parameter, die variiert werden können (Attributnamen des Rechners)
+SWEEP_PARAMETER = ('gesamtsumme', 'mindestbetrag', 'sockelbetrag_prozent')
+
+# Kommunendaten (Namen, Wert_2019, Kinder_U3) je Worker-Prozess, einmalig per
+# Initializer übertragen
+_worker_kommunen = None
+
+
+def _init_worker(spalten):
+    """Speichert die Kommunendaten im Worker-Prozess"""
+    global _worker_kommunen
+    _worker_kommunen = spalten
+
+
+def _berechne_chunk(basis, parameter, werte, verfahren):
+    """
+    Berechnet die Endbeträge für einen Block von Parameterwerten
+
+    Returns:
+        Array der Form (len(werte), Anzahl Kommunen)
+    """
+    endbetraege = np.empty((len(werte), len(_worker_kommunen[0])))
+
+    for i, wert in enumerate(werte):
+        parameter_satz = dict(basis, **{parameter: wert})
+        rechner = FoerdermittelRechner(parameter_satz['gesamtsumme'], verfahren=verfahren,
+                                       ausgabe=StilleAusgabe())
+        rechner.mindestbetrag = parameter_satz['mindestbetrag']
+        rechner.sockelbetrag_prozent = parameter_satz['sockelbetrag_prozent']
+        rechner.kommunen_hinzufuegen(*_worker_kommunen)
+
+        ergebnis = rechner.berechne_verteilung()
+        endbetraege[i] = ergebnis['Endbetrag'].to_numpy()
+
+    return endbetraege
+
+
+class SweepErgebnis:
+    def __init__(self, parameter, werte, namen, endbetraege, basis):
+        """
+        Spaltenorientierter Speicher für die Ergebnisse eines Parameter-Sweeps
+
+        Args:
+            parameter: Name des variierten Parameters
+            werte: Array der Parameterwerte (Länge m)
+            namen: Array der Kommunennamen (Länge n)
+            endbetraege: Array der Endbeträge der Form (m, n)
+            basis: Dictionary der nicht variierten Parameter
+        """
+        self.parameter = parameter
+        self.werte = werte
+        self.namen = namen
+        self.endbetraege = endbetraege
+        self.basis = basis
+        self._index = {name: i for i, name in enumerate(namen)}
+
+    def kurve(self, name):
+        """
+        Liefert die Endbeträge einer Kommune in Abhängigkeit vom Parameter
+        """
+        import pandas as pd
+
+        return pd.Series(self.endbetraege[:, self._index[name]],
+                         index=pd.Index(self.werte, name=self.parameter), name=name)
+
+    def als_dataframe(self):
+        """
+        Liefert alle Kurven als DataFrame (Zeilen: Parameterwerte, Spalten: Kommunen)
+        """
+        import pandas as pd
+
+        return pd.DataFrame(self.endbetraege,
+                            index=pd.Index(self.werte, name=self.parameter),
+                            columns=self.namen)
+
+    def exportiere_csv(self, dateiname='foerdermittel_sweep.csv'):
+        """
+        Exportiert die Kurven als CSV-Datei
+        """
+        self.als_dataframe().to_csv(dateiname, sep=';', decimal=',')
+
+    def exportiere_excel(self, dateiname='foerdermittel_sweep.xlsx'):
+        """
+        Exportiert die Kurven und die festen Parameter in eine Excel-Datei
+        """
+        import pandas as pd
+
+        with pd.ExcelWriter(dateiname, engine='openpyxl') as writer:
+            self.als_dataframe().to_excel(writer, sheet_name='Kurven')
+            pd.Series(self.basis, name='Wert').to_excel(writer, sheet_name='Parameter')
+
+
+def parameter_sweep(kommunen_daten, parameter, werte, gesamtsumme, mindestbetrag=12500,
+                    sockelbetrag_prozent=0.5, verfahren='numpy', prozesse=None,
+                    chunkgroesse=None, fortschritt=None):
+    """
+    Berechnet die Verteilung für viele Werte eines Parameters auf allen CPU-Kernen
+
+    Die Parameterwerte werden in Blöcke aufgeteilt und an einen Prozess-Pool
+    übergeben; die Kommunendaten werden jedem Worker nur einmal übertragen.
+    Unter Windows muss der Aufruf innerhalb von ``if __name__ == "__main__":``
+    erfolgen.
+
+    Args:
+        kommunen_daten: Liste von Dictionaries mit Name, Wert_2019 und Kinder_U3
+                        (z.B. rechner.kommunen_daten) oder DataFrame mit diesen Spalten
+        parameter: Zu variierender Parameter ('gesamtsumme', 'mindestbetrag'
+                   oder 'sockelbetrag_prozent')
+        werte: Liste der Parameterwerte
+        gesamtsumme: Gesamtsumme, falls nicht variiert
+        mindestbetrag: Mindestbetrag, falls nicht variiert
+        sockelbetrag_prozent: Sockelbetrag-Anteil, falls nicht variiert
+        verfahren: Berechnungsverfahren des Rechners
+        prozesse: Anzahl der Worker-Prozesse (Standard: alle CPU-Kerne, 1 = seriell)
+        chunkgroesse: Parameterwerte je Auftrag (Standard: 4 Aufträge je Prozess)
+        fortschritt: Optionale Fortschrittsfunktion fortschritt(phase, schritt, gesamt),
+                     die nach jedem fertigen Block aufgerufen wird. Löst sie eine
+                     Ausnahme aus (z.B. AuftragAbgebrochen), werden die noch
+                     ausstehenden Blöcke verworfen und die Ausnahme weitergegeben.
+
+    Returns:
+        SweepErgebnis mit einer Kurve je Kommune
+    """
+    if parameter not in SWEEP_PARAMETER:
+        raise ValueError(f"Unbekannter Parameter: {parameter}")
+
+    spalten = kommunen_spalten(kommunen_daten)
+    werte = np.asarray(werte, dtype=float)
+    basis = {
+        'gesamtsumme': gesamtsumme,
+        'mindestbetrag': mindestbetrag,
+        'sockelbetrag_prozent': sockelbetrag_prozent
+    }
+    basis.pop(parameter)
+    namen = spalten[0]
+
+    prozesse = prozesse or os.cpu_count() or 1
+    if chunkgroesse is None:
+        chunkgroesse = max(1, math.ceil(len(werte) / (prozesse * 4)))
+    chunks = [werte[i:i + chunkgroesse] for i in range(0, len(werte), chunkgroesse)]
+
+    def melde(erledigt):
+        if fortschritt is not None:
+            fortschritt(PHASE_SWEEP, erledigt, len(werte))
+
+    melde(0)
+    if prozesse == 1:
+        _init_worker(spalten)
+        teile = []
+        for chunk in chunks:
+            teile.append(_berechne_chunk(basis, parameter, chunk, verfahren))
+            melde(sum(len(teil) for teil in teile))
+    else:
+        with ProcessPoolExecutor(max_workers=prozesse, initializer=_init_worker,
+                                 initargs=(spalten,)) as executor:
+            futures = [executor.submit(_berechne_chunk, basis, parameter, chunk, verfahren)
+                       for chunk in chunks]
+            try:
+                erledigt = 0
+                for future in as_completed(futures):
+                    erledigt += len(future.result())
+                    melde(erledigt)
+            except BaseException:
+                # Noch nicht gestartete Blöcke verwerfen
+                for future in futures:
+                    future.cancel()
+                raise
+            teile = [future.result() for future in futures]
+
+    if teile:
+        endbetraege = np.vstack(teile)
+    else:
+        endbetraege = np.empty((0, len(namen)))
+
+    return SweepErgebnis(parameter, werte, namen, endbetraege, basis)
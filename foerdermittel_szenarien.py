@@ -0,0 +1,193 @@
+import itertools
+import numpy as np
+from foerdermittel_kern import (STATUS_IN_BERECHNUNG, STATUS_OK, STATUS_MINDESTBETRAG,
+                                STATUS_WERT_RUNDE_1)
+
+# Status-Texte der Szenario-Ergebnisse, Index entspricht dem Status-Code
+STATUS_KATEGORIEN = ['In Berechnung', 'OK', 'Fixiert auf Mindestbetrag', 'Wert aus Runde 1']
+
+SZENARIO_SPALTEN = ['gesamtsumme', 'mindestbetrag', 'sockelbetrag_prozent']
+
+
+def szenario_raster(gesamtsummen, mindestbetraege=(12500,), sockelbetrag_prozente=(0.5,)):
+    """
+    Erstellt alle Kombinationen der angegebenen Parameterwerte
+
+    Args:
+        gesamtsummen: Liste der Gesamtsummen
+        mindestbetraege: Liste der Mindestbeträge
+        sockelbetrag_prozente: Liste der Sockelbetrag-Anteile (0.5 = 50%)
+
+    Returns:
+        DataFrame mit einer Zeile je Szenario
+    """
+    import pandas as pd
+
+    return pd.DataFrame(list(itertools.product(gesamtsummen, mindestbetraege, sockelbetrag_prozente)),
+                        columns=SZENARIO_SPALTEN)
+
+
+def verteile_szenarien(wert_2019, kinder_u3, gesamtsumme, mindestbetrag,
+                       sockelbetrag_prozent, max_runden=10):
+    """
+    Berechnet die Verteilung für viele Szenarien gleichzeitig
+
+    Alle Größen werden als 2-D-Arrays (Szenarien × Kommunen) geführt; jede
+    Runde des iterativen Verfahrens wird für alle noch laufenden Szenarien
+    gemeinsam mit maskierten Array-Operationen berechnet. Die Regeln
+    entsprechen FoerdermittelRechner.berechne_verteilung() einschließlich
+    "Wert aus Runde 1" und Rundungsausgleich bei der größten Fördersumme.
+
+    Args:
+        wert_2019: Array der Förderwerte 2019 (Länge n)
+        kinder_u3: Array der Kinder U3 im SGB-II-Bezug (Länge n)
+        gesamtsumme: Array der Gesamtsummen (Länge s)
+        mindestbetrag: Array der Mindestbeträge (Länge s)
+        sockelbetrag_prozent: Array der Sockelbetrag-Anteile (Länge s)
+        max_runden: Sicherheitslimit für die Anzahl der Runden
+
+    Returns:
+        Dictionary mit Arrays der Form (s, n) bzw. (s,)
+    """
+    wert_2019 = np.asarray(wert_2019, dtype=float)
+    kinder_u3 = np.asarray(kinder_u3, dtype=float)
+    gesamtsumme = np.asarray(gesamtsumme, dtype=float)
+    mindestbetrag = np.asarray(mindestbetrag, dtype=float)
+    sockelbetrag_prozent = np.asarray(sockelbetrag_prozent, dtype=float)
+
+    anzahl_szenarien = len(gesamtsumme)
+    form = (anzahl_szenarien, len(wert_2019))
+    minimum = mindestbetrag[:, None]
+
+    sockelbetrag = sockelbetrag_prozent[:, None] * wert_2019[None, :]
+    u3_anteil = np.zeros(form)
+    zwischensumme = np.zeros(form)
+    endbetrag = np.zeros(form)
+    runden = np.zeros(form, dtype=np.int64)
+    erste_berechnung = np.zeros(form)
+    status = np.full(form, STATUS_IN_BERECHNUNG, dtype=np.int8)
+
+    fixiert = np.zeros(form, dtype=bool)
+    laufend = np.ones(anzahl_szenarien, dtype=bool)
+    runden_gesamt = np.zeros(anzahl_szenarien, dtype=np.int64)
+
+    for runde in range(1, max_runden + 1):
+        aktiv = ~fixiert & laufend[:, None]
+        laufend &= aktiv.any(axis=1)
+        if not laufend.any():
+            break
+        runden_gesamt[laufend] = runde
+
+        summe_sockel = np.where(aktiv, sockelbetrag, 0).sum(axis=1)
+        bereits_fixiert_summe = np.where(fixiert, endbetrag, 0).sum(axis=1)
+        restbudget = gesamtsumme - bereits_fixiert_summe - summe_sockel
+        summe_u3 = np.where(aktiv, kinder_u3, 0).sum(axis=1)
+        multiplikator = np.divide(restbudget, summe_u3, out=np.zeros(anzahl_szenarien),
+                                  where=summe_u3 > 0)
+
+        neuer_u3_anteil = kinder_u3[None, :] * multiplikator[:, None]
+        u3_anteil = np.where(aktiv, neuer_u3_anteil, u3_anteil)
+        zwischensumme = np.where(aktiv, sockelbetrag + neuer_u3_anteil, zwischensumme)
+        runden[aktiv] = runde
+        if runde == 1:
+            erste_berechnung = zwischensumme.copy()
+
+        # Prüfe Mindestbeträge
+        unter_minimum = aktiv & (zwischensumme < minimum)
+        if runde > 1:
+            aus_runde_1 = unter_minimum & (erste_berechnung >= minimum)
+        else:
+            aus_runde_1 = np.zeros(form, dtype=bool)
+        auf_minimum = unter_minimum & ~aus_runde_1
+
+        endbetrag = np.where(aktiv & ~unter_minimum, zwischensumme, endbetrag)
+        endbetrag = np.where(aus_runde_1, erste_berechnung, endbetrag)
+        endbetrag = np.where(auf_minimum, minimum, endbetrag)
+        status[aus_runde_1] = STATUS_WERT_RUNDE_1
+        status[auf_minimum] = STATUS_MINDESTBETRAG
+
+        # Szenarien ohne neue Fixierungen sind abgeschlossen
+        neu_fixiert = unter_minimum.any(axis=1)
+        status[aktiv & ~neu_fixiert[:, None]] = STATUS_OK
+        laufend &= neu_fixiert
+        fixiert |= unter_minimum
+
+    # Runde auf ganze Euro und gleiche die Differenz bei der größten Fördersumme aus
+    endbetrag_vor_rundung = endbetrag
+    endbetrag = np.round(endbetrag_vor_rundung, 0)
+    rundungs_differenz = gesamtsumme - endbetrag.sum(axis=1)
+    ausgleich = np.abs(rundungs_differenz) >= 1
+    zeilen = np.flatnonzero(ausgleich)
+    spalten = endbetrag.argmax(axis=1)[ausgleich]
+    endbetrag[zeilen, spalten] += rundungs_differenz[ausgleich]
+    rundungsausgleich = np.zeros(form, dtype=bool)
+    rundungsausgleich[zeilen, spalten] = True
+
+    return {
+        'sockelbetrag': sockelbetrag,
+        'u3_anteil': u3_anteil,
+        'zwischensumme': zwischensumme,
+        'endbetrag_vor_rundung': endbetrag_vor_rundung,
+        'endbetrag': endbetrag,
+        'runde': runden,
+        'erste_berechnung': erste_berechnung,
+        'status': status,
+        'rundungsausgleich': rundungsausgleich,
+        'runden_gesamt': runden_gesamt,
+        'rundungs_differenz': rundungs_differenz
+    }
+
+
+def berechne_szenarien(kommunen, szenarien, max_runden=10):
+    """
+    Berechnet die Verteilung eines Kommunen-Datensatzes für viele Parametersätze
+
+    Args:
+        kommunen: DataFrame oder Liste von Dictionaries mit Name, Wert_2019
+                  und Kinder_U3 (z.B. aus importiere_excel)
+        szenarien: DataFrame mit den Spalten gesamtsumme, mindestbetrag und
+                   sockelbetrag_prozent oder Liste entsprechender Tupel
+        max_runden: Sicherheitslimit für die Anzahl der Runden
+
+    Returns:
+        DataFrame im Long-Format mit einer Zeile je Szenario und Kommune
+    """
+    import pandas as pd
+
+    kommunen = pd.DataFrame(kommunen)
+    if isinstance(szenarien, pd.DataFrame):
+        szenarien = szenarien[SZENARIO_SPALTEN]
+    else:
+        szenarien = pd.DataFrame(list(szenarien), columns=SZENARIO_SPALTEN)
+
+    gesamtsumme = szenarien['gesamtsumme'].to_numpy(dtype=float)
+    mindestbetrag = szenarien['mindestbetrag'].to_numpy(dtype=float)
+    sockelbetrag_prozent = szenarien['sockelbetrag_prozent'].to_numpy(dtype=float)
+
+    ergebnis = verteile_szenarien(kommunen['Wert_2019'].to_numpy(),
+                                  kommunen['Kinder_U3'].to_numpy(),
+                                  gesamtsumme, mindestbetrag, sockelbetrag_prozent,
+                                  max_runden=max_runden)
+
+    anzahl_kommunen = len(kommunen)
+    anzahl_szenarien = len(szenarien)
+
+    return pd.DataFrame({
+        'Szenario': np.repeat(np.arange(anzahl_szenarien), anzahl_kommunen),
+        'Gesamtsumme': np.repeat(gesamtsumme, anzahl_kommunen),
+        'Mindestbetrag': np.repeat(mindestbetrag, anzahl_kommunen),
+        'Sockelbetrag_Prozent': np.repeat(sockelbetrag_prozent, anzahl_kommunen),
+        'Name': np.tile(kommunen['Name'].to_numpy(), anzahl_szenarien),
+        'Wert_2019': np.tile(kommunen['Wert_2019'].to_numpy(), anzahl_szenarien),
+        'Kinder_U3': np.tile(kommunen['Kinder_U3'].to_numpy(), anzahl_szenarien),
+        'Sockelbetrag': ergebnis['sockelbetrag'].ravel(),
+        'U3_Anteil': ergebnis['u3_anteil'].ravel(),
+        'Zwischensumme': ergebnis['zwischensumme'].ravel(),
+        'Endbetrag_vor_Rundung': ergebnis['endbetrag_vor_rundung'].ravel(),
+        'Endbetrag': ergebnis['endbetrag'].ravel(),
+        'Runde': ergebnis['runde'].ravel(),
+        'Erste_Berechnung': ergebnis['erste_berechnung'].ravel(),
+        'Status': pd.Categorical.from_codes(ergebnis['status'].ravel(),
+                                            categories=STATUS_KATEGORIEN),
+        'Rundungsausgleich': ergebnis['rundungsausgleich'].ravel()
+    })
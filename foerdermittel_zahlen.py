@@ -0,0 +1,253 @@
+"""
+Umwandlung von Zahlen im deutschen oder amerikanischen Format
+
+Importierte Spalten enthalten neben echten Zahlen oft Text wie "1.000,50",
+"1,000.50", "35,000" oder "1.200 €". Die Umwandlung arbeitet auf der ganzen
+Spalte auf einmal: Die Texte werden als NumPy-Zeichenmatrix (eine Zeile je
+Wert, ein Unicode-Codepunkt je Spalte) verarbeitet, ohne jeden Wert einzeln
+in Python zu behandeln:
+
+    1. Zahlen werden unverändert übernommen, aus Text werden Leerzeichen
+       und Währungszeichen entfernt.
+    2. Jeder Text wird auf seine Form reduziert (Ziffern werden zu 9,
+       "1.000,50" zu "9.999,99"). Eine Spalte enthält nur wenige
+       verschiedene Formen; die Regeln (reguläre Ausdrücke) werden je Form
+       einmal ausgewertet statt für jede Zeile.
+    3. Das Zahlenformat der Spalte wird erkannt ('de' oder 'us'), indem
+       eindeutige Werte gezählt werden (z.B. "1.000,50" für 'de',
+       "1,000.50" für 'us').
+    4. Jeder Wert wird einheitlich in das Format "1000.50" gebracht und mit
+       pandas.to_numeric gelesen. Eindeutige Werte werden nach ihrer eigenen
+       Schreibweise gelesen, mehrdeutige Werte wie "1.000" nach dem Format
+       der Spalte.
+    5. Werte, die sich danach nicht als Zahl lesen lassen, werden mit
+       ihrer Position gemeldet.
+
+Regeln für einzelne Werte:
+    - Kommen Punkt und Komma vor, ist das letzte Zeichen das Dezimaltrennzeichen.
+    - Ein Komma mit 1-2 folgenden Ziffern ist ein Dezimaltrennzeichen,
+      Kommata vor Dreiergruppen ("35,000") sind Tausendertrennzeichen.
+    - Punkte vor Dreiergruppen ("1.000.000") sind Tausendertrennzeichen, wenn
+      es mehrere sind oder die Spalte im deutschen Format vorliegt;
+      sonst ist ein Punkt das Dezimaltrennzeichen.
+    - Texte mit mehr als MAX_LAENGE Zeichen gelten als ungültig.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+# Längere Texte werden nicht als Zahl gelesen
+MAX_LAENGE = 64
+
+# Aus Text entfernte Zeichen (Währungszeichen und Leerzeichen)
+ENTFERNTE_ZEICHEN = '€ \t\n\r\xa0\u202f'
+
+_ENTFERNT = np.array([ord(zeichen) for zeichen in ENTFERNTE_ZEICHEN], dtype=np.uint32)
+_KOMMA, _PUNKT, _NULL, _NEUN = ord(','), ord('.'), ord('0'), ord('9')
+
+# Formen, die eindeutig auf ein Zahlenformat hinweisen
+_DEUTSCH_EINDEUTIG = re.compile(r'[-+]?9+,9{1,2}|[-+]?9{1,3}(?:\.999){2,}(?:,9*)?')
+_AMERIKANISCH_EINDEUTIG = re.compile(r'[-+]?9+\.9{1,2}|[-+]?9{1,3}(?:,999){2,}(?:\.9*)?')
+
+# Tausenderpunkte ohne Nachkommastellen (z.B. "1.000" oder "12.500.000")
+_TAUSENDERPUNKTE = re.compile(r'[-+]?9{1,3}(?:\.999)+')
+
+# Umwandlungen in das Format 1000.50:
+# (Punkte entfernen, Kommata entfernen, Kommata zu Punkten, nur das letzte Komma behalten)
+_UMWANDLUNGEN = {
+    None: (False, False, False, False),
+    'de': (True, False, True, False),
+    'us': (False, True, False, False),
+    'komma': (False, False, True, False),
+    'letztes_komma': (False, False, True, True),
+    'punkte': (True, False, False, False),
+}
+
+
+def _als_feld(werte):
+    """Liefert die Werte als eindimensionales NumPy-Array von Objekten"""
+    if isinstance(werte, pd.Series):
+        werte = werte.to_numpy()
+    feld = np.empty(len(werte), dtype=object)
+    feld[:] = werte
+    return feld
+
+
+def _textzeilen(feld):
+    """Positionen der Texte mit höchstens MAX_LAENGE Zeichen und aller Texte"""
+    if pd.api.types.infer_dtype(feld, skipna=False) == 'string':
+        alle = np.arange(len(feld))
+    else:
+        alle = np.flatnonzero(np.fromiter(map(type, feld), object, len(feld)) == str)
+    laengen = np.fromiter(map(len, feld[alle]), int, len(alle))
+    return alle[laengen <= MAX_LAENGE], alle
+
+
+def _zeichenmatrix(texte):
+    """Liefert die Texte als Matrix der Codepunkte (aufgefüllt mit 0)"""
+    feld = np.array(texte, dtype=str)
+    breite = feld.dtype.itemsize // 4
+    return feld.view(np.uint32).reshape(len(feld), breite)
+
+
+def _verdichten(matrix, entfernen):
+    """Entfernt die markierten Zeichen und rückt die übrigen nach links"""
+    behalten = ~entfernen
+    spalten = np.cumsum(behalten, axis=1) - 1
+    ergebnis = np.zeros_like(matrix)
+    ergebnis[np.nonzero(behalten)[0], spalten[behalten]] = matrix[behalten]
+    return ergebnis
+
+
+def _als_texte(matrix):
+    """Wandelt eine Zeichenmatrix zurück in ein Array von Texten"""
+    return np.ascontiguousarray(matrix).view(f'U{matrix.shape[1]}').ravel()
+
+
+def _bereinigte_matrix(texte):
+    """Zeichenmatrix der Texte ohne Währungszeichen und Leerzeichen"""
+    matrix = _zeichenmatrix(texte)
+    entfernen = np.isin(matrix, _ENTFERNT)
+    if entfernen.any():
+        matrix = _verdichten(matrix, entfernen)
+    return matrix
+
+
+def _formen(matrix):
+    """
+    Reduziert die Texte auf ihre Formen
+
+    Returns:
+        Tuple (formen, zuordnung, anzahlen): verschiedene Formen, Nummer der
+        Form je Text und Anzahl der Texte je Form
+    """
+    ziffern = (matrix >= _NULL) & (matrix <= _NEUN)
+    formen, zuordnung = np.unique(_als_texte(np.where(ziffern, _NEUN, matrix)),
+                                  return_inverse=True)
+    return formen, zuordnung.ravel(), np.bincount(zuordnung.ravel(), minlength=len(formen))
+
+
+def _hinweis(form):
+    """Liefert 'de' oder 'us', wenn die Form eindeutig ist, sonst None"""
+    komma = form.rfind(',')
+    punkt = form.rfind('.')
+    if komma >= 0 and punkt >= 0:
+        return 'de' if komma > punkt else 'us'
+    if _DEUTSCH_EINDEUTIG.fullmatch(form):
+        return 'de'
+    if _AMERIKANISCH_EINDEUTIG.fullmatch(form):
+        return 'us'
+    return None
+
+
+def _format_der_formen(formen, anzahlen):
+    """Erkennt das Zahlenformat aus der Anzahl der Texte je Form"""
+    stimmen = {'de': 0, 'us': 0, None: 0}
+    for form, anzahl in zip(formen, anzahlen):
+        stimmen[_hinweis(form)] += anzahl
+    return 'de' if stimmen['de'] > stimmen['us'] else 'us'
+
+
+def _umwandlung(form, zahlenformat):
+    """Liefert die Umwandlung für Texte dieser Form (Schlüssel von _UMWANDLUNGEN)"""
+    komma = form.rfind(',')
+    punkt = form.rfind('.')
+
+    # Punkt und Komma: das letzte Zeichen trennt die Nachkommastellen
+    if komma >= 0 and punkt >= 0:
+        return 'de' if komma > punkt else 'us'
+
+    # Nur Kommata: 1-2 Ziffern nach dem letzten Komma sind Nachkommastellen
+    if komma >= 0:
+        if re.search(r',9{1,2}$', form):
+            return 'komma' if form.count(',') == 1 else 'letztes_komma'
+        return 'us'
+
+    # Nur Punkte: Tausenderpunkte bei mehreren Punkten oder im deutschen Format
+    if _TAUSENDERPUNKTE.fullmatch(form) and (form.count('.') > 1 or zahlenformat == 'de'):
+        return 'punkte'
+    return None
+
+
+def _normalisiere(matrix, formen, zuordnung, zahlenformat):
+    """Bringt die bereinigten Texte in das Format 1000.50"""
+    regeln = np.array([_UMWANDLUNGEN[_umwandlung(form, zahlenformat)] for form in formen],
+                      dtype=bool).reshape(len(formen), 4)[zuordnung]
+    punkte_entfernen, kommata_entfernen, kommata_ersetzen, letztes_komma = (
+        regeln[:, [spalte]] for spalte in range(4))
+
+    komma = matrix == _KOMMA
+    punkt = matrix == _PUNKT
+    if letztes_komma.any():
+        position = np.arange(matrix.shape[1])
+        letzte = np.where(komma, position, -1).max(axis=1, keepdims=True)
+        kommata_entfernen = kommata_entfernen | (letztes_komma & (position < letzte))
+
+    entfernen = (punkt & punkte_entfernen) | (komma & kommata_entfernen)
+    matrix = np.where(komma & kommata_ersetzen, _PUNKT, matrix)
+    return _als_texte(_verdichten(matrix, entfernen))
+
+
+def erkenne_zahlenformat(werte):
+    """
+    Erkennt das Zahlenformat einer Spalte
+
+    Gezählt werden Werte, deren Schreibweise eindeutig ist. Überwiegen die
+    deutschen Werte, liegt die Spalte im deutschen Format vor.
+
+    Args:
+        werte: Werte der Spalte (Liste oder Series, Zahlen und/oder Text)
+
+    Returns:
+        'de' für deutsches Format (1.000,50), sonst 'us' (1,000.50)
+    """
+    feld = _als_feld(werte)
+    zeilen, _ = _textzeilen(feld)
+    if len(zeilen) == 0:
+        return 'us'
+    formen, _, anzahlen = _formen(_bereinigte_matrix(feld[zeilen]))
+    return _format_der_formen(formen, anzahlen)
+
+
+def lies_zahlen(werte, zahlenformat=None):
+    """
+    Wandelt eine Spalte mit Zahlen und Zahlentexten in Gleitkommazahlen um
+
+    Args:
+        werte: Werte der Spalte (Liste oder Series, Zahlen und/oder Text)
+        zahlenformat: 'de' oder 'us'; ohne Angabe wird das Format erkannt
+
+    Returns:
+        Tuple (zahlen, ungueltig): NumPy-Array der Zahlen (NaN für leere oder
+        ungültige Werte) und Positionen der nicht lesbaren, nicht leeren Werte
+    """
+    feld = _als_feld(werte)
+    zeilen, alle_texte = _textzeilen(feld)
+    zahlen = np.full(len(feld), np.nan)
+    leer = pd.isna(feld)
+
+    # Zahlen (auch NumPy-Zahlen und bool) direkt übernehmen
+    if len(alle_texte) < len(feld):
+        keine_texte = np.ones(len(feld), dtype=bool)
+        keine_texte[alle_texte] = False
+        zahlen[keine_texte] = pd.to_numeric(feld[keine_texte], errors='coerce')
+
+    # Texte bis MAX_LAENGE Zeichen bereinigen und einheitlich umwandeln
+    if len(zeilen):
+        matrix = _bereinigte_matrix(feld[zeilen])
+        leer[zeilen] = matrix[:, 0] == 0
+        formen, zuordnung, anzahlen = _formen(matrix)
+        if zahlenformat is None:
+            zahlenformat = _format_der_formen(formen, anzahlen)
+        texte = _normalisiere(matrix, formen, zuordnung, zahlenformat)
+        try:
+            zahlen[zeilen] = texte.astype(float)
+        except ValueError:
+            # Leere oder ungültige Texte: einzeln als NaN
+            zahlen[zeilen] = pd.to_numeric(texte.astype(object), errors='coerce')
+
+    # Nicht leere Werte, die keine Zahl ergeben haben
+    ungueltig = np.flatnonzero(np.isnan(zahlen) & ~leer)
+
+    return zahlen, ungueltig
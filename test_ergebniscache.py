@@ -0,0 +1,52 @@
+"""
+Tests des Ergebnis-Caches: Treffer dürfen sich nicht verändern lassen
+
+Aufruf:
+    python -m pytest test_ergebniscache.py
+"""
+import pickle
+
+import pytest
+
+from foerdermittel_berechnung import Parameter
+from foerdermittel_ergebniscache import ErgebnisCache, ErgebnisDateicache
+
+KOMMUNEN = {'Name': ['A', 'B', 'C'], 'Wert_2019': [50000.0, 30000.0, 1000.0],
+            'Kinder_U3': [10, 20, 3]}
+
+
+def _pruefe_schreibschutz(ergebnis):
+    with pytest.raises(TypeError):
+        ergebnis.cent['endbetrag'] = None
+    with pytest.raises(ValueError):
+        ergebnis.cent['endbetrag'][0] = 1
+    with pytest.raises(ValueError):
+        ergebnis.endbetrag[0] = 1
+    with pytest.raises(AttributeError):
+        ergebnis.endbetrag = None
+
+
+@pytest.mark.parametrize('rundungsverfahren', ['maximum', 'hamilton'])
+def test_treffer_unveraenderlich(tmp_path, rundungsverfahren):
+    parameter = Parameter(100000, verfahren='cent', rundungsverfahren=rundungsverfahren)
+    cache = ErgebnisCache(dateicache=ErgebnisDateicache(str(tmp_path)))
+    neu, herkunft = cache.berechne_mit_herkunft(KOMMUNEN, parameter)
+    assert herkunft is None
+    erwartet = neu.als_dataframe()
+
+    treffer, herkunft = cache.berechne_mit_herkunft(KOMMUNEN, parameter)
+    assert herkunft == 'speicher'
+    _pruefe_schreibschutz(treffer)
+
+    treffer, herkunft = ErgebnisCache(
+        dateicache=ErgebnisDateicache(str(tmp_path))).berechne_mit_herkunft(KOMMUNEN, parameter)
+    assert herkunft == 'datei'
+    _pruefe_schreibschutz(treffer)
+    assert treffer.als_dataframe().equals(erwartet)
+
+
+def test_pickle_bleibt_unveraenderlich():
+    ergebnis = ErgebnisCache().berechne(KOMMUNEN, Parameter(100000, verfahren='cent'))
+    kopie = pickle.loads(pickle.dumps(ergebnis))
+    _pruefe_schreibschutz(kopie)
+    assert kopie.als_dataframe().equals(ergebnis.als_dataframe())